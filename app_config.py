@@ -27,4 +27,11 @@ DATABASE_PATH = os.path.join(BASE_PATH, 'SME_Assist.db')
 CONFIG_PATH = os.path.join(BASE_PATH, 'config.json')
 LANG_DIR = os.path.join(BASE_PATH, 'lang')
 TEMPLATES_DIR = os.path.join(BASE_PATH, 'templates')
-ICON_PATH = os.path.join(BASE_PATH, 'assets', 'app_icon.ico')
\ No newline at end of file
+ICON_PATH = os.path.join(BASE_PATH, 'assets', 'app_icon.ico')
+# แคช PDF ที่เรนเดอร์แล้ว (ใช้ซ้ำเมื่อพิมพ์ใบเสนอราคาเดิมซ้ำ)
+PDF_CACHE_DIR = os.path.join(BASE_PATH, 'cache', 'pdf')
+PDF_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# ตารางพารามิเตอร์ดอกสว่าน และแคชแบบ binary ที่สร้างจากตารางนี้
+DRILL_PARAMS_PATH = os.path.join(BASE_PATH, 'Drill_bit_param.csv')
+DRILL_CACHE_PATH = os.path.join(BASE_PATH, 'cache', 'drill_params.npz')
@@ -0,0 +1,98 @@
+# File: autocomplete_entry.py
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+
+class AutocompleteEntry(tb.Entry):
+    """
+    Entry that suggests values as the user types.
+
+    Lookups are debounced and run through search_func(prefix, limit) on a worker
+    thread; the result is picked up with after() polling, so a slow query never
+    blocks the Tk mainloop. Results that arrive after the text changed again are dropped.
+    """
+    _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autocomplete")
+    NAVIGATION_KEYS = {"Up", "Down", "Return", "Escape", "Tab", "Left", "Right", "Home", "End"}
+
+    def __init__(self, parent, search_func, delay_ms=200, max_results=10, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.search_func = search_func
+        self.delay_ms = delay_ms
+        self.max_results = max_results
+        self.search_job = None
+        self.pending = None
+        self.popup = None
+        self.listbox = None
+
+        self.bind("<KeyRelease>", self.on_key_release)
+        self.bind("<Down>", self.focus_suggestions)
+        self.bind("<Escape>", lambda e: self.hide_suggestions())
+        self.bind("<FocusOut>", lambda e: self.after(150, self.hide_if_unfocused))
+
+    def on_key_release(self, event):
+        if event.keysym in self.NAVIGATION_KEYS: return
+        if self.search_job: self.after_cancel(self.search_job)
+        self.search_job = self.after(self.delay_ms, self.start_search)
+
+    def start_search(self):
+        self.search_job = None
+        text = self.get().strip()
+        if not text:
+            self.hide_suggestions()
+            return
+        self.pending = (text, self._executor.submit(self.search_func, text, self.max_results))
+        self.poll_search()
+
+    def poll_search(self):
+        if self.pending is None: return
+        text, future = self.pending
+        if not future.done():
+            self.after(30, self.poll_search)
+            return
+        self.pending = None
+        if text != self.get().strip() or future.exception() is not None: return
+        results = [value for value in future.result() if value != text]
+        if results and self.focus_get() is self: self.show_suggestions(results)
+        else: self.hide_suggestions()
+
+    def show_suggestions(self, values):
+        if self.popup is None:
+            self.popup = tk.Toplevel(self)
+            self.popup.overrideredirect(True)
+            self.listbox = tk.Listbox(self.popup, exportselection=False, activestyle="none")
+            self.listbox.pack(fill=BOTH, expand=True)
+            self.listbox.bind("<ButtonRelease-1>", self.choose_suggestion)
+            self.listbox.bind("<Return>", self.choose_suggestion)
+            self.listbox.bind("<Escape>", lambda e: (self.hide_suggestions(), self.focus_set()))
+            self.listbox.bind("<FocusOut>", lambda e: self.after(150, self.hide_if_unfocused))
+        self.listbox.delete(0, END)
+        for value in values: self.listbox.insert(END, value)
+        self.listbox.configure(height=len(values))
+        self.popup.geometry(f"{self.winfo_width()}x{self.listbox.winfo_reqheight()}+{self.winfo_rootx()}+{self.winfo_rooty() + self.winfo_height()}")
+        self.popup.deiconify()
+        self.popup.lift()
+
+    def hide_suggestions(self):
+        if self.popup is not None: self.popup.withdraw()
+
+    def hide_if_unfocused(self):
+        focused = self.focus_get()
+        if focused is not self and focused is not self.listbox: self.hide_suggestions()
+
+    def focus_suggestions(self, event=None):
+        if self.popup is None or not self.popup.winfo_viewable(): return
+        self.listbox.focus_set()
+        self.listbox.selection_clear(0, END)
+        self.listbox.selection_set(0)
+        self.listbox.activate(0)
+        return "break"
+
+    def choose_suggestion(self, event=None):
+        selection = self.listbox.curselection()
+        if selection:
+            self.delete(0, END)
+            self.insert(0, self.listbox.get(selection[0]))
+        self.hide_suggestions()
+        self.focus_set()
+        self.icursor(END)
@@ -0,0 +1,199 @@
+# File: batch_pdf.py
+"""
+Bulk quote-to-PDF command line.
+
+    python batch_pdf.py quotes.json -o output_dir [-j WORKERS]
+    python batch_pdf.py quotes.csv  -o output_dir
+    python batch_pdf.py quotes.json --combined all_quotes.pdf
+    python batch_pdf.py quotes.json --zip all_quotes.zip
+
+JSON input is a list of quote definitions:
+    {"job_name": ..., "customer_name": ..., "material": ..., "quantity": 10, "notes": ...,
+     "profit_margin": 0.25 (optional), "output": "file.pdf" (optional),
+     "operations": [{"desc": ..., "method": "time", "hours": 1.5, "setup_hours": 2, "rate_key": "CNC"},
+                    {"desc": ..., "method": "fixed", "cost": 500, "per_lot": true}]}
+hours and cost are per piece; setup_hours and per-lot fixed costs are charged once.
+
+CSV input has one row per operation; consecutive rows with the same job_name form
+one quote. Columns: job_name, customer_name, material, quantity, notes, output,
+op_desc, op_method, op_hours, op_setup_hours, op_rate_key, op_cost, op_per_lot.
+
+Prices come from the pricing engine with the rates, materials and margin stored in
+the database. PDFs are rendered in parallel across CPU cores. Every quote gets a
+unique quote number from the database sequence before rendering.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import database
+import pdf_generator
+import pricing_engine
+import price_rules
+from language_manager import lang
+
+def load_definitions(filepath):
+    if os.path.splitext(filepath)[1].lower() == '.csv':
+        return load_csv_definitions(filepath)
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else data.get("quotes", [])
+
+def load_csv_definitions(filepath):
+    quotes = []
+    with open(filepath, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            row = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+            if not quotes or row.get("job_name") != quotes[-1]["job_name"]:
+                quotes.append({
+                    "job_name": row.get("job_name", ""), "customer_name": row.get("customer_name", ""),
+                    "material": row.get("material", ""), "quantity": row.get("quantity") or 1,
+                    "notes": row.get("notes", ""), "output": row.get("output") or None, "operations": []
+                })
+            if row.get("op_desc"):
+                method = row.get("op_method") or ("fixed" if row.get("op_cost") else "time")
+                op = {"desc": row["op_desc"], "method": method}
+                if method == "fixed": op.update({"cost": float(row.get("op_cost") or 0), "per_lot": (row.get("op_per_lot") or "").strip().lower() in ("1", "true", "yes", "y")})
+                else: op.update({"hours": float(row.get("op_hours") or 0), "setup_hours": float(row.get("op_setup_hours") or 0), "rate_key": row.get("op_rate_key", "")})
+                quotes[-1]["operations"].append(op)
+    return quotes
+
+def resolve_operations(operations, hourly_rates):
+    """Fills in rate and cost per unit the same way QuotingPage.add_operation does."""
+    resolved = []
+    for op in operations:
+        if op.get("method", "time") == "fixed":
+            cost = float(op.get("cost") or 0)
+            per_lot = bool(op.get("per_lot"))
+            resolved.append({"desc": op.get("desc", ""), "method": "fixed", "hours": "-", "rate": "-", "cost": 0.0 if per_lot else cost,
+                             "setup_hours": 0.0, "setup_cost": cost if per_lot else 0.0})
+        else:
+            hours = float(op.get("hours") or 0)
+            setup_hours = float(op.get("setup_hours") or 0)
+            rate = op.get("rate")
+            if rate is None: rate = hourly_rates.get(op.get("rate_key"), 0)
+            resolved.append({"desc": op.get("desc", ""), "method": "time", "hours": hours, "rate": rate, "cost": hours * rate,
+                             "setup_hours": setup_hours, "setup_cost": setup_hours * rate, "machine": op.get("rate_key")})
+    return resolved
+
+def build_pdf_data(definition, operations, price):
+    """Template context with the same keys QuotingPage.save_pdf sends to create_quote_pdf."""
+    operations_for_pdf = []
+    for op in operations:
+        details = lang.get("op_details_fixed_lot") if op['setup_cost'] else lang.get("op_details_fixed")
+        if op['method'] == 'time':
+            if op['setup_hours']: details = lang.get("op_details_time_setup", hours=op['hours'], setup_hours=op['setup_hours'], rate=op['rate'])
+            else: details = lang.get("op_details_time", hours=op['hours'], rate=op['rate'])
+        operations_for_pdf.append({"desc": op['desc'], "details": details, "cost": op['cost'] * price['quantity'] + op['setup_cost']})
+    return {
+        "job_name": definition.get("job_name", ""), "customer_name": definition.get("customer_name", ""),
+        "operations": operations_for_pdf, "notes": definition.get("notes", ""),
+        "quantity": price['quantity'], "material_cost_per_unit": price['material_cost_per_unit'],
+        "total_labor_cost_per_unit": price['total_labor_cost_per_unit'], "setup_cost": price['setup_cost'],
+        "sub_total": price['sub_total'], "profit_margin_percent": price['profit_margin'] * 100,
+        "profit": price['profit'], "discount": price['discount'],
+        "final_price": price['final_price'], "price_breaks": definition.get("price_breaks", [])
+    }
+
+def output_path_for(definition, output_dir, used_names):
+    name = definition.get("output") or f"{lang.get('quote_filename', default='Quote')}_{definition.get('job_name') or 'untitled'}.pdf"
+    name = re.sub(r'[\\/:*?"<>|]+', '_', name)
+    stem, ext = os.path.splitext(name)
+    candidate, n = name, 1
+    while candidate.lower() in used_names:
+        n += 1
+        candidate = f"{stem}_{n}{ext or '.pdf'}"
+    used_names.add(candidate.lower())
+    return os.path.join(output_dir, candidate)
+
+def prepare_jobs(definitions, output_dir):
+    """Prices every definition in one batch call; returns (jobs, failures)."""
+    settings = database.get_settings()
+    profit_margin = settings.get('profit_margin', 0.25)
+    hourly_rates = {k: v for k, v in settings.items() if k not in ('profit_margin', 'Wire EDM_sqmm')}
+    materials = database.get_all_materials()
+
+    valid, failures = [], []
+    for index, definition in enumerate(definitions, start=1):
+        try:
+            if int(definition.get("quantity", 1)) <= 0: raise ValueError("Quantity must be > 0")
+            operations = resolve_operations(definition.get("operations") or [], hourly_rates)
+            valid.append((index, definition, operations))
+        except (TypeError, ValueError) as e:
+            failures.append((index, definition.get("job_name", ""), str(e)))
+
+    prices = pricing_engine.price_quotes_batch(
+        [dict(d, operations=ops) for _, d, ops in valid], materials, profit_margin, rules=price_rules.get_rules(profit_margin))
+    used_names = set()
+    jobs = [(index, definition.get("job_name", ""), build_pdf_data(definition, ops, price), output_path_for(definition, output_dir, used_names))
+            for (index, definition, ops), price in zip(valid, prices)]
+    pdf_generator.stamp_quotes([data for _, _, data, _ in jobs])
+    return jobs, failures
+
+def run_batch(input_path, output_dir, workers=None):
+    database.initialize_db()
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+    jobs, failures = prepare_jobs(load_definitions(input_path), output_dir)
+    succeeded = 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = {executor.submit(pdf_generator.create_quote_pdf, data, path): (index, job_name) for index, job_name, data, path in jobs}
+        for future in as_completed(futures):
+            index, job_name = futures[future]
+            try:
+                future.result()
+                succeeded += 1
+            except Exception as e:
+                failures.append((index, job_name, f"{type(e).__name__}: {e}"))
+    elapsed = time.perf_counter() - started
+
+    total = succeeded + len(failures)
+    print(f"\n{succeeded}/{total} PDFs written to {output_dir} in {elapsed:.1f} s ({succeeded / elapsed if elapsed else 0:.2f} quotes/s)")
+    for index, job_name, message in sorted(failures):
+        print(f"  FAILED #{index} {job_name}: {message}")
+    return succeeded, failures
+
+def run_pack(input_path, output_path, mode, workers=None):
+    """Renders every quote into one combined PDF (mode 'combined') or one zip archive (mode 'zip')."""
+    # ตรวจก่อนจองเลขที่ใบเสนอราคา จะได้ไม่เสียเลขไปเปล่า ๆ
+    if mode == "combined": pdf_generator.require_pypdf()
+    database.initialize_db()
+    started = time.perf_counter()
+    jobs, failures = prepare_jobs(load_definitions(input_path), os.path.dirname(output_path) or ".")
+    quotes = [data for _, _, data, _ in jobs]
+    if quotes:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            if mode == "zip": pdf_generator.write_quotes_zip(quotes, output_path, executor=executor)
+            else: pdf_generator.write_quotes_combined(quotes, output_path, executor=executor)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{len(quotes)} quotes written to {output_path} in {elapsed:.1f} s ({len(quotes) / elapsed if elapsed else 0:.2f} quotes/s)")
+    for index, job_name, message in sorted(failures):
+        print(f"  FAILED #{index} {job_name}: {message}")
+    return len(quotes), failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render many quotes to PDF in parallel.")
+    parser.add_argument("input", help="JSON or CSV file with quote definitions")
+    parser.add_argument("-o", "--output-dir", default="quotes_pdf", help="directory for the generated PDFs")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+    pack = parser.add_mutually_exclusive_group()
+    pack.add_argument("--combined", metavar="FILE.pdf", help="write all quotes into one PDF file instead")
+    pack.add_argument("--zip", metavar="FILE.zip", help="write all quotes into one zip archive instead")
+    args = parser.parse_args(argv)
+    if args.combined or args.zip:
+        try:
+            _, failures = run_pack(args.input, args.combined or args.zip, "combined" if args.combined else "zip", args.workers)
+        except RuntimeError as e:
+            print(e)
+            return 1
+    else:
+        _, failures = run_batch(args.input, args.output_dir, args.workers)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# File: customers_page.py
+import tkinter as tk
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+from tkinter import messagebox
+import database
+from language_manager import lang
+from virtual_list import VirtualList
+
+class CustomersPage(tb.Frame):
+    """Customer directory backed by the indexed customers table."""
+    SEARCH_DELAY_MS = 200
+
+    def __init__(self, parent, app):
+        super().__init__(parent, padding=15)
+        self.app = app
+        self.widgets = {}
+        self.search_job = None
+        self.prefix = ""
+
+        search_frame = tb.Frame(self)
+        search_frame.pack(fill=X, pady=(0, 10))
+        self.widgets['search_label'] = tb.Label(search_frame, text=lang.get("customers_search"))
+        self.widgets['search_label'].pack(side=LEFT, padx=(0, 5))
+        self.widgets['search_var'] = tk.StringVar()
+        self.widgets['search_var'].trace_add("write", self.schedule_search)
+        tb.Entry(search_frame, textvariable=self.widgets['search_var']).pack(side=LEFT, fill=X, expand=True)
+        self.widgets['count_label'] = tb.Label(search_frame, text="", bootstyle="secondary")
+        self.widgets['count_label'].pack(side=RIGHT, padx=(10, 0))
+
+        self.widgets['list'] = VirtualList(self, self.customer_columns(), self.count_rows, self.fetch_rows)
+        self.widgets['list'].pack(fill=BOTH, expand=True)
+        self.widgets['list'].tree.bind("<Double-1>", self.new_quote_for_selected)
+
+        self.widgets['add_frame'] = tb.Labelframe(self, text=lang.get("customers_add_new"), padding=10)
+        self.widgets['add_frame'].pack(fill=X, pady=(10, 0))
+        for col in (1, 3): self.widgets['add_frame'].grid_columnconfigure(col, weight=1)
+        self.widgets['form_labels'] = {}
+        self.widgets['form_entries'] = {}
+        for i, (field, label_key) in enumerate((("name", "customer_name"), ("contact", "customer_contact"), ("phone", "customer_phone"), ("email", "customer_email"))):
+            label = tb.Label(self.widgets['add_frame'], text=lang.get(label_key))
+            label.grid(row=i // 2, column=(i % 2) * 2, sticky=W, padx=5, pady=2)
+            entry = tb.Entry(self.widgets['add_frame'])
+            entry.grid(row=i // 2, column=(i % 2) * 2 + 1, sticky=EW, padx=5, pady=2)
+            self.widgets['form_labels'][label_key] = label
+            self.widgets['form_entries'][field] = entry
+        self.widgets['add_btn'] = tb.Button(self.widgets['add_frame'], text=lang.get("op_add_btn"), bootstyle="success", command=self.add_customer)
+        self.widgets['add_btn'].grid(row=2, column=0, columnspan=4, sticky=EW, padx=5, pady=(10, 0))
+
+        button_frame = tb.Frame(self)
+        button_frame.pack(fill=X, pady=(10, 0))
+        self.widgets['delete_btn'] = tb.Button(button_frame, text=lang.get("op_delete_btn"), bootstyle="danger-outline", command=self.delete_selected)
+        self.widgets['delete_btn'].pack(side=LEFT)
+        self.widgets['new_quote_btn'] = tb.Button(button_frame, text=lang.get("customers_new_quote_btn"), bootstyle="primary", command=self.new_quote_for_selected)
+        self.widgets['new_quote_btn'].pack(side=RIGHT)
+
+    def customer_columns(self):
+        return [(lang.get("col_customer"), 300), (lang.get("col_contact"), 200), (lang.get("col_phone"), 140), (lang.get("col_email"), 220)]
+
+    def on_show(self):
+        self.reload()
+
+    def update_language(self):
+        self.widgets['search_label'].config(text=lang.get("customers_search"))
+        self.widgets['add_frame'].config(text=lang.get("customers_add_new"))
+        for label_key, label in self.widgets['form_labels'].items(): label.config(text=lang.get(label_key))
+        self.widgets['add_btn'].config(text=lang.get("op_add_btn"))
+        self.widgets['delete_btn'].config(text=lang.get("op_delete_btn"))
+        self.widgets['new_quote_btn'].config(text=lang.get("customers_new_quote_btn"))
+        self.widgets['list'].set_headings([heading for heading, _ in self.customer_columns()])
+        self.update_count()
+
+    def schedule_search(self, *args):
+        if self.search_job: self.after_cancel(self.search_job)
+        self.search_job = self.after(self.SEARCH_DELAY_MS, self.reload)
+
+    def reload(self):
+        self.search_job = None
+        self.prefix = self.widgets['search_var'].get().strip()
+        self.widgets['list'].offset = 0
+        self.widgets['list'].refresh()
+        self.update_count()
+
+    def count_rows(self):
+        return database.count_customers(self.prefix)
+
+    def fetch_rows(self, offset, limit):
+        rows = database.get_customers_page(offset, limit, self.prefix)
+        return [(row['id'], (row['name'], row['contact'], row['phone'], row['email'])) for row in rows]
+
+    def update_count(self):
+        self.widgets['count_label'].config(text=lang.get("customers_total", count=self.widgets['list'].total))
+
+    def add_customer(self):
+        values = {field: entry.get().strip() for field, entry in self.widgets['form_entries'].items()}
+        if not values['name']: return
+        if not database.add_customer(**values):
+            messagebox.showerror(lang.get("error_title"), lang.get("customer_exists_error", name=values['name']))
+            return
+        for entry in self.widgets['form_entries'].values(): entry.delete(0, END)
+        self.reload()
+
+    def delete_selected(self):
+        customer_id = self.widgets['list'].selected_key()
+        if customer_id is None: return
+        database.delete_customer(customer_id)
+        self.widgets['list'].refresh()
+        self.update_count()
+
+    def new_quote_for_selected(self, event=None):
+        customer_list = self.widgets['list']
+        customer_id = customer_list.selected_key()
+        if customer_id is None: return
+        name = customer_list.tree.item(customer_list.tree.selection()[0], "values")[0]
+        quoting_page = self.app.pages["quoting"]
+        quoting_page.clear_form()
+        quoting_page.widgets['customer_name_entry'].insert(0, name)
+        self.app.show_page("quoting")
@@ -0,0 +1,67 @@
+# File: cycle_time.py
+"""
+Closed-form drilling cycle times (G81 / G82 / G83).
+
+Every function takes scalars or NumPy arrays and broadcasts them, so a whole
+hole table (one row per hole group) is timed in a single call. Times are in
+minutes, lengths in mm, feeds in mm/min and dwell in milliseconds, the same
+units OperationManagerWindow uses.
+
+    G81  feed to depth
+    G82  feed to depth + dwell at the bottom
+    G83  feed to depth in pecks of Q; between pecks the tool rapids out to R and
+         back to the previous peck depth
+
+For G83 with n = ceil(depth / Q) pecks, the retract after peck k (k < n) rapids
+k*Q out and (k-1)*Q back in, so the rapid distance per hole is
+sum_{k=1}^{n-1} (2k - 1) * Q = (n - 1)^2 * Q.
+"""
+
+CYCLES = ("G81", "G82", "G83")
+# ความคลาดเคลื่อนเดียวกับลูปเดิม: ความลึกที่เหลือไม่เกิน 1e-4 mm ไม่นับเป็น peck ใหม่
+DEPTH_TOLERANCE = 1e-4
+
+def peck_count(depth, peck):
+    """Number of G83 pecks needed to reach depth with peck depth Q."""
+    import numpy as np
+    depth = np.asarray(depth, dtype=float)
+    peck = np.asarray(peck, dtype=float)
+    if np.any(peck <= 0): raise ValueError("Peck Depth must be > 0")
+    return np.maximum(np.ceil((depth - DEPTH_TOLERANCE) / peck), 0)
+
+def g83_rapid_distance(depth, peck):
+    """Total rapid travel (mm) of the peck retracts for one hole."""
+    import numpy as np
+    retracts = np.maximum(peck_count(depth, peck) - 1, 0)
+    return retracts * retracts * np.asarray(peck, dtype=float)
+
+def drilling_cycle_time(cycle, depth, feed, rapid=5000.0, count=1, dwell_ms=0.0, peck=None):
+    """
+    Total minutes for count holes of the given canned cycle.
+
+    cycle may be a single code ('G81', 'G82', 'G83') or an array of codes, one
+    per row. dwell_ms is only used for G82 rows and peck (Q) only for G83 rows.
+    """
+    import numpy as np
+    cycle = np.asarray(cycle)
+    depth = np.asarray(depth, dtype=float)
+    feed = np.asarray(feed, dtype=float)
+    rapid = np.asarray(rapid, dtype=float)
+    count = np.asarray(count, dtype=float)
+    unknown = ~np.isin(cycle, CYCLES)
+    if np.any(unknown): raise ValueError(f"Unsupported cycle: {np.atleast_1d(cycle)[np.atleast_1d(unknown)][0]}")
+    if np.any(feed <= 0) or np.any(rapid <= 0): raise ValueError("Feed and rapid rates must be > 0")
+    if np.any(depth < 0) or np.any(count < 0): raise ValueError("Depth and hole count must be >= 0")
+    if np.any((cycle == "G82") & (np.asarray(dwell_ms, dtype=float) < 0)): raise ValueError("Dwell must be >= 0")
+
+    per_hole = depth / feed
+    is_g82 = cycle == "G82"
+    if np.any(is_g82):
+        per_hole = per_hole + np.where(is_g82, np.asarray(dwell_ms, dtype=float) / 60000.0, 0.0)
+    is_g83 = cycle == "G83"
+    if np.any(is_g83):
+        if peck is None: raise ValueError("Peck Depth must be > 0")
+        # แถวที่ไม่ใช่ G83 ใช้ Q = depth เพื่อไม่ให้ Q ที่ว่าง/เป็นศูนย์ทำให้คำนวณผิด
+        q = np.where(is_g83, np.asarray(peck, dtype=float), np.maximum(depth, 1.0))
+        per_hole = per_hole + np.where(is_g83, g83_rapid_distance(depth, q) / rapid, 0.0)
+    return per_hole * count
@@ -1,5 +1,10 @@
 # File: database.py (Updated)
 import sqlite3
+import threading
+import atexit
+import csv
+import os
+from datetime import datetime
 from app_config import DATABASE_PATH
 
 DEFAULT_SETTINGS = {
@@ -13,89 +18,641 @@ DEFAULT_MATERIALS = {
     'สแตนเลส (Stainless Steel 304)': 250, 'ทองเหลือง (Brass)': 300
 }
 
+# Connection กลางที่เปิดค้างไว้ตลอดอายุโปรแกรม และ cache ของ settings/materials
+_connection = None
+_db_lock = threading.RLock()
+_settings_cache = None
+_materials_cache = None
+_wire_edm_speeds_cache = None
+_price_rules_cache = None
+_capacity_cache = None
+_routings_cache = None
+_schedule_revision = 0
+_fts_enabled = False
+
 def connect_db():
-    """เชื่อมต่อกับฐานข้อมูล SQLite โดยใช้ Path ที่ถูกต้อง"""
-    return sqlite3.connect(DATABASE_PATH) # << แก้ไขตรงนี้
+    """คืน connection กลางของ SQLite (เปิดครั้งแรกครั้งเดียว, ใช้ WAL mode)"""
+    global _connection
+    with _db_lock:
+        if _connection is None:
+            _connection = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
+            _connection.execute("PRAGMA journal_mode=WAL")
+            _connection.execute("PRAGMA synchronous=NORMAL")
+        return _connection
+
+def close_db():
+    """ปิด connection กลางและล้าง cache"""
+    global _connection
+    with _db_lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
+        invalidate_cache()
+
+atexit.register(close_db)
+
+def _reset_after_fork():
+    """process ลูกที่ fork มาห้ามใช้ connection ของ process แม่ร่วมกัน ให้เปิดใหม่เมื่อต้องใช้"""
+    global _connection, _db_lock
+    _connection = None
+    _db_lock = threading.RLock()
+    invalidate_cache()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def invalidate_cache():
+    """ล้าง cache ของ settings/materials ให้โหลดจากฐานข้อมูลใหม่ในครั้งถัดไป"""
+    global _settings_cache, _materials_cache, _wire_edm_speeds_cache, _price_rules_cache, _capacity_cache, _routings_cache
+    with _db_lock:
+        _settings_cache = None
+        _materials_cache = None
+        _wire_edm_speeds_cache = None
+        _price_rules_cache = None
+        _capacity_cache = None
+        _routings_cache = None
 
 def initialize_db():
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute('CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value REAL NOT NULL)')
-    cursor.execute('CREATE TABLE IF NOT EXISTS materials (name TEXT PRIMARY KEY, cost REAL NOT NULL)')
+    with _db_lock:
+        conn = connect_db()
+        cursor = conn.cursor()
+        cursor.execute('CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value REAL NOT NULL)')
+        cursor.execute('CREATE TABLE IF NOT EXISTS materials (name TEXT PRIMARY KEY, cost REAL NOT NULL)')
     
-    cursor.execute("SELECT key FROM settings")
-    existing_keys = {row[0] for row in cursor.fetchall()}
-    for key, value in DEFAULT_SETTINGS.items():
-        if key not in existing_keys:
-            cursor.execute("INSERT INTO settings (key, value) VALUES (?, ?)", (key, value))
-
-    cursor.execute("SELECT name FROM materials")
-    existing_materials = {row[0] for row in cursor.fetchall()}
-    for name, cost in DEFAULT_MATERIALS.items():
-        if name not in existing_materials:
-            cursor.execute("INSERT INTO materials (name, cost) VALUES (?, ?)", (name, cost))
-            
-    conn.commit()
-    conn.close()
+        cursor.execute("SELECT key FROM settings")
+        existing_keys = {row[0] for row in cursor.fetchall()}
+        for key, value in DEFAULT_SETTINGS.items():
+            if key not in existing_keys:
+                cursor.execute("INSERT INTO settings (key, value) VALUES (?, ?)", (key, value))
+
+        cursor.execute("SELECT name FROM materials")
+        existing_materials = {row[0] for row in cursor.fetchall()}
+        for name, cost in DEFAULT_MATERIALS.items():
+            if name not in existing_materials:
+                cursor.execute("INSERT INTO materials (name, cost) VALUES (?, ?)", (name, cost))
+
+        cursor.execute('CREATE TABLE IF NOT EXISTS sequences (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        cursor.execute("INSERT OR IGNORE INTO sequences (name, value) VALUES ('quote', 0)")
+        _create_history_tables(cursor)
+        _create_customer_tables(cursor)
+        _create_wire_edm_tables(cursor)
+        _create_price_rule_tables(cursor)
+        _create_capacity_tables(cursor)
+        _create_routing_tables(cursor)
+        conn.commit()
+        invalidate_cache()
 
 def get_settings():
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT key, value FROM settings")
-    settings = {row[0]: row[1] for row in cursor.fetchall()}
-    conn.close()
-    return settings
+    """คืนสำเนาของ settings จาก cache (อ่านฐานข้อมูลเฉพาะครั้งแรก)"""
+    global _settings_cache
+    with _db_lock:
+        if _settings_cache is None:
+            cursor = connect_db().execute("SELECT key, value FROM settings")
+            _settings_cache = {row[0]: row[1] for row in cursor.fetchall()}
+        return dict(_settings_cache)
 
 def update_settings(new_settings_dict):
-    conn = connect_db()
-    cursor = conn.cursor()
-    for key, value in new_settings_dict.items():
-        cursor.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, float(value)))
-    conn.commit()
-    conn.close()
-    print("Settings updated successfully.")
+    """Upsert หลายค่าพร้อมกันด้วย executemany ใน transaction เดียว"""
+    rows = {key: float(value) for key, value in new_settings_dict.items()}
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", rows.items())
+        if _settings_cache is not None:
+            _settings_cache.update(rows)
 
 def get_all_materials():
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT name, cost FROM materials ORDER BY name")
-    materials = {row[0]: row[1] for row in cursor.fetchall()}
-    conn.close()
-    return materials
+    """คืนสำเนาของรายการวัสดุจาก cache (เรียงตามชื่อ)"""
+    global _materials_cache
+    with _db_lock:
+        if _materials_cache is None:
+            cursor = connect_db().execute("SELECT name, cost FROM materials ORDER BY name")
+            _materials_cache = {row[0]: row[1] for row in cursor.fetchall()}
+        return dict(_materials_cache)
+
+def _set_materials_cache(changes=None, removed=None):
+    """Write-through: ปรับ cache ตามที่เขียนลงฐานข้อมูล โดยคงลำดับตามชื่อไว้"""
+    global _materials_cache
+    if _materials_cache is None: return
+    merged = dict(_materials_cache)
+    merged.update(changes or {})
+    if removed is not None: merged.pop(removed, None)
+    _materials_cache = dict(sorted(merged.items()))
 
 def update_materials(new_materials_dict):
-    conn = connect_db()
-    cursor = conn.cursor()
-    for name, cost in new_materials_dict.items():
-        cursor.execute("INSERT OR REPLACE INTO materials (name, cost) VALUES (?, ?)", (name, float(cost)))
-    conn.commit()
-    conn.close()
-    print("Materials updated successfully.")
+    """Upsert วัสดุหลายรายการพร้อมกันด้วย executemany ใน transaction เดียว"""
+    rows = {name: float(cost) for name, cost in new_materials_dict.items()}
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO materials (name, cost) VALUES (?, ?)", rows.items())
+        _set_materials_cache(rows)
 
 # --- ฟังก์ชันใหม่ที่เพิ่มเข้ามา ---
 def add_material(name, cost):
-    """เพิ่มวัสดุใหม่ลงฐานข้อมูล"""
+    """เพิ่มวัสดุใหม่ลงฐานข้อมูล คืน False ถ้าข้อมูลไม่ครบหรือมีชื่อนี้อยู่แล้ว"""
     if not name or not cost:
         return False
-    conn = connect_db()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT INTO materials (name, cost) VALUES (?, ?)", (name, float(cost)))
-        conn.commit()
-        print(f"Added material: {name}")
-        return True
-    except sqlite3.IntegrityError:
-        print(f"Material '{name}' already exists.")
-        return False
-    finally:
-        conn.close()
+    with _db_lock:
+        conn = connect_db()
+        try:
+            conn.execute("INSERT INTO materials (name, cost) VALUES (?, ?)", (name, float(cost)))
+            conn.commit()
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            return False
+        _set_materials_cache({name: float(cost)})
+    return True
 
 def delete_material(name):
-    """ลบวัสดุออกจากฐานข้อมูล"""
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM materials WHERE name = ?", (name,))
-    conn.commit()
-    conn.close()
-    print(f"Deleted material: {name}")
-# --------------------------------
\ No newline at end of file
+    """ลบวัสดุออกจากฐานข้อมูล (พร้อมความเร็วตัด Wire EDM ของวัสดุนั้น)"""
+    global _wire_edm_speeds_cache
+    with _db_lock:
+        conn = connect_db()
+        conn.execute("DELETE FROM materials WHERE name = ?", (name,))
+        conn.execute("DELETE FROM wire_edm_speeds WHERE material = ?", (name,))
+        conn.commit()
+        _set_materials_cache(removed=name)
+        _wire_edm_speeds_cache = None
+# --------------------------------
+
+# --- Bulk import จากไฟล์ CSV/XLSX ---
+def read_name_value_file(filepath):
+    """
+    อ่านไฟล์ CSV หรือ XLSX ที่มี 2 คอลัมน์แรกเป็น (ชื่อ, ค่า) และคืนเป็น dict
+    แถวหัวตาราง (ค่าที่ไม่ใช่ตัวเลข) ในบรรทัดแรกและแถวว่างจะถูกข้ามไป
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in ('.xlsx', '.xlsm'):
+        try:
+            from openpyxl import load_workbook
+        except ImportError as e:
+            raise ValueError("Reading .xlsx files requires the 'openpyxl' package") from e
+        workbook = load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            raw_rows = [list(row) for row in workbook.active.iter_rows(values_only=True)]
+        finally:
+            workbook.close()
+    else:
+        with open(filepath, 'r', encoding='utf-8-sig', newline='') as f:
+            raw_rows = list(csv.reader(f))
+
+    result = {}
+    for line_no, row in enumerate(raw_rows, start=1):
+        if len(row) < 2 or row[0] is None or not str(row[0]).strip(): continue
+        name, value = str(row[0]).strip(), row[1]
+        try:
+            result[name] = float(str(value).replace(',', '').strip())
+        except ValueError:
+            if line_no == 1: continue
+            raise ValueError(f"Invalid number {value!r} for '{name}' (row {line_no})")
+    return result
+
+def import_materials_from_file(filepath):
+    """นำเข้าราคาวัสดุจากไฟล์ใน transaction เดียว คืนจำนวนรายการที่นำเข้า"""
+    materials = read_name_value_file(filepath)
+    update_materials(materials)
+    return len(materials)
+
+def import_settings_from_file(filepath):
+    """นำเข้าอัตราค่าเครื่องจักร/ค่าตั้งค่าจากไฟล์ใน transaction เดียว คืนจำนวนรายการที่นำเข้า"""
+    settings = read_name_value_file(filepath)
+    update_settings(settings)
+    return len(settings)
+
+# --- เลขที่ใบเสนอราคา ---
+def next_quote_ids(count=1):
+    """
+    จองเลขที่ใบเสนอราคาใหม่ count เลขจาก sequence ในฐานข้อมูล (ไม่ซ้ำและเรียงเพิ่มขึ้นเสมอ
+    แม้หลาย process จะขอพร้อมกัน) รูปแบบ QT-YYYYMMDD-NNNNNN
+    """
+    today = datetime.now().strftime('%Y%m%d')
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            conn.execute("UPDATE sequences SET value = value + ? WHERE name = 'quote'", (count,))
+            last = conn.execute("SELECT value FROM sequences WHERE name = 'quote'").fetchone()[0]
+    return [f"QT-{today}-{number:06d}" for number in range(last - count + 1, last + 1)]
+
+def next_quote_id():
+    return next_quote_ids(1)[0]
+
+# --- ประวัติใบเสนอราคา (Quote history) ---
+HISTORY_COLUMNS = ("id", "quote_id", "created_at", "job_name", "customer_name", "material", "quantity", "final_price", "status")
+# open: เสนอราคาแล้วรอคำตอบ, accepted: ได้งาน (กำลังผลิต), done: ส่งมอบแล้ว, lost: ไม่ได้งาน
+QUOTE_STATUSES = ('open', 'accepted', 'done', 'lost')
+
+def _create_history_tables(cursor):
+    """สร้างตาราง quotes/quote_operations พร้อม index และ FTS5 สำหรับค้นหา"""
+    global _fts_enabled
+    cursor.execute('''CREATE TABLE IF NOT EXISTS quotes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, quote_id TEXT, created_at TEXT NOT NULL,
+        job_name TEXT NOT NULL DEFAULT '', customer_name TEXT NOT NULL DEFAULT '', material TEXT,
+        quantity INTEGER, profit_margin REAL, final_price REAL, notes TEXT NOT NULL DEFAULT '',
+        status TEXT NOT NULL DEFAULT 'open')''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS quote_operations (
+        quote_pk INTEGER NOT NULL REFERENCES quotes(id) ON DELETE CASCADE, position INTEGER NOT NULL,
+        desc TEXT, method TEXT, hours REAL, rate REAL, cost REAL, setup_hours REAL, setup_cost REAL, machine TEXT,
+        PRIMARY KEY (quote_pk, position)) WITHOUT ROWID''')
+    # ฐานข้อมูลเดิมที่สร้างก่อนแยกเวลา setup ต่อล็อต / ก่อนมีสถานะงานและเครื่องจักรของแต่ละ operation
+    op_columns = {row[1] for row in cursor.execute("PRAGMA table_info(quote_operations)")}
+    for column, column_type in (("setup_hours", "REAL"), ("setup_cost", "REAL"), ("machine", "TEXT")):
+        if column not in op_columns: cursor.execute(f"ALTER TABLE quote_operations ADD COLUMN {column} {column_type}")
+    if "status" not in {row[1] for row in cursor.execute("PRAGMA table_info(quotes)")}:
+        cursor.execute("ALTER TABLE quotes ADD COLUMN status TEXT NOT NULL DEFAULT 'open'")
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_quotes_status ON quotes (status, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_quotes_customer ON quotes (customer_name COLLATE NOCASE, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_quotes_job ON quotes (job_name COLLATE NOCASE, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_quotes_created ON quotes (created_at)')
+    # trigram รองรับการค้นหาแบบ substring ซึ่งจำเป็นสำหรับภาษาไทยที่ไม่มีการเว้นวรรค
+    for tokenizer in ("trigram", "unicode61"):
+        try:
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS quotes_fts USING fts5(job_name, customer_name, notes, ops_desc, tokenize='{tokenizer}')")
+            _fts_enabled = True
+            break
+        except sqlite3.OperationalError:
+            _fts_enabled = False
+
+def save_quote(quote_data, operations):
+    """
+    บันทึกใบเสนอราคาและรายการ operations ลงฐานข้อมูลใน transaction เดียว
+    quote_data ใช้คีย์เดียวกับที่ส่งให้ pdf_generator; คืนค่า id ของแถวที่บันทึก
+    """
+    created_at = quote_data.get("created_at") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    op_rows = [
+        (position, op.get("desc", ""), op.get("method"),
+         op["hours"] if isinstance(op.get("hours"), (int, float)) else None,
+         op["rate"] if isinstance(op.get("rate"), (int, float)) else None, op.get("cost"),
+         op.get("setup_hours"), op.get("setup_cost"), op.get("machine"))
+        for position, op in enumerate(operations)
+    ]
+    global _schedule_revision
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO quotes (quote_id, created_at, job_name, customer_name, material, quantity, profit_margin, final_price, notes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (quote_data.get("quote_id"), created_at, quote_data.get("job_name", ""), quote_data.get("customer_name", ""),
+                 quote_data.get("material"), quote_data.get("quantity"), quote_data.get("profit_margin"),
+                 quote_data.get("final_price"), quote_data.get("notes", "")))
+            quote_pk = cursor.lastrowid
+            conn.executemany("INSERT INTO quote_operations (quote_pk, position, desc, method, hours, rate, cost, setup_hours, setup_cost, machine) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             [(quote_pk,) + row for row in op_rows])
+            if _fts_enabled:
+                conn.execute("INSERT INTO quotes_fts (rowid, job_name, customer_name, notes, ops_desc) VALUES (?, ?, ?, ?, ?)",
+                             (quote_pk, quote_data.get("job_name", ""), quote_data.get("customer_name", ""), quote_data.get("notes", ""),
+                              "\n".join(row[1] or "" for row in op_rows)))
+        _schedule_revision += 1
+    return quote_pk
+
+def _fts_query(text):
+    """แปลงข้อความค้นหาเป็น FTS5 query (ทุกคำต้องพบ); คืน None ถ้าใช้ FTS ไม่ได้"""
+    terms = [term.replace('"', '""') for term in text.split()]
+    if not _fts_enabled or not terms or any(len(term) < 3 for term in terms):
+        return None
+    return " ".join(f'"{term}"' for term in terms)
+
+def search_quotes(text="", customer=None, before_id=None, limit=50):
+    """
+    ค้นหาประวัติใบเสนอราคา เรียงจากใหม่ไปเก่า แบบแบ่งหน้า (keyset pagination)
+    ส่ง before_id เป็น id ของแถวสุดท้ายในหน้าก่อนหน้าเพื่อโหลดหน้าถัดไป
+    """
+    columns = ", ".join(f"q.{col}" for col in HISTORY_COLUMNS)
+    where, params = [], []
+    text = (text or "").strip()
+    fts_query = _fts_query(text)
+    if fts_query:
+        sql = f"SELECT {columns} FROM quotes_fts JOIN quotes q ON q.id = quotes_fts.rowid"
+        where.append("quotes_fts MATCH ?"); params.append(fts_query)
+    else:
+        sql = f"SELECT {columns} FROM quotes q"
+        for term in text.split():
+            like = f"%{term}%"
+            where.append("(q.job_name LIKE ? OR q.customer_name LIKE ? OR q.notes LIKE ?)"); params += [like, like, like]
+    if customer:
+        where.append("q.customer_name = ? COLLATE NOCASE"); params.append(customer)
+    if before_id is not None:
+        where.append("q.id < ?"); params.append(before_id)
+    if where: sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY q.id DESC LIMIT ?"; params.append(limit)
+    with _db_lock:
+        rows = connect_db().execute(sql, params).fetchall()
+    return [dict(zip(HISTORY_COLUMNS, row)) for row in rows]
+
+def get_quote(quote_pk):
+    """คืนข้อมูลใบเสนอราคาพร้อมรายการ operations หรือ None ถ้าไม่พบ"""
+    with _db_lock:
+        conn = connect_db()
+        row = conn.execute("SELECT id, quote_id, created_at, job_name, customer_name, material, quantity, profit_margin, final_price, notes, status FROM quotes WHERE id = ?", (quote_pk,)).fetchone()
+        if row is None: return None
+        ops = conn.execute("SELECT desc, method, hours, rate, cost, setup_hours, setup_cost, machine FROM quote_operations WHERE quote_pk = ? ORDER BY position", (quote_pk,)).fetchall()
+    quote = dict(zip(("id", "quote_id", "created_at", "job_name", "customer_name", "material", "quantity", "profit_margin", "final_price", "notes", "status"), row))
+    quote["operations"] = [dict(zip(("desc", "method", "hours", "rate", "cost", "setup_hours", "setup_cost", "machine"), op)) for op in ops]
+    return quote
+
+def set_quote_status(quote_pk, status):
+    global _schedule_revision
+    if status not in QUOTE_STATUSES: raise ValueError(f"Unknown quote status: {status}")
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            conn.execute("UPDATE quotes SET status = ? WHERE id = ?", (status, quote_pk))
+        _schedule_revision += 1
+
+def get_backlog(statuses=('open', 'accepted'), created_since=None):
+    """
+    งานที่ยังต้องใช้เครื่องจักร (ตามสถานะ) พร้อม operations ด้วย query เดียว เรียงตาม id
+    created_since ("YYYY-MM-DD ...") ใช้ตัดใบเสนอราคาที่เก่าเกินไปออก (ไม่ตัดงานที่ accepted แล้ว)
+    """
+    sql = ("SELECT q.id, q.created_at, q.status, q.quantity, o.desc, o.method, o.hours, o.rate, o.setup_hours, o.machine "
+           "FROM quotes q JOIN quote_operations o ON o.quote_pk = q.id "
+           f"WHERE q.status IN ({', '.join('?' * len(statuses))})")
+    params = list(statuses)
+    if created_since:
+        sql += " AND (q.status = 'accepted' OR q.created_at >= ?)"; params.append(created_since)
+    sql += " ORDER BY q.id, o.position"
+    with _db_lock:
+        rows = connect_db().execute(sql, params).fetchall()
+    jobs = []
+    for quote_pk, created_at, status, quantity, desc, method, hours, rate, setup_hours, machine in rows:
+        if not jobs or jobs[-1]["id"] != quote_pk:
+            jobs.append({"id": quote_pk, "created_at": created_at, "status": status, "quantity": quantity or 1, "operations": []})
+        jobs[-1]["operations"].append({"desc": desc, "method": method, "hours": hours, "rate": rate, "setup_hours": setup_hours, "machine": machine})
+    return jobs
+
+def schedule_revision():
+    """ตัวนับที่เพิ่มทุกครั้งที่งานค้างหรือกำลังการผลิตเปลี่ยน ใช้ตัดสินว่าต้องโหลด backlog ใหม่หรือไม่"""
+    return _schedule_revision
+
+# --- รายชื่อลูกค้า (Customer directory) ---
+CUSTOMER_COLUMNS = ("id", "name", "contact", "phone", "email")
+
+def _create_customer_tables(cursor):
+    """ตาราง customers; ชื่อเป็น COLLATE NOCASE เพื่อให้ index ใช้กับการค้นหาแบบ prefix ได้"""
+    cursor.execute('''CREATE TABLE IF NOT EXISTS customers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+        contact TEXT NOT NULL DEFAULT '', phone TEXT NOT NULL DEFAULT '', email TEXT NOT NULL DEFAULT '')''')
+
+def _prefix_range(prefix):
+    """เงื่อนไขช่วง (>=, <) ที่เทียบเท่า prefix match และใช้ index ของคอลัมน์ name ได้เสมอ"""
+    return prefix, prefix + "\U0010ffff"
+
+def add_customer(name, contact="", phone="", email=""):
+    """เพิ่มลูกค้าใหม่ คืน False ถ้าชื่อซ้ำหรือว่าง"""
+    name = (name or "").strip()
+    if not name: return False
+    with _db_lock:
+        conn = connect_db()
+        try:
+            with conn:
+                conn.execute("INSERT INTO customers (name, contact, phone, email) VALUES (?, ?, ?, ?)", (name, contact, phone, email))
+        except sqlite3.IntegrityError:
+            return False
+    return True
+
+def ensure_customer(name):
+    """เพิ่มชื่อลูกค้าลงรายชื่อถ้ายังไม่มี (ใช้ตอนบันทึกใบเสนอราคา)"""
+    name = (name or "").strip()
+    if not name: return
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO customers (name) VALUES (?)", (name,))
+
+def delete_customer(customer_id):
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            conn.execute("DELETE FROM customers WHERE id = ?", (customer_id,))
+
+def search_customer_names(prefix, limit=10):
+    """คืนชื่อลูกค้าที่ขึ้นต้นด้วย prefix (ไม่สนตัวพิมพ์เล็ก/ใหญ่) สำหรับ autocomplete"""
+    low, high = _prefix_range((prefix or "").strip())
+    with _db_lock:
+        rows = connect_db().execute("SELECT name FROM customers WHERE name >= ? AND name < ? ORDER BY name LIMIT ?", (low, high, limit)).fetchall()
+    return [row[0] for row in rows]
+
+def count_customers(prefix=""):
+    low, high = _prefix_range((prefix or "").strip())
+    with _db_lock:
+        return connect_db().execute("SELECT COUNT(*) FROM customers WHERE name >= ? AND name < ?", (low, high)).fetchone()[0]
+
+def get_customers_page(offset, limit, prefix=""):
+    """คืนลูกค้าช่วง [offset, offset+limit) เรียงตามชื่อ สำหรับรายการแบบ virtualized"""
+    low, high = _prefix_range((prefix or "").strip())
+    with _db_lock:
+        rows = connect_db().execute(
+            f"SELECT {', '.join(CUSTOMER_COLUMNS)} FROM customers WHERE name >= ? AND name < ? ORDER BY name LIMIT ? OFFSET ?",
+            (low, high, limit, offset)).fetchall()
+    return [dict(zip(CUSTOMER_COLUMNS, row)) for row in rows]
+
+# --- ความเร็วตัด Wire EDM ---
+# อัตราตัดหยาบ (mm²/min) ที่โรงงานวัดเองต่อวัสดุ (ชื่อเดียวกับตาราง materials) และความหนา (mm)
+# วัสดุที่ไม่มีข้อมูลจะใช้อัตราที่คำนวณจาก Wire EDM_sqmm แทน (ดู wire_edm)
+def _create_wire_edm_tables(cursor):
+    cursor.execute('''CREATE TABLE IF NOT EXISTS wire_edm_speeds (
+        material TEXT NOT NULL, thickness REAL NOT NULL CHECK (thickness > 0), area_rate REAL NOT NULL CHECK (area_rate > 0),
+        PRIMARY KEY (material, thickness)) WITHOUT ROWID''')
+
+def get_wire_edm_speeds():
+    """
+    คืน {material: ((thickness, area_rate), ...)} เรียงตามความหนา จาก cache
+    (object เดิมจนกว่าจะมีการแก้ไข เหมือน get_capacity)
+    """
+    global _wire_edm_speeds_cache
+    with _db_lock:
+        if _wire_edm_speeds_cache is None:
+            speeds = {}
+            for material, thickness, area_rate in connect_db().execute("SELECT material, thickness, area_rate FROM wire_edm_speeds ORDER BY material, thickness"):
+                speeds.setdefault(material, []).append((thickness, area_rate))
+            _wire_edm_speeds_cache = {material: tuple(points) for material, points in speeds.items()}
+        return _wire_edm_speeds_cache
+
+def set_wire_edm_speeds(material, points):
+    """แทนที่ความเร็วตัดทั้งหมดของวัสดุ; points ว่าง = กลับไปใช้อัตราจาก Wire EDM_sqmm"""
+    global _wire_edm_speeds_cache
+    rows = [(material, float(thickness), float(area_rate)) for thickness, area_rate in points]
+    for _, thickness, area_rate in rows:
+        if thickness <= 0 or area_rate <= 0: raise ValueError(f"Invalid cutting speed: {thickness:g} mm at {area_rate:g} mm²/min")
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            conn.execute("DELETE FROM wire_edm_speeds WHERE material = ?", (material,))
+            conn.executemany("INSERT OR REPLACE INTO wire_edm_speeds (material, thickness, area_rate) VALUES (?, ?, ?)", rows)
+        _wire_edm_speeds_cache = None
+
+# --- กฎการตั้งราคา (Price rules) ---
+# margin: อัตรากำไร, discount: ส่วนลด (สัดส่วนของราคา), minimum: ราคาขั้นต่ำต่อ lot, setup: ค่าตั้งเครื่องต่อ lot
+PRICE_RULE_TYPES = ('margin', 'discount', 'minimum', 'setup')
+PRICE_RULE_COLUMNS = ('id', 'rule_type', 'customer', 'material', 'min_quantity', 'value')
+
+def _create_price_rule_tables(cursor):
+    """customer/material ว่าง (NULL) = ใช้กับทุกลูกค้า/ทุกวัสดุ; min_quantity คือจำนวนเริ่มต้นของขั้นราคา"""
+    cursor.execute('''CREATE TABLE IF NOT EXISTS price_rules (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        rule_type TEXT NOT NULL CHECK (rule_type IN ('margin', 'discount', 'minimum', 'setup')),
+        customer TEXT COLLATE NOCASE, material TEXT,
+        min_quantity INTEGER NOT NULL DEFAULT 1, value REAL NOT NULL)''')
+
+def get_price_rules():
+    """
+    คืนกฎราคาทั้งหมดเป็น tuple ของ dict (cache ไว้; ได้ object เดิมจนกว่ากฎจะถูกแก้ไข
+    ผู้เรียกจึงใช้ identity ของผลลัพธ์ตัดสินได้ว่าต้อง compile กฎใหม่หรือไม่)
+    """
+    global _price_rules_cache
+    with _db_lock:
+        if _price_rules_cache is None:
+            rows = connect_db().execute(f"SELECT {', '.join(PRICE_RULE_COLUMNS)} FROM price_rules ORDER BY id").fetchall()
+            _price_rules_cache = tuple(dict(zip(PRICE_RULE_COLUMNS, row)) for row in rows)
+        return _price_rules_cache
+
+def add_price_rule(rule_type, value, min_quantity=1, customer=None, material=None):
+    if rule_type not in PRICE_RULE_TYPES: raise ValueError(f"Unknown price rule type: {rule_type}")
+    if int(min_quantity) < 1: raise ValueError("Minimum quantity must be >= 1")
+    global _price_rules_cache
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            cursor = conn.execute("INSERT INTO price_rules (rule_type, customer, material, min_quantity, value) VALUES (?, ?, ?, ?, ?)",
+                                  (rule_type, (customer or "").strip() or None, (material or "").strip() or None, int(min_quantity), float(value)))
+        _price_rules_cache = None
+        return cursor.lastrowid
+
+def delete_price_rule(rule_id):
+    global _price_rules_cache
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            conn.execute("DELETE FROM price_rules WHERE id = ?", (rule_id,))
+        _price_rules_cache = None
+
+# --- กำลังการผลิต (Machine capacity) ---
+# machine_shifts ของ '*' คือปฏิทินกะกลางของโรงงาน ใช้กับเครื่องที่ไม่ได้กำหนดกะของตัวเอง
+# weekday: 0 = จันทร์ ... 6 = อาทิตย์, ชั่วโมงเป็นทศนิยม (17.5 = 17:30)
+DEFAULT_CALENDAR = '*'
+DEFAULT_SHIFTS = tuple((weekday, 8.0, 17.0) for weekday in range(6))
+MACHINE_CLASSES = tuple(key for key in DEFAULT_SETTINGS if key not in ('profit_margin', 'Wire EDM_sqmm'))
+
+def _create_capacity_tables(cursor):
+    cursor.execute('CREATE TABLE IF NOT EXISTS machines (machine TEXT PRIMARY KEY, count INTEGER NOT NULL DEFAULT 1 CHECK (count >= 0))')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS machine_shifts (
+        machine TEXT NOT NULL, weekday INTEGER NOT NULL CHECK (weekday BETWEEN 0 AND 6),
+        start_hour REAL NOT NULL, end_hour REAL NOT NULL, CHECK (start_hour >= 0 AND end_hour <= 24 AND start_hour < end_hour))''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_machine_shifts ON machine_shifts (machine)')
+    cursor.executemany("INSERT OR IGNORE INTO machines (machine, count) VALUES (?, 1)", [(machine,) for machine in MACHINE_CLASSES])
+    if cursor.execute("SELECT COUNT(*) FROM machine_shifts").fetchone()[0] == 0:
+        cursor.executemany("INSERT INTO machine_shifts (machine, weekday, start_hour, end_hour) VALUES (?, ?, ?, ?)",
+                           [(DEFAULT_CALENDAR,) + shift for shift in DEFAULT_SHIFTS])
+
+def get_capacity():
+    """
+    คืน {"machines": {machine: count}, "shifts": {machine: ((weekday, start_hour, end_hour), ...)}}
+    จาก cache (object เดิมจนกว่าจะมีการแก้ไข เหมือน get_price_rules)
+    """
+    global _capacity_cache
+    with _db_lock:
+        if _capacity_cache is None:
+            conn = connect_db()
+            machines = dict(conn.execute("SELECT machine, count FROM machines ORDER BY machine").fetchall())
+            shifts = {}
+            for machine, weekday, start_hour, end_hour in conn.execute("SELECT machine, weekday, start_hour, end_hour FROM machine_shifts ORDER BY machine, weekday, start_hour"):
+                shifts.setdefault(machine, []).append((weekday, start_hour, end_hour))
+            _capacity_cache = {"machines": machines, "shifts": {machine: tuple(rows) for machine, rows in shifts.items()}}
+        return _capacity_cache
+
+def set_machine_count(machine, count):
+    global _capacity_cache, _schedule_revision
+    if int(count) < 0: raise ValueError("Machine count must be >= 0")
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO machines (machine, count) VALUES (?, ?)", (machine, int(count)))
+        _capacity_cache = None
+        _schedule_revision += 1
+
+def set_machine_shifts(machine, shifts):
+    """แทนที่กะทำงานทั้งหมดของเครื่อง (หรือ DEFAULT_CALENDAR); shifts ว่าง = กลับไปใช้ปฏิทินกลาง"""
+    global _capacity_cache, _schedule_revision
+    rows = [(machine, int(weekday), float(start_hour), float(end_hour)) for weekday, start_hour, end_hour in shifts]
+    for _, weekday, start_hour, end_hour in rows:
+        if not (0 <= weekday <= 6 and 0 <= start_hour < end_hour <= 24): raise ValueError(f"Invalid shift: {weekday} {start_hour}-{end_hour}")
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            conn.execute("DELETE FROM machine_shifts WHERE machine = ?", (machine,))
+            conn.executemany("INSERT INTO machine_shifts (machine, weekday, start_hour, end_hour) VALUES (?, ?, ?, ?)", rows)
+        _capacity_cache = None
+        _schedule_revision += 1
+
+# --- คลัง routing (ลำดับ operations ที่ใช้ซ้ำ) ---
+# operation ของ routing เก็บชื่อเครื่อง (machine = key ของ rate) แทนราคา เพื่อให้ใช้ rate ปัจจุบันตอนแทรก
+ROUTING_OP_COLUMNS = ("desc", "method", "machine", "hours", "setup_hours", "cost", "per_lot")
+
+def _create_routing_tables(cursor):
+    cursor.execute('''CREATE TABLE IF NOT EXISTS routings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE COLLATE NOCASE, use_count INTEGER NOT NULL DEFAULT 0)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS routing_operations (
+        routing_id INTEGER NOT NULL REFERENCES routings(id) ON DELETE CASCADE, position INTEGER NOT NULL,
+        desc TEXT NOT NULL DEFAULT '', method TEXT NOT NULL DEFAULT 'time', machine TEXT,
+        hours REAL NOT NULL DEFAULT 0, setup_hours REAL NOT NULL DEFAULT 0, cost REAL NOT NULL DEFAULT 0, per_lot INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (routing_id, position)) WITHOUT ROWID''')
+
+def get_routings():
+    """
+    คืน routing ทั้งหมดเป็น tuple ของ {"id", "name", "use_count", "operations"} (cache ไว้
+    เหมือน get_price_rules: ได้ object เดิมจนกว่าจะมีการแก้ไข)
+    """
+    global _routings_cache
+    with _db_lock:
+        if _routings_cache is None:
+            conn = connect_db()
+            routings = {row[0]: {"id": row[0], "name": row[1], "use_count": row[2], "operations": []}
+                        for row in conn.execute("SELECT id, name, use_count FROM routings ORDER BY name")}
+            for row in conn.execute(f"SELECT routing_id, {', '.join(ROUTING_OP_COLUMNS)} FROM routing_operations ORDER BY routing_id, position"):
+                if row[0] in routings:
+                    op = dict(zip(ROUTING_OP_COLUMNS, row[1:]))
+                    op["per_lot"] = bool(op["per_lot"])
+                    routings[row[0]]["operations"].append(op)
+            _routings_cache = tuple(routings.values())
+        return _routings_cache
+
+def save_routing(name, operations):
+    """บันทึก routing (แทนที่ของเดิมถ้าชื่อซ้ำ) ใน transaction เดียว คืน id"""
+    global _routings_cache
+    name = (name or "").strip()
+    if not name: raise ValueError("Routing name is required")
+    if not operations: raise ValueError("Routing needs at least one operation")
+    for op in operations:
+        if op.get("method", "time") == "time" and not op.get("machine"):
+            raise ValueError(f"Time operation '{op.get('desc', '')}' has no machine")
+    rows = [(position, op.get("desc", ""), op.get("method", "time"), op.get("machine"), float(op.get("hours") or 0),
+             float(op.get("setup_hours") or 0), float(op.get("cost") or 0), int(bool(op.get("per_lot"))))
+            for position, op in enumerate(operations)]
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            conn.execute("INSERT INTO routings (name) VALUES (?) ON CONFLICT (name) DO NOTHING", (name,))
+            routing_id = conn.execute("SELECT id FROM routings WHERE name = ?", (name,)).fetchone()[0]
+            conn.execute("DELETE FROM routing_operations WHERE routing_id = ?", (routing_id,))
+            conn.executemany(f"INSERT INTO routing_operations (routing_id, position, {', '.join(ROUTING_OP_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             [(routing_id,) + row for row in rows])
+        _routings_cache = None
+    return routing_id
+
+def delete_routing(routing_id):
+    global _routings_cache
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            conn.execute("DELETE FROM routing_operations WHERE routing_id = ?", (routing_id,))
+            conn.execute("DELETE FROM routings WHERE id = ?", (routing_id,))
+        _routings_cache = None
+
+def record_routing_use(routing_id):
+    """นับจำนวนครั้งที่ใช้ (ใช้เรียงผลค้นหา) ปรับ cache ในที่เดียวกันโดยไม่ต้องโหลดใหม่"""
+    with _db_lock:
+        conn = connect_db()
+        with conn:
+            conn.execute("UPDATE routings SET use_count = use_count + 1 WHERE id = ?", (routing_id,))
+        for routing in _routings_cache or ():
+            if routing["id"] == routing_id: routing["use_count"] += 1
@@ -0,0 +1,167 @@
+# File: drill_library.py
+import bisect
+import csv
+import os
+from app_config import DRILL_PARAMS_PATH, DRILL_CACHE_PATH
+
+COLUMNS = ("diameter", "S", "F", "cutting_speed", "feed_per_tooth", "cycle", "Q", "teeth")
+NUMERIC_COLUMNS = ("S", "F", "cutting_speed", "feed_per_tooth", "Q", "teeth")
+
+def _number(text):
+    try:
+        return float(str(text).strip())
+    except ValueError:
+        return None
+
+def parse_rows(rows):
+    """
+    Parses the Drill_bit_param sheet layout: a "Materail,<name>" line starts a
+    material block, the "Tool diameter,..." header follows and every row with a
+    numeric diameter after it is a tool. Returns {material: [row tuples]}.
+    """
+    tables, current = {}, None
+    for row in rows:
+        cells = [str(c).strip() for c in row] + [""] * len(COLUMNS)
+        first = cells[0].lower()
+        if first in ("materail", "material"):
+            current = tables.setdefault(cells[1] or f"Material {len(tables) + 1}", [])
+            continue
+        diameter = _number(cells[0])
+        if current is None or diameter is None: continue
+        values = [_number(c) for c in cells[1:8]]
+        current.append((diameter, values[0], values[1], values[2], values[3], cells[5].upper() or "G83", values[5], values[6]))
+    return tables
+
+def read_source(path):
+    """Rows of the CSV file, or of the first sheet of the .xls/.xlsx (needs xlrd/openpyxl)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            return list(csv.reader(f))
+    if ext == ".xls":
+        import xlrd
+        sheet = xlrd.open_workbook(path).sheet_by_index(0)
+        return [[_cell_text(v) for v in sheet.row_values(i)] for i in range(sheet.nrows)]
+    from openpyxl import load_workbook
+    sheet = load_workbook(path, read_only=True, data_only=True).worksheets[0]
+    return [[_cell_text(v) for v in row] for row in sheet.iter_rows(values_only=True)]
+
+def _cell_text(value):
+    if value is None: return ""
+    if isinstance(value, float) and value.is_integer(): return str(int(value))
+    return str(value)
+
+class DrillTable:
+    """Tools of one material as column arrays sorted by diameter."""
+    def __init__(self, columns):
+        self.columns = columns
+        self.diameters = columns["diameter"].tolist()
+
+    @classmethod
+    def from_rows(cls, rows):
+        import numpy as np
+        rows = sorted(rows, key=lambda r: r[0])
+        columns = {name: np.array([r[i] if r[i] is not None else np.nan for r in rows], dtype=float)
+                   for i, name in enumerate(COLUMNS) if name != "cycle"}
+        columns["cycle"] = np.array([r[5] for r in rows])
+        return cls(columns)
+
+    def nearest_index(self, diameter):
+        i = bisect.bisect_left(self.diameters, diameter)
+        if i == 0: return 0
+        if i == len(self.diameters): return i - 1
+        return i if self.diameters[i] - diameter < diameter - self.diameters[i - 1] else i - 1
+
+    def lookup(self, diameter, interpolate=False):
+        """Parameters for one diameter: the nearest listed tool, or linearly interpolated between neighbours."""
+        import numpy as np
+        i = self.nearest_index(diameter)
+        params = {name: float(self.columns[name][i]) for name in NUMERIC_COLUMNS}
+        params["diameter"] = self.diameters[i]
+        params["cycle"] = str(self.columns["cycle"][i])
+        if interpolate:
+            for name in NUMERIC_COLUMNS:
+                params[name] = float(np.interp(diameter, self.columns["diameter"], self.columns[name]))
+            params["diameter"] = diameter
+        return params
+
+    def lookup_many(self, diameters):
+        """Nearest-tool parameters for an array of diameters, as a dict of arrays."""
+        import numpy as np
+        diameters = np.asarray(diameters, dtype=float)
+        table = self.columns["diameter"]
+        right = np.clip(np.searchsorted(table, diameters), 1, len(table) - 1) if len(table) > 1 else np.zeros(diameters.shape, dtype=int)
+        left = np.maximum(right - 1, 0)
+        index = np.where(np.abs(table[right] - diameters) < np.abs(diameters - table[left]), right, left)
+        return {name: column[index] for name, column in self.columns.items()}
+
+class DrillLibrary:
+    """
+    Drill parameter tables (Drill_bit_param.csv / .xls) indexed by material and diameter.
+
+    The sheet is parsed once and saved as a NumPy .npz next to the other caches;
+    later starts load the binary file unless the source file changed.
+    """
+    def __init__(self, tables):
+        self.tables = tables
+
+    @classmethod
+    def load(cls, source_path=DRILL_PARAMS_PATH, cache_path=DRILL_CACHE_PATH):
+        import numpy as np
+        stamp = cls._source_stamp(source_path)
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with np.load(cache_path, allow_pickle=False) as data:
+                    if data["source_stamp"].tolist() == stamp:
+                        return cls.from_arrays(data)
+            except (OSError, KeyError, ValueError) as e:
+                print(f"Drill parameter cache ignored: {e}")
+        library = cls({name: DrillTable.from_rows(rows) for name, rows in parse_rows(read_source(source_path)).items() if rows})
+        if cache_path: library.save_cache(cache_path, stamp)
+        return library
+
+    @staticmethod
+    def _source_stamp(path):
+        st = os.stat(path)
+        return [os.path.abspath(path), str(st.st_mtime_ns), str(st.st_size)]
+
+    @classmethod
+    def from_arrays(cls, data):
+        materials = data["materials"].tolist()
+        return cls({material: DrillTable({name: data[f"{i}:{name}"] for name in COLUMNS}) for i, material in enumerate(materials)})
+
+    def save_cache(self, cache_path, stamp):
+        import numpy as np
+        arrays = {"source_stamp": np.array(stamp), "materials": np.array(self.materials())}
+        for i, material in enumerate(self.materials()):
+            for name, column in self.tables[material].columns.items():
+                arrays[f"{i}:{name}"] = column
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "wb") as f:
+                np.savez(f, **arrays)
+        except OSError as e:
+            print(f"Could not write drill parameter cache: {e}")
+
+    def materials(self):
+        return list(self.tables)
+
+    def table(self, material):
+        """The table of material; an unknown material raises instead of borrowing another material's parameters."""
+        if material not in self.tables: raise ValueError(f"No drill parameters for material '{material}'")
+        return self.tables[material]
+
+    def lookup(self, material, diameter, interpolate=False):
+        return self.table(material).lookup(diameter, interpolate)
+
+    def lookup_many(self, material, diameters):
+        return self.table(material).lookup_many(diameters)
+
+_library = None
+
+def get_library():
+    """The drill library shared by the whole process, loaded on first use."""
+    global _library
+    if _library is None:
+        _library = DrillLibrary.load()
+    return _library
@@ -0,0 +1,216 @@
+# File: gcode_time.py
+"""
+Streaming G-code machining-time estimator.
+
+    summary = estimate_file("part.nc", rapid_rate=5000)
+    summary.total_minutes, summary.tools[1].feed_minutes
+
+The program is read line by line, so memory use does not depend on file size.
+Supported: G00/G01/G02/G03 (XY/XZ/YZ planes, I/J/K or R arcs, helical moves),
+G04 dwell, G17/G18/G19, G20/G21, G90/G91, G94/G95, G81/G82/G83 with G98/G99
+and G80, F/S words, and T.. M06 tool changes. Times are accumulated per tool.
+Machine acceleration is ignored, so the result is a lower bound like the
+hand-entered estimates in the operation manager.
+"""
+import math
+import re
+
+WORD = re.compile(r'([A-Z])\s*([-+]?(?:\d+\.?\d*|\.\d+))')
+COMMENT = re.compile(r'\([^)]*\)|;.*')
+
+class ToolTime:
+    __slots__ = ("tool", "rapid_mm", "feed_mm", "rapid_minutes", "feed_minutes", "dwell_minutes", "holes")
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.rapid_mm = self.feed_mm = 0.0
+        self.rapid_minutes = self.feed_minutes = self.dwell_minutes = 0.0
+        self.holes = 0
+
+    @property
+    def minutes(self):
+        return self.rapid_minutes + self.feed_minutes + self.dwell_minutes
+
+class ProgramTime:
+    """Result of estimate_lines: per-tool times plus tool-change time."""
+    def __init__(self):
+        self.tools = {}
+        self.tool_changes = 0
+        self.tool_change_minutes = 0.0
+        self.lines = 0
+
+    def tool(self, number):
+        entry = self.tools.get(number)
+        if entry is None: entry = self.tools[number] = ToolTime(number)
+        return entry
+
+    @property
+    def total_minutes(self):
+        return sum(t.minutes for t in self.tools.values()) + self.tool_change_minutes
+
+def arc_length(start, end, centre, plane, clockwise):
+    """Length of a (possibly helical) arc in the given plane; a full circle when start == end."""
+    a, b, c = plane
+    r = math.hypot(start[a] - centre[0], start[b] - centre[1])
+    start_angle = math.atan2(start[b] - centre[1], start[a] - centre[0])
+    end_angle = math.atan2(end[b] - centre[1], end[a] - centre[0])
+    sweep = (start_angle - end_angle) if clockwise else (end_angle - start_angle)
+    sweep %= 2 * math.pi
+    if sweep < 1e-9: sweep = 2 * math.pi
+    return math.hypot(r * sweep, end[c] - start[c])
+
+def centre_from_radius(start, end, radius, plane, clockwise):
+    """Arc centre for an R-word arc (negative R selects the arc larger than 180 degrees)."""
+    a, b, _ = plane
+    dx, dy = end[a] - start[a], end[b] - start[b]
+    chord = math.hypot(dx, dy)
+    if chord < 1e-12: return start[a], start[b]
+    h = math.sqrt(max(radius * radius - chord * chord / 4, 0.0))
+    # ด้านของจุดศูนย์กลางขึ้นกับทิศทาง (CW/CCW) และเครื่องหมายของ R
+    if clockwise != (radius < 0): h = -h
+    mx, my = start[a] + dx / 2, start[b] + dy / 2
+    return mx - h * dy / chord, my + h * dx / chord
+
+PLANES = {17: (0, 1, 2), 18: (2, 0, 1), 19: (1, 2, 0)}
+
+def estimate_lines(lines, rapid_rate=5000.0, tool_change_minutes=0.1):
+    """Estimates machining time from an iterable of G-code lines (feeds in mm/min, rapid_rate in mm/min)."""
+    result = ProgramTime()
+    pos = [0.0, 0.0, 0.0]
+    motion, plane = 0, PLANES[17]
+    absolute, scale, per_rev = True, 1.0, False
+    feed, spindle = 0.0, 0.0
+    tool, pending_tool = 0, None
+    retract_initial = True
+    cycle = {"R": 0.0, "Z": 0.0, "Q": 0.0, "P": 0.0, "initial_z": 0.0}
+    current = result.tool(tool)
+
+    def move(target, rapid):
+        distance = math.dist(pos, target)
+        rate = rapid_rate if rapid else feed_rate()
+        if rapid:
+            current.rapid_mm += distance
+            current.rapid_minutes += distance / rate
+        else:
+            current.feed_mm += distance
+            current.feed_minutes += distance / rate if rate > 0 else 0.0
+        pos[:] = target
+
+    def feed_rate():
+        return feed * spindle if per_rev else feed
+
+    def drill_cycle(code):
+        r_plane, bottom = cycle["R"], cycle["Z"]
+        depth = max(r_plane - bottom, 0.0)
+        retract_z = cycle["initial_z"] if retract_initial else r_plane
+        rapid = abs(pos[2] - r_plane) + abs(retract_z - bottom)
+        if code == 83 and cycle["Q"] > 0 and depth > 0:
+            # ถอยออกไปที่ R แล้วกลับลงมาระหว่างทุก peck (สูตรเดียวกับ cycle_time.g83_rapid_distance)
+            retracts = max(math.ceil((depth - 1e-4) / cycle["Q"]) - 1, 0)
+            rapid += retracts * retracts * cycle["Q"]
+        rate = feed_rate()
+        current.rapid_mm += rapid
+        current.rapid_minutes += rapid / rapid_rate
+        current.feed_mm += depth
+        if rate > 0: current.feed_minutes += depth / rate
+        if code == 82: current.dwell_minutes += cycle["P"] / 60000.0
+        current.holes += 1
+        pos[2] = retract_z
+
+    for raw in lines:
+        result.lines += 1
+        line = raw.upper()
+        if '(' in line or ';' in line: line = COMMENT.sub('', line)
+        line = line.strip()
+        if not line or line[0] in '%/O': continue
+
+        words = {}
+        g_codes = m_codes = ()
+        feed_word = None
+        for letter, value in WORD.findall(line):
+            if letter == 'G': g_codes += (int(float(value)),)
+            elif letter == 'M': m_codes += (int(float(value)),)
+            elif letter == 'F': feed_word = float(value)
+            elif letter == 'S': spindle = float(value)
+            elif letter == 'T': pending_tool = int(float(value))
+            elif letter != 'N': words[letter] = float(value)
+
+        dwell = False
+        for g in g_codes:
+            if g <= 3: motion = g
+            elif g == 4: dwell = True
+            elif g in PLANES: plane = PLANES[g]
+            elif g == 20: scale = 25.4
+            elif g == 21: scale = 1.0
+            elif g == 90: absolute = True
+            elif g == 91: absolute = False
+            elif g == 94: per_rev = False
+            elif g == 95: per_rev = True
+            elif g == 98: retract_initial = True
+            elif g == 99: retract_initial = False
+            elif g == 80: motion = 0 if motion in (81, 82, 83) else motion
+            elif g in (81, 82, 83):
+                motion = g
+                cycle["initial_z"] = pos[2]
+        # F/X/Y/Z ของบรรทัดอ่านหลังจากใช้ G แบบ modal ของบรรทัดนั้นแล้ว (เช่น G20 F10 คือ 10 นิ้ว/นาที)
+        if feed_word is not None: feed = feed_word * scale
+
+        if pending_tool is not None and pending_tool != tool:
+            if 6 in m_codes:
+                result.tool_changes += 1
+                result.tool_change_minutes += tool_change_minutes
+                tool = pending_tool
+                current = result.tool(tool)
+            elif tool == 0 and not result.tool_changes:
+                # โปรแกรมที่ไม่มี M06 (เช่นตั้งเครื่องมือไว้แล้ว) ให้นับเวลาเข้าเครื่องมือที่เรียกไว้
+                tool = pending_tool
+                current = result.tool(tool)
+
+        if dwell:
+            if 'P' in words: current.dwell_minutes += words['P'] / 60000.0
+            elif 'X' in words: current.dwell_minutes += words['X'] / 60.0
+            continue
+        if not words: continue
+
+        x, y, z = words.get('X'), words.get('Y'), words.get('Z')
+        has_axis = x is not None or y is not None or z is not None
+        if motion >= 81:
+            for key in ('R', 'Q'):
+                if key in words: cycle[key] = words[key] * scale
+            if 'P' in words: cycle["P"] = words['P']
+            if z is not None: cycle["Z"] = z * scale if absolute else cycle["R"] + z * scale
+            if not has_axis and 'R' not in words: continue
+            z = None
+        elif not has_axis:
+            continue
+
+        if absolute:
+            target = [pos[0] if x is None else x * scale, pos[1] if y is None else y * scale, pos[2] if z is None else z * scale]
+        else:
+            target = [pos[0] + (x or 0.0) * scale, pos[1] + (y or 0.0) * scale, pos[2] + (z or 0.0) * scale]
+
+        if motion >= 81:
+            move(target, rapid=True)
+            drill_cycle(motion)
+        elif motion >= 2:
+            clockwise = motion == 2
+            if 'R' in words:
+                centre = centre_from_radius(pos, target, words['R'] * scale, plane, clockwise)
+            else:
+                offsets = (words.get('I', 0.0), words.get('J', 0.0), words.get('K', 0.0))
+                centre = (pos[plane[0]] + offsets[plane[0]] * scale, pos[plane[1]] + offsets[plane[1]] * scale)
+            length = arc_length(pos, target, centre, plane, clockwise)
+            rate = feed_rate()
+            current.feed_mm += length
+            if rate > 0: current.feed_minutes += length / rate
+            pos[:] = target
+        else:
+            move(target, rapid=motion == 0)
+
+    if not result.tools[0].minutes and len(result.tools) > 1: del result.tools[0]
+    return result
+
+def estimate_file(path, rapid_rate=5000.0, tool_change_minutes=0.1):
+    """Streams an NC file (.nc, .tap, ...) through estimate_lines."""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return estimate_lines(f, rapid_rate, tool_change_minutes)
@@ -0,0 +1,118 @@
+# File: history_page.py
+import tkinter as tk
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+import database
+from language_manager import lang
+
+class HistoryPage(tb.Frame):
+    """Browses saved quotes. Rows are loaded page by page as the list is scrolled."""
+    PAGE_SIZE = 100
+    SEARCH_DELAY_MS = 300
+
+    def __init__(self, parent, app):
+        super().__init__(parent, padding=15)
+        self.app = app
+        self.widgets = {}
+        self.last_id = None
+        self.has_more = False
+        self.search_job = None
+
+        search_frame = tb.Frame(self)
+        search_frame.pack(fill=X, pady=(0, 10))
+        self.widgets['search_label'] = tb.Label(search_frame, text=lang.get("history_search"))
+        self.widgets['search_label'].pack(side=LEFT, padx=(0, 5))
+        self.widgets['search_var'] = tk.StringVar()
+        self.widgets['search_var'].trace_add("write", self.schedule_search)
+        self.widgets['search_entry'] = tb.Entry(search_frame, textvariable=self.widgets['search_var'])
+        self.widgets['search_entry'].pack(side=LEFT, fill=X, expand=True)
+
+        table_frame = tb.Frame(self)
+        table_frame.pack(fill=BOTH, expand=True)
+        columns = self.history_columns()
+        self.widgets['tree'] = tb.Treeview(table_frame, columns=[val[0] for val in columns.values()], show='headings', bootstyle="primary")
+        for val in columns.values(): self.widgets['tree'].heading(val[0], text=val[0]); self.widgets['tree'].column(val[0], width=val[1], anchor=W)
+        self.widgets['tree'].pack(fill=BOTH, expand=True, side=LEFT)
+        self.widgets['scrollbar'] = tb.Scrollbar(table_frame, orient=VERTICAL, command=self.widgets['tree'].yview)
+        self.widgets['tree'].configure(yscroll=self.on_tree_scroll)
+        self.widgets['scrollbar'].pack(side=RIGHT, fill=Y)
+        self.widgets['tree'].bind("<Double-1>", self.open_selected_quote)
+
+        bottom_frame = tb.Frame(self)
+        bottom_frame.pack(fill=X, pady=(10, 0))
+        self.widgets['status_label'] = tb.Label(bottom_frame, text="", bootstyle="secondary")
+        self.widgets['status_label'].pack(side=LEFT)
+        self.widgets['open_btn'] = tb.Button(bottom_frame, text=lang.get("history_open_btn"), bootstyle="primary", command=self.open_selected_quote)
+        self.widgets['open_btn'].pack(side=RIGHT)
+        # สถานะงาน: งานที่ accepted/open ถูกนำไปคำนวณ lead time ของใบเสนอราคาใหม่
+        self.widgets['status_btn'] = tb.Button(bottom_frame, text=lang.get("history_set_status_btn"), bootstyle="secondary-outline", command=self.set_selected_status)
+        self.widgets['status_btn'].pack(side=RIGHT, padx=(0, 10))
+        self.widgets['status_combo'] = tb.Combobox(bottom_frame, state="readonly", width=14, values=self.status_names())
+        self.widgets['status_combo'].current(1)
+        self.widgets['status_combo'].pack(side=RIGHT, padx=(0, 5))
+
+    def history_columns(self):
+        return {"col_quote_id": (lang.get("col_quote_id"), 140), "col_date": (lang.get("col_date"), 140), "col_job": (lang.get("col_job"), 250), "col_customer": (lang.get("col_customer"), 220), "col_quantity": (lang.get("col_quantity"), 80), "col_total_price": (lang.get("col_total_price"), 120), "col_status": (lang.get("col_status"), 100)}
+
+    def status_names(self):
+        return [lang.get(f"quote_status_{status}") for status in database.QUOTE_STATUSES]
+
+    def on_show(self):
+        """Called by MainApp when the page is raised; picks up newly saved quotes."""
+        self.reload()
+
+    def update_language(self):
+        self.widgets['search_label'].config(text=lang.get("history_search"))
+        self.widgets['open_btn'].config(text=lang.get("history_open_btn"))
+        self.widgets['status_btn'].config(text=lang.get("history_set_status_btn"))
+        selected = self.widgets['status_combo'].current()
+        self.widgets['status_combo']['values'] = self.status_names()
+        self.widgets['status_combo'].current(selected)
+        for i, val in enumerate(self.history_columns().values()): self.widgets['tree'].heading(i, text=val[0])
+        self.update_status()
+
+    def schedule_search(self, *args):
+        """Debounces typing so the database is queried once the user pauses."""
+        if self.search_job: self.after_cancel(self.search_job)
+        self.search_job = self.after(self.SEARCH_DELAY_MS, self.reload)
+
+    def reload(self):
+        self.search_job = None
+        tree = self.widgets['tree']
+        tree.delete(*tree.get_children())
+        self.last_id = None
+        self.has_more = True
+        self.load_next_page()
+
+    def load_next_page(self):
+        if not self.has_more: return
+        rows = database.search_quotes(self.widgets['search_var'].get(), before_id=self.last_id, limit=self.PAGE_SIZE)
+        tree = self.widgets['tree']
+        for row in rows:
+            tree.insert('', END, iid=str(row['id']), values=(row['quote_id'] or "", row['created_at'], row['job_name'], row['customer_name'], row['quantity'] or "", f"{row['final_price'] or 0:,.2f}", lang.get(f"quote_status_{row['status']}")))
+        self.has_more = len(rows) == self.PAGE_SIZE
+        if rows: self.last_id = rows[-1]['id']
+        self.update_status()
+
+    def on_tree_scroll(self, first, last):
+        self.widgets['scrollbar'].set(first, last)
+        if self.has_more and float(last) >= 0.95:
+            self.after_idle(self.load_next_page)
+
+    def update_status(self):
+        self.widgets['status_label'].config(text=lang.get("history_loaded", count=len(self.widgets['tree'].get_children())))
+
+    def open_selected_quote(self, event=None):
+        selection = self.widgets['tree'].selection()
+        if not selection: return
+        quote = database.get_quote(int(selection[0]))
+        if quote:
+            self.app.pages["quoting"].load_quote(quote)
+            self.app.show_page("quoting")
+
+    def set_selected_status(self):
+        status = database.QUOTE_STATUSES[self.widgets['status_combo'].current()]
+        tree = self.widgets['tree']
+        for iid in tree.selection():
+            database.set_quote_status(int(iid), status)
+            tree.set(iid, len(self.history_columns()) - 1, lang.get(f"quote_status_{status}"))
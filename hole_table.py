@@ -0,0 +1,112 @@
+# File: hole_table.py
+"""
+Hole-table import for the drilling operation manager.
+
+A hole table has one row per hole group: diameter, depth, count and optionally
+the cycle (G81/G82/G83). It can come from a CSV/Excel file, from a range pasted
+out of a spreadsheet (tab separated) or from a plain list of row tuples. Speeds,
+feeds and peck depths come from the drill library, and every row is timed in
+one vectorized cycle_time call.
+"""
+from cycle_time import CYCLES, drilling_cycle_time
+from drill_library import get_library, read_source
+
+FIELDS = ("diameter", "depth", "count", "cycle")
+HEADER_ALIASES = {
+    "diameter": ("diameter", "dia", "d", "tool diameter", "ø", "ขนาด", "เส้นผ่านศูนย์กลาง"),
+    "depth": ("depth", "z", "ความลึก"),
+    "count": ("count", "qty", "holes", "quantity", "n", "จำนวน"),
+    "cycle": ("cycle", "gcode", "g-code", "g code"),
+}
+
+def _is_number(text):
+    try:
+        float(str(text).replace(",", "").strip())
+        return True
+    except ValueError:
+        return False
+
+def _is_header(row):
+    """
+    True when the row names columns: any cell is a known header name, or a cell
+    in the diameter/depth/count positions is text rather than a number.
+    """
+    names = [str(cell or "").strip().lower() for cell in row]
+    if any(name in aliases for name in names for aliases in HEADER_ALIASES.values()): return True
+    return any(name and not _is_number(name) for name in names[:FIELDS.index("cycle")])
+
+def _column_map(header):
+    names = [str(cell or "").strip().lower() for cell in header]
+    mapping = {}
+    for field, aliases in HEADER_ALIASES.items():
+        for index, name in enumerate(names):
+            if name in aliases:
+                mapping[field] = index
+                break
+    if "diameter" not in mapping or "depth" not in mapping:
+        raise ValueError("Hole table needs 'diameter' and 'depth' columns")
+    return mapping
+
+def parse_hole_rows(rows):
+    """
+    Turns raw rows into [{"diameter", "depth", "count", "cycle"}].
+    A first row that names its columns (see _is_header) is read as a header;
+    otherwise columns are taken in FIELDS order. Blank rows are skipped; count defaults to 1 and the
+    cycle to the one in the drill table.
+    """
+    rows = [list(row) for row in rows if any(str(cell or "").strip() for cell in row)]
+    if not rows: return []
+    mapping = {field: i for i, field in enumerate(FIELDS)}
+    if _is_header(rows[0]):
+        mapping = _column_map(rows[0])
+        rows = rows[1:]
+
+    def cell(row, field):
+        index = mapping.get(field)
+        if index is None or index >= len(row) or row[index] is None: return ""
+        return str(row[index]).strip()
+
+    holes = []
+    for line_no, row in enumerate(rows, start=1):
+        try:
+            hole = {
+                "diameter": float(cell(row, "diameter").replace(",", "")),
+                "depth": float(cell(row, "depth").replace(",", "")),
+                "count": int(float(cell(row, "count") or 1)),
+                "cycle": cell(row, "cycle").upper() or None,
+            }
+        except ValueError:
+            raise ValueError(f"Invalid number in hole table row {line_no}: {row}")
+        if hole["cycle"] and hole["cycle"] not in CYCLES:
+            raise ValueError(f"Unsupported cycle {hole['cycle']} in hole table row {line_no}")
+        holes.append(hole)
+    return holes
+
+def parse_pasted_text(text):
+    """Rows of a range pasted from a spreadsheet (tabs) or typed as CSV/semicolon lists."""
+    rows = []
+    for line in text.splitlines():
+        if not line.strip(): continue
+        separator = "\t" if "\t" in line else (";" if ";" in line else ",")
+        rows.append([cell.strip() for cell in line.split(separator)])
+    return parse_hole_rows(rows)
+
+def read_hole_file(path):
+    return parse_hole_rows(read_source(path))
+
+def time_hole_table(holes, material, rapid=5000.0, dwell_ms=500.0, library=None):
+    """
+    Looks up S/F/Q for every hole group and times all of them in one pass.
+    Returns the holes with "rpm", "feed", "peck", "cycle" and "minutes" filled in.
+    """
+    import numpy as np
+    if not holes: return []
+    library = library or get_library()
+    diameters = np.array([hole["diameter"] for hole in holes], dtype=float)
+    params = library.lookup_many(material, diameters)
+    cycles = np.array([hole["cycle"] or str(default) for hole, default in zip(holes, params["cycle"])])
+    minutes = drilling_cycle_time(
+        cycles, np.array([hole["depth"] for hole in holes], dtype=float), params["F"], rapid,
+        np.array([hole["count"] for hole in holes], dtype=float), dwell_ms=dwell_ms, peck=params["Q"])
+    return [dict(hole, rpm=float(s), feed=float(f), peck=float(q), cycle=str(c), minutes=float(m))
+            for hole, s, f, q, c, m in zip(holes, params["S"], params["F"], params["Q"], cycles, minutes)]
@@ -1,31 +1,93 @@
 # File: language_manager.py (Updated)
+import glob
 import json
 import os
 from app_config import CONFIG_PATH, LANG_DIR
 
 class LanguageManager:
+    """
+    Translation catalogs for all languages, read once at start-up.
+
+    Every lang/*.json file is loaded and compiled into formatters up front, so
+    switching language never touches the disk. Plain strings are returned as they
+    are, templates use their bound str.format, and formatted results are memoized
+    per (key, arguments). Keys that are missing in the current language are
+    collected for missing_report() instead of passing unnoticed.
+    """
+    MEMO_LIMIT = 4096
+
     def __init__(self):
-        self.lang_code = self.load_language_setting()
+        self.catalogs = {}
+        self.compiled = {}
+        self.memo = {}
+        self.missing = {}
+        self.load_all_catalogs()
+        self.saved_lang_code = self.load_language_setting()
+        self.lang_code = None
         self.data = {}
-        self.load_language_data(self.lang_code)
+        self.load_language_data(self.saved_lang_code)
 
-    def load_language_data(self, lang_code):
-        # ใช้ LANG_DIR ที่ import เข้ามา
-        filepath = os.path.join(LANG_DIR, f'{lang_code}.json') 
+    def load_all_catalogs(self):
+        for filepath in sorted(glob.glob(os.path.join(LANG_DIR, '*.json'))):
+            self.load_catalog(os.path.splitext(os.path.basename(filepath))[0], filepath)
+
+    def load_catalog(self, lang_code, filepath=None):
+        filepath = filepath or os.path.join(LANG_DIR, f'{lang_code}.json')
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
-            self.lang_code = lang_code
-            print(f"Loaded language data: {lang_code}")
+                catalog = json.load(f)
         except FileNotFoundError:
             print(f"Language file not found: {filepath}")
+            return False
+        self.catalogs[lang_code] = catalog
+        # ข้อความที่ไม่มี {} คืนค่าตรง ๆ ได้เลย ที่มีให้เก็บ str.format ไว้เรียกซ้ำ
+        self.compiled[lang_code] = {key: (text.format if isinstance(text, str) and '{' in text else None) for key, text in catalog.items()}
+        return True
+
+    def load_language_data(self, lang_code):
+        if lang_code == self.lang_code: return
+        if lang_code not in self.catalogs and not self.load_catalog(lang_code):
             self.data = {}
+            return
+        self.data = self.catalogs[lang_code]
+        self.lang_code = lang_code
+        self.memo.clear()
+        print(f"Loaded language data: {lang_code}")
 
-    def get(self, key, **kwargs):
-        template = self.data.get(key, f'<{key}>')
+    def get(self, key, default=None, **kwargs):
         if kwargs:
-            return template.format(**kwargs)
-        return template
+            try:
+                memo_key = (key, default, frozenset(kwargs.items()))
+                result = self.memo.get(memo_key)
+                if result is not None: return result
+            except TypeError:
+                memo_key = None
+        template = self.data.get(key)
+        if template is None:
+            self.missing[key] = self.missing.get(key, 0) + 1
+            if self.missing[key] == 1: print(f"Missing translation '{key}' ({self.lang_code})")
+            template = f'<{key}>' if default is None else default
+            formatter = template.format if '{' in template else None
+        else:
+            formatter = self.compiled[self.lang_code].get(key)
+        if not kwargs or formatter is None:
+            return template
+        result = formatter(**kwargs)
+        if memo_key is not None:
+            if len(self.memo) >= self.MEMO_LIMIT: self.memo.clear()
+            self.memo[memo_key] = result
+        return result
+
+    def missing_report(self):
+        """
+        Keys requested at run time that the current language lacks (with request
+        counts), and for every catalog the keys other catalogs have but it does not.
+        """
+        all_keys = set().union(*self.catalogs.values()) if self.catalogs else set()
+        return {
+            "requested": dict(sorted(self.missing.items())),
+            "catalogs": {code: sorted(all_keys - set(catalog)) for code, catalog in self.catalogs.items()},
+        }
 
     def load_language_setting(self):
         """โหลดค่าภาษาที่บันทึกไว้จาก config.json"""
@@ -38,11 +100,13 @@ class LanguageManager:
             return 'th'
 
     def save_language_setting(self, lang_code):
-        """บันทึกค่าภาษาลงใน config.json"""
+        """บันทึกค่าภาษาลงใน config.json (ข้ามถ้าค่าเดิมไม่เปลี่ยน)"""
+        if lang_code == self.saved_lang_code: return
         # ใช้ CONFIG_PATH ที่ import เข้ามา
-        with open(CONFIG_PATH, 'w', encoding='utf-8') as f: 
+        with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
             json.dump({'language': lang_code}, f, indent=4)
+        self.saved_lang_code = lang_code
         print(f"Language setting saved: {lang_code}")
 
 # สร้าง instance กลาง
-lang = LanguageManager()
\ No newline at end of file
+lang = LanguageManager()
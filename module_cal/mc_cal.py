@@ -4,11 +4,24 @@ from tkinter import ttk
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from tkinter import messagebox
+from tkinter import filedialog
 import database
 import math
+import os
+from concurrent.futures import ThreadPoolExecutor
 from language_manager import lang
+from tree_view_model import TreeViewModel
+from cycle_time import drilling_cycle_time
+from drill_library import get_library
+import hole_table
+import gcode_time
+import wire_edm
+import time_models
 
 class OperationManagerWindow(tb.Toplevel):
+    # อ่านไฟล์ NC ขนาดใหญ่ใน thread แยก ไม่ให้หน้าต่างค้าง
+    _nc_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nc-estimate")
+
     def __init__(self, parent, target_entry, lang_manager):
         super().__init__(parent)
         self.lang = lang_manager
@@ -46,12 +59,19 @@ class OperationManagerWindow(tb.Toplevel):
         scrollbar = tb.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
         self.tree.configure(yscroll=scrollbar.set)
         scrollbar.pack(side=RIGHT, fill=tk.Y)
+        self.tree_view = TreeViewModel(self.tree)
 
         control_frame = tb.Frame(self)
         control_frame.pack(padx=10, pady=10, fill=X)
         
         delete_button = tb.Button(control_frame, text=self.lang.get("op_manager_delete_button"), command=self.delete_operation, bootstyle="danger")
         delete_button.pack(side=LEFT, padx=5)
+        import_button = tb.Button(control_frame, text=self.lang.get("hole_import_file_btn"), command=self.import_hole_file, bootstyle="info-outline")
+        import_button.pack(side=LEFT, padx=5)
+        paste_button = tb.Button(control_frame, text=self.lang.get("hole_paste_btn"), command=self.paste_hole_table, bootstyle="info-outline")
+        paste_button.pack(side=LEFT, padx=5)
+        self.nc_button = tb.Button(control_frame, text=self.lang.get("nc_import_btn"), command=self.import_nc_program, bootstyle="info-outline")
+        self.nc_button.pack(side=LEFT, padx=5)
         
         self.total_time_label = tb.Label(control_frame, text=self.lang.get("op_manager_total_time", hours=0), font=("Helvetica", 12, "bold"))
         self.total_time_label.pack(side=RIGHT, padx=5)
@@ -60,19 +80,45 @@ class OperationManagerWindow(tb.Toplevel):
         apply_button.pack(padx=10, pady=(0,10), fill=X, ipady=10)
 
     def create_detailed_drill_form(self, parent_frame):
-        self.drill_gcode_combo = self.create_input_row(parent_frame, self.lang.get("gcode_select"), "", 0, is_combo=True)
+        # เลือกวัสดุ + ขนาดดอกสว่าน แล้วเติม S/F/Q/cycle จากตาราง Drill_bit_param ให้อัตโนมัติ
+        self.drill_material_combo = self.create_input_row(parent_frame, self.lang.get("drill_material_input"), "", 0, is_combo=True)
+        self.drill_diameter = self.create_input_row(parent_frame, self.lang.get("drill_diameter_input"), "", 1)
+        try:
+            self.drill_material_combo['values'] = get_library().materials()
+            self.drill_material_combo.current(0)
+        except (OSError, ValueError) as e:
+            print(f"Drill parameter table not loaded: {e}")
+        self.drill_material_combo.bind("<<ComboboxSelected>>", self.fill_from_drill_table)
+        self.drill_diameter.bind("<Return>", self.fill_from_drill_table)
+        self.drill_diameter.bind("<FocusOut>", self.fill_from_drill_table)
+
+        self.drill_gcode_combo = self.create_input_row(parent_frame, self.lang.get("gcode_select"), "", 2, is_combo=True)
         self.drill_gcode_combo['values'] = ['G81', 'G82', 'G83']
         self.drill_gcode_combo.current(0)
         self.drill_gcode_combo.bind("<<ComboboxSelected>>", self.on_gcode_selected)
-        self.drill_depth = self.create_input_row(parent_frame, self.lang.get("depth_input"), "10", 1)
-        self.drill_rpm = self.create_input_row(parent_frame, self.lang.get("rpm_input"), "1500", 2)
-        self.drill_feed_rate_per_min = self.create_input_row(parent_frame, self.lang.get("feedg01_input"), "150", 3)
-        self.drill_rapid_feed = self.create_input_row(parent_frame, self.lang.get("feedg00_input"), "5000", 4)
-        self.drill_hole_count = self.create_input_row(parent_frame, self.lang.get("hole_count_input"), "1", 5)
-        self.dwell_row, self.drill_dwell = self.create_input_row(parent_frame, self.lang.get("dwell_input"), "500", 6, return_full_row=True)
-        self.peck_row, self.drill_peck = self.create_input_row(parent_frame, self.lang.get("peck_input"), "3", 7, return_full_row=True)
+        self.drill_depth = self.create_input_row(parent_frame, self.lang.get("depth_input"), "10", 3)
+        self.drill_rpm = self.create_input_row(parent_frame, self.lang.get("rpm_input"), "1500", 4)
+        self.drill_feed_rate_per_min = self.create_input_row(parent_frame, self.lang.get("feedg01_input"), "150", 5)
+        self.drill_rapid_feed = self.create_input_row(parent_frame, self.lang.get("feedg00_input"), "5000", 6)
+        self.drill_hole_count = self.create_input_row(parent_frame, self.lang.get("hole_count_input"), "1", 7)
+        self.dwell_row, self.drill_dwell = self.create_input_row(parent_frame, self.lang.get("dwell_input"), "500", 8, return_full_row=True)
+        self.peck_row, self.drill_peck = self.create_input_row(parent_frame, self.lang.get("peck_input"), "3", 9, return_full_row=True)
         self.on_gcode_selected()
 
+    def fill_from_drill_table(self, event=None):
+        material = self.drill_material_combo.get()
+        try:
+            diameter = float(self.drill_diameter.get())
+            params = get_library().lookup(material, diameter)
+        except (ValueError, KeyError, OSError):
+            return
+        for entry, value in ((self.drill_rpm, params['S']), (self.drill_feed_rate_per_min, params['F']), (self.drill_peck, params['Q'])):
+            entry.delete(0, END)
+            entry.insert(0, f"{value:g}")
+        if params['cycle'] in self.drill_gcode_combo['values']:
+            self.drill_gcode_combo.set(params['cycle'])
+            self.on_gcode_selected()
+
     def on_gcode_selected(self, event=None):
         selected_gcode = self.drill_gcode_combo.get()
         if selected_gcode == 'G81': self.dwell_row.grid_remove(); self.peck_row.grid_remove()
@@ -99,31 +145,21 @@ class OperationManagerWindow(tb.Toplevel):
             count = int(self.drill_hole_count.get())
             if feed_per_min == 0 or rapid_feed_rate == 0: raise ZeroDivisionError("Feed rate cannot be zero")
             
-            feed_time_per_hole_min = depth / feed_per_min
             total_time_min = 0; description = ""
 
             if gcode == 'G81':
-                total_time_min = feed_time_per_hole_min * count
+                total_time_min = drilling_cycle_time('G81', depth, feed_per_min, rapid_feed_rate, count)
                 description = self.lang.get("desc_g81", count=count, depth=depth, feed=feed_per_min)
             elif gcode == 'G82':
                 dwell_ms = float(self.drill_dwell.get())
-                dwell_time_min = dwell_ms / (1000 * 60)
-                total_time_min = (feed_time_per_hole_min + dwell_time_min) * count
+                total_time_min = drilling_cycle_time('G82', depth, feed_per_min, rapid_feed_rate, count, dwell_ms=dwell_ms)
                 description = self.lang.get("desc_g82", count=count, depth=depth, dwell=dwell_ms)
             elif gcode == 'G83':
                 peck_depth_q = float(self.drill_peck.get())
                 if peck_depth_q <= 0: raise ValueError("Peck Depth must be > 0")
-                total_rapid_dist, current_drilled_depth, depth_remaining = 0, 0, depth
-                while depth_remaining > 1e-4:
-                    peck = min(peck_depth_q, depth_remaining)
-                    depth_after_peck = current_drilled_depth + peck
-                    depth_remaining -= peck
-                    if depth_remaining > 1e-4:
-                        total_rapid_dist += depth_after_peck + current_drilled_depth
-                    current_drilled_depth = depth_after_peck
-                rapid_time_min = total_rapid_dist / rapid_feed_rate
-                total_time_min = (feed_time_per_hole_min + rapid_time_min) * count
+                total_time_min = drilling_cycle_time('G83', depth, feed_per_min, rapid_feed_rate, count, peck=peck_depth_q)
                 description = self.lang.get("desc_g83", count=count, depth=depth, peck=peck_depth_q)
+            total_time_min = float(total_time_min)
             
             self.op_counter += 1
             self.operations.append({"id": self.op_counter, "desc": description, "time": total_time_min})
@@ -131,16 +167,84 @@ class OperationManagerWindow(tb.Toplevel):
         except (ValueError, ZeroDivisionError) as e:
             messagebox.showerror(self.lang.get("error_title"), self.lang.get("error_numeric_only") + f"\n({e})")
             
+    def import_hole_file(self):
+        filepath = filedialog.askopenfilename(parent=self, title=self.lang.get("import_file_title"), filetypes=[("CSV / Excel", "*.csv *.xlsx *.xls"), ("All files", "*.*")])
+        if not filepath: return
+        try:
+            holes = hole_table.read_hole_file(filepath)
+        except (OSError, ValueError, ImportError) as e:
+            messagebox.showerror(self.lang.get("error_title"), str(e), parent=self)
+            return
+        self.add_hole_table(holes)
+
+    def paste_hole_table(self):
+        """Imports a range copied from a spreadsheet (diameter, depth, count, cycle) from the clipboard."""
+        try:
+            holes = hole_table.parse_pasted_text(self.clipboard_get())
+        except (tk.TclError, ValueError) as e:
+            messagebox.showerror(self.lang.get("error_title"), str(e), parent=self)
+            return
+        self.add_hole_table(holes)
+
+    def add_hole_table(self, holes):
+        """Times every hole group in one pass (feeds from the drill table) and adds them as operations."""
+        try:
+            rapid_feed_rate = float(self.drill_rapid_feed.get())
+            dwell_ms = float(self.drill_dwell.get())
+            timed = hole_table.time_hole_table(holes, self.drill_material_combo.get(), rapid_feed_rate, dwell_ms)
+        except (ValueError, KeyError, OSError, ZeroDivisionError) as e:
+            messagebox.showerror(self.lang.get("error_title"), self.lang.get("error_numeric_only") + f"\n({e})", parent=self)
+            return
+        for hole in timed:
+            self.op_counter += 1
+            description = self.lang.get("desc_hole_row", diameter=hole['diameter'], cycle=hole['cycle'], count=hole['count'],
+                                        depth=hole['depth'], rpm=hole['rpm'], feed=hole['feed'])
+            self.operations.append({"id": self.op_counter, "desc": description, "time": hole['minutes']})
+        self.refresh_table()
+        messagebox.showinfo(self.lang.get("success_title"), self.lang.get("import_success", count=len(timed)), parent=self)
+
+    def import_nc_program(self):
+        filepath = filedialog.askopenfilename(parent=self, title=self.lang.get("import_file_title"), filetypes=[("NC program", "*.nc *.tap *.ngc *.cnc *.txt"), ("All files", "*.*")])
+        if not filepath: return
+        try:
+            rapid_feed_rate = float(self.drill_rapid_feed.get())
+            if rapid_feed_rate <= 0: raise ZeroDivisionError("Feed rate cannot be zero")
+        except (ValueError, ZeroDivisionError) as e:
+            messagebox.showerror(self.lang.get("error_title"), self.lang.get("error_numeric_only") + f"\n({e})", parent=self)
+            return
+        self.nc_button.config(state=DISABLED)
+        future = self._nc_executor.submit(gcode_time.estimate_file, filepath, rapid_feed_rate)
+        self.after(100, self.poll_nc_program, future, os.path.basename(filepath))
+
+    def poll_nc_program(self, future, filename):
+        if not self.winfo_exists(): return
+        if not future.done():
+            self.after(100, self.poll_nc_program, future, filename)
+            return
+        self.nc_button.config(state=NORMAL)
+        try:
+            program = future.result()
+        except (OSError, ValueError) as e:
+            messagebox.showerror(self.lang.get("error_title"), str(e), parent=self)
+            return
+        for tool in program.tools.values():
+            self.op_counter += 1
+            description = self.lang.get("desc_nc_tool", file=filename, tool=tool.tool, feed_mm=tool.feed_mm, rapid_mm=tool.rapid_mm, holes=tool.holes)
+            self.operations.append({"id": self.op_counter, "desc": description, "time": tool.minutes})
+        if program.tool_changes:
+            self.op_counter += 1
+            description = self.lang.get("desc_nc_tool_changes", file=filename, count=program.tool_changes)
+            self.operations.append({"id": self.op_counter, "desc": description, "time": program.tool_change_minutes})
+        self.refresh_table()
+
     def delete_operation(self):
-        if not self.tree.selection(): return
-        ids_to_delete = {int(self.tree.item(item, 'values')[0]) for item in self.tree.selection()}
+        ids_to_delete = set(self.tree_view.selected_keys())
+        if not ids_to_delete: return
         self.operations = [op for op in self.operations if op["id"] not in ids_to_delete]
         self.refresh_table()
 
     def refresh_table(self):
-        for item in self.tree.get_children(): self.tree.delete(item)
-        for op in self.operations:
-            self.tree.insert('', tk.END, values=(op['id'], op['desc'], f"{op['time']:.3f}"))
+        self.tree_view.sync((op['id'], (op['id'], op['desc'], f"{op['time']:.3f}")) for op in self.operations)
         self.update_total_time()
         
     def update_total_time(self):
@@ -160,7 +264,7 @@ class WireEdmCalculatorDialog(tb.Toplevel):
         super().__init__(parent)
         self.lang = lang_manager
         self.title(self.lang.get("wire_edm_calc_title"))
-        self.geometry("500x450")
+        self.geometry("500x600")
         
         self.target_entry = target_entry
         all_settings = database.get_settings()
@@ -177,13 +281,14 @@ class WireEdmCalculatorDialog(tb.Toplevel):
         tb.Label(main_frame, text=self.lang.get("calc_method"), font="-size 12").pack(anchor=W)
         self.calc_method_var = tk.StringVar(value=self.lang.get("method_hours"))
         
-        method_values = [self.lang.get("method_hours"), self.lang.get("method_sqmm")]
+        method_values = [self.lang.get("method_hours"), self.lang.get("method_sqmm"), self.lang.get("method_contours")]
         method_combo = tb.Combobox(main_frame, textvariable=self.calc_method_var, values=method_values, bootstyle="info")
         method_combo.pack(fill=X, pady=(5, 15))
         method_combo.bind("<<ComboboxSelected>>", self.toggle_forms)
 
         self.hour_form = tb.Frame(main_frame)
         self.area_form = tb.Frame(main_frame)
+        self.contour_form = tb.Frame(main_frame)
         
         tb.Label(self.hour_form, text=self.lang.get("hours_input")).pack(anchor=W, pady=2)
         self.widgets['hours'] = tb.Entry(self.hour_form, bootstyle="info")
@@ -199,23 +304,43 @@ class WireEdmCalculatorDialog(tb.Toplevel):
 
         tb.Label(self.area_form, text=self.lang.get("price_per_sqmm", rate=self.sqmm_rate), bootstyle="secondary").pack(anchor=W, pady=5)
 
+        # หลายคอนทัวร์พร้อมกัน: ความยาว, ความหนา[, จำนวน skim[, วัสดุ]] บรรทัดละหนึ่งรูป
+        estimator = wire_edm.get_estimator()
+        tb.Label(self.contour_form, text=self.lang.get("wire_material_input")).pack(anchor=W, pady=2)
+        materials = estimator.materials()
+        self.widgets['material'] = tb.Combobox(self.contour_form, values=materials, bootstyle="info")
+        self.widgets['material'].set(wire_edm.DEFAULT_MATERIAL if wire_edm.DEFAULT_MATERIAL in materials else (materials or [""])[0])
+        self.widgets['material'].pack(fill=X)
+        tb.Label(self.contour_form, text=self.lang.get("wire_skims_input")).pack(anchor=W, pady=2)
+        self.widgets['skims'] = tb.Entry(self.contour_form, bootstyle="info")
+        self.widgets['skims'].insert(0, "0")
+        self.widgets['skims'].pack(fill=X)
+        tb.Label(self.contour_form, text=self.lang.get("wire_contours_input")).pack(anchor=W, pady=2)
+        self.widgets['contours'] = tk.Text(self.contour_form, height=8, width=40)
+        self.widgets['contours'].pack(fill=BOTH, expand=True)
+
         calc_button = tb.Button(main_frame, text=self.lang.get("calculate_and_apply"), bootstyle="success", command=self.calculate_and_apply)
         calc_button.pack(pady=20, fill=X, ipady=10)
         self.toggle_forms()
 
     def toggle_forms(self, event=None):
-        if self.calc_method_var.get() == self.lang.get("method_hours"):
-            self.area_form.pack_forget()
-            self.hour_form.pack(fill=X, expand=True)
-        else:
-            self.hour_form.pack_forget()
-            self.area_form.pack(fill=X, expand=True)
+        forms = {self.lang.get("method_hours"): self.hour_form, self.lang.get("method_sqmm"): self.area_form, self.lang.get("method_contours"): self.contour_form}
+        selected = forms.get(self.calc_method_var.get(), self.hour_form)
+        for form in forms.values():
+            if form is not selected: form.pack_forget()
+        selected.pack(fill=X, expand=True)
 
     def calculate_and_apply(self):
         try:
             final_hours = 0.0
-            if self.calc_method_var.get() == self.lang.get("method_hours"):
+            method = self.calc_method_var.get()
+            if method == self.lang.get("method_hours"):
                 final_hours = float(self.widgets['hours'].get())
+            elif method == self.lang.get("method_contours"):
+                contours = wire_edm.parse_contours(self.widgets['contours'].get("1.0", END))
+                if not contours: raise ValueError("No contours entered")
+                minutes = wire_edm.get_estimator().estimate_contours(contours, self.widgets['material'].get(), int(self.widgets['skims'].get() or 0))
+                final_hours = sum(minutes) / 60.0
             else:
                 length = float(self.widgets['length'].get())
                 thickness = float(self.widgets['thickness'].get())
@@ -228,4 +353,50 @@ class WireEdmCalculatorDialog(tb.Toplevel):
             self.target_entry.insert(0, f"{final_hours:.4f}")
             self.destroy()
         except (ValueError, TypeError, ZeroDivisionError) as e:
-            messagebox.showerror(self.lang.get("error_title"), self.lang.get("error_numeric_only") + f"\n({e})")
\ No newline at end of file
+            messagebox.showerror(self.lang.get("error_title"), self.lang.get("error_numeric_only") + f"\n({e})")
+
+class TimeModelDialog(tb.Toplevel):
+    """Generic calculator for any model in time_models; the form is built from the model's fields."""
+    def __init__(self, parent, target_entry, lang_manager, model_name=None):
+        super().__init__(parent)
+        self.lang = lang_manager
+        self.title(self.lang.get("time_model_title"))
+        self.geometry("500x600")
+        self.target_entry = target_entry
+        self.model = None
+        self.widgets = {}
+
+        main_frame = tb.Frame(self, padding=20)
+        main_frame.pack(fill=BOTH, expand=True)
+        tb.Label(main_frame, text=self.lang.get("time_model_select"), font="-size 12").pack(anchor=W)
+        self.model_names = time_models.available_models()
+        self.model_combo = tb.Combobox(main_frame, values=self.model_names, state="readonly", bootstyle="info")
+        self.model_combo.pack(fill=X, pady=(5, 15))
+        self.model_combo.bind("<<ComboboxSelected>>", self.build_form)
+        self.form = tb.Frame(main_frame)
+        self.form.pack(fill=BOTH, expand=True)
+
+        calc_button = tb.Button(main_frame, text=self.lang.get("calculate_and_apply"), bootstyle="success", command=self.calculate_and_apply)
+        calc_button.pack(pady=20, fill=X, ipady=10)
+        self.model_combo.set(model_name if model_name in self.model_names else self.model_names[0])
+        self.build_form()
+
+    def build_form(self, event=None):
+        for child in self.form.winfo_children(): child.destroy()
+        self.model = time_models.get_model(self.model_combo.get())
+        self.widgets = {}
+        for row_num, (field, label, default) in enumerate(self.model.fields):
+            tb.Label(self.form, text=label).grid(row=row_num, column=0, padx=5, pady=3, sticky=tk.W)
+            entry = tb.Entry(self.form, bootstyle="info", width=20)
+            entry.insert(0, f"{default:g}" if isinstance(default, float) else str(default))
+            entry.grid(row=row_num, column=1, padx=5, pady=3, sticky=tk.W)
+            self.widgets[field] = entry
+
+    def calculate_and_apply(self):
+        try:
+            minutes = self.model.estimate(**{field: entry.get().strip() for field, entry in self.widgets.items()})
+            self.target_entry.delete(0, END)
+            self.target_entry.insert(0, f"{minutes / 60.0:.4f}")
+            self.destroy()
+        except (ValueError, TypeError, ZeroDivisionError) as e:
+            messagebox.showerror(self.lang.get("error_title"), self.lang.get("error_numeric_only") + f"\n({e})", parent=self)
@@ -0,0 +1,100 @@
+# File: pdf_cache.py
+import hashlib
+import os
+import shutil
+import tempfile
+from app_config import PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES
+
+class PdfRenderCache:
+    """
+    Content-addressed cache of rendered quote PDFs on disk.
+
+    The key is a SHA-256 of the fully rendered quote HTML (quote_id and date
+    included, so a hit is always the very same document) plus the version (mtime
+    and size) of the template and stylesheet. A re-saved quote keeps its quote_id
+    and date (see stamp_quotes), so saving it again unchanged is a hit. A hit is served by copying the cached
+    file. Entries are touched on every hit; once the cache grows past max_bytes the
+    least recently used files are deleted down to LOW_WATER of it. The cache size
+    is tracked in memory, so the directory is only walked on the first store, when
+    the limit is crossed and every RESCAN_STORES stores (to count files written by
+    other processes). Files are written to a temp name and renamed, so several
+    worker processes can share the directory.
+    """
+    VERSION = 2
+    RESCAN_STORES = 200
+    LOW_WATER = 0.8
+
+    def __init__(self, cache_dir=PDF_CACHE_DIR, max_bytes=PDF_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.total_bytes = None
+        self.stores = 0
+
+    def key_for(self, renderer, html):
+        digest = hashlib.sha256(f"v{self.VERSION}".encode())
+        for path in (os.path.join(renderer.templates_dir, renderer.template_name), renderer.css_path):
+            st = os.stat(path)
+            digest.update(f"|{st.st_mtime_ns}:{st.st_size}".encode())
+        digest.update(html.encode('utf-8'))
+        return digest.hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.pdf')
+
+    def fetch(self, key, output_path):
+        """Copies the cached PDF for key to output_path; returns False on a miss."""
+        pdf_path = self.path_for(key)
+        try:
+            shutil.copyfile(pdf_path, output_path)
+            os.utime(pdf_path)
+        except OSError:
+            return False
+        return True
+
+    def store(self, key, pdf_file):
+        pdf_path = self.path_for(key)
+        try:
+            os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+            replaced = os.path.getsize(pdf_path) if os.path.exists(pdf_path) else 0
+            self._write_atomic(pdf_path, lambda tmp: shutil.copyfile(pdf_file, tmp))
+            self.stores += 1
+            if self.total_bytes is None or self.stores % self.RESCAN_STORES == 0:
+                self.evict()
+            else:
+                self.total_bytes += os.path.getsize(pdf_path) - replaced
+                if self.total_bytes > self.max_bytes: self.evict()
+        except OSError as e:
+            print(f"PDF cache store failed: {e}")
+
+    def _write_atomic(self, path, write):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp): os.remove(tmp)
+            raise
+
+    def evict(self):
+        """Deletes least recently used PDFs until the cache fits in LOW_WATER x max_bytes."""
+        entries, total = [], 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.pdf'): continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+                if total <= self.max_bytes * self.LOW_WATER: break
+        self.total_bytes = total
@@ -1,21 +1,170 @@
 # File: pdf_generator.py
+import io
 import os
-from jinja2 import Environment, FileSystemLoader
-from weasyprint import HTML, CSS
+import zipfile
 from datetime import datetime
 from app_config import TEMPLATES_DIR
 
-def create_quote_pdf(quote_data, output_path):
-    # --- ใช้ TEMPLATES_DIR ที่ import เข้ามา ---
-    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
-    template = env.get_template('quote_template.html')
-
-    quote_data['date'] = datetime.now().strftime("%d/%m/%Y")
-    quote_data['quote_id'] = f"QT-{datetime.now().strftime('%Y%m%d-%H%M')}"
-    
-    html_out = template.render(quote_data)
-    
-    css_path = os.path.join(TEMPLATES_DIR, 'style.css')
-    HTML(string=html_out).write_pdf(output_path, stylesheets=[CSS(css_path)])
-    
-    print(f"PDF successfully generated at: {output_path}")
\ No newline at end of file
+class QuoteRenderer:
+    """
+    Long-lived HTML/PDF renderer for quotes.
+
+    Keeps the Jinja2 environment (and so the compiled template), the parsed
+    stylesheet and WeasyPrint's font configuration between PDFs instead of
+    rebuilding them for every quote. With auto_reload the template and stylesheet
+    are re-read when their files change on disk (one stat() per render).
+    """
+    def __init__(self, templates_dir=TEMPLATES_DIR, template_name='quote_template.html', stylesheet_name='style.css', auto_reload=True):
+        # import ตอนสร้าง renderer ครั้งแรก เพราะ weasyprint/jinja2 ทำให้โปรแกรมเปิดช้า
+        from jinja2 import Environment, FileSystemLoader
+        try:
+            from weasyprint.text.fonts import FontConfiguration
+        except ImportError:
+            from weasyprint.fonts import FontConfiguration
+        self.templates_dir = templates_dir
+        self.template_name = template_name
+        self.css_path = os.path.join(templates_dir, stylesheet_name)
+        self.auto_reload = auto_reload
+        self.env = Environment(loader=FileSystemLoader(templates_dir), auto_reload=auto_reload)
+        self.font_config = FontConfiguration()
+        self._css = None
+        self._css_mtime = None
+
+    def stylesheet(self):
+        """The parsed style.css, parsed once (or again after the file changes)."""
+        from weasyprint import CSS
+        mtime = os.path.getmtime(self.css_path) if self.auto_reload or self._css is None else self._css_mtime
+        if self._css is None or mtime != self._css_mtime:
+            self._css = CSS(filename=self.css_path, font_config=self.font_config)
+            self._css_mtime = mtime
+        return self._css
+
+    def render_html(self, quote_data):
+        return self.env.get_template(self.template_name).render(quote_data)
+
+    def write_pdf(self, html, target=None):
+        """Lays out html and writes it to target (path or file object); returns bytes when target is None."""
+        from weasyprint import HTML
+        return HTML(string=html).write_pdf(target, stylesheets=[self.stylesheet()], font_config=self.font_config)
+
+    def render_document(self, html):
+        """Laid-out WeasyPrint Document for html (its pages can be combined with other documents)."""
+        from weasyprint import HTML
+        return HTML(string=html).render(stylesheets=[self.stylesheet()], font_config=self.font_config)
+
+_renderer = None
+
+def get_renderer():
+    """Renderer shared by every create_quote_pdf call in this process."""
+    global _renderer
+    if _renderer is None:
+        _renderer = QuoteRenderer()
+    return _renderer
+
+def stamp_quotes(quotes):
+    """
+    Gives the quotes without a quote_id a new, unique number from the database
+    sequence (one transaction for the whole list) and today's date to those
+    without one; a re-saved quote keeps the number and date it was issued with.
+    Call this in the main process before handing quotes to worker processes.
+    """
+    missing = [quote_data for quote_data in quotes if not quote_data.get('quote_id')]
+    if missing:
+        import database
+        for quote_data, quote_id in zip(missing, database.next_quote_ids(len(missing))):
+            quote_data['quote_id'] = quote_id
+    today = datetime.now().strftime("%d/%m/%Y")
+    for quote_data in quotes:
+        if not quote_data.get('date'): quote_data['date'] = today
+    return quotes
+
+_cache = None
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        from pdf_cache import PdfRenderCache
+        _cache = PdfRenderCache()
+    return _cache
+
+def create_quote_pdf(quote_data, output_path, use_cache=True):
+    """
+    Writes one quote PDF and returns the data it was rendered with. The caller's
+    dict is left untouched; a missing quote_id or date is filled in on a copy.
+    """
+    renderer = get_renderer()
+    quote_data = dict(quote_data)
+    if not quote_data.get('quote_id'):
+        import database
+        quote_data['quote_id'] = database.next_quote_id()
+    if not quote_data.get('date'):
+        quote_data['date'] = datetime.now().strftime("%d/%m/%Y")
+
+    # ใบเสนอราคาที่เนื้อหา (รวมเลขที่และวันที่) เหมือนเดิมทุกอย่าง คัดลอกไฟล์จากแคชแทนการ layout ใหม่
+    html_out = renderer.render_html(quote_data)
+    cache_key = get_cache().key_for(renderer, html_out) if use_cache else None
+    if cache_key and get_cache().fetch(cache_key, output_path):
+        print(f"PDF served from cache at: {output_path}")
+        return quote_data
+
+    renderer.write_pdf(html_out, output_path)
+    if cache_key: get_cache().store(cache_key, output_path)
+
+    print(f"PDF successfully generated at: {output_path}")
+    return quote_data
+
+# --- เอกสารหลายใบเสนอราคา (combined PDF / zip) ---
+def render_quote_bytes(quote_data):
+    renderer = get_renderer()
+    return renderer.write_pdf(renderer.render_html(quote_data))
+
+def render_quotes_bytes(quotes):
+    """One PDF (bytes) with the pages of all quotes, in order."""
+    renderer = get_renderer()
+    documents = [renderer.render_document(renderer.render_html(quote_data)) for quote_data in quotes]
+    pages = [page for document in documents for page in document.pages]
+    return documents[0].copy(pages).write_pdf()
+
+def write_quotes_zip(quotes, zip_path, executor=None):
+    """
+    Renders quotes into one zip archive, one PDF per quote named after its quote_id.
+    Each PDF is written into the archive as soon as it is rendered, so only the
+    PDFs in flight are held in memory. With an executor the rendering is spread
+    across its workers.
+    """
+    stamp_quotes(quotes)
+    render = executor.map if executor is not None else map
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as archive:
+        for quote_data, pdf_bytes in zip(quotes, render(render_quote_bytes, quotes)):
+            archive.writestr(f"{quote_data['quote_id']}.pdf", pdf_bytes)
+    print(f"{len(quotes)} PDFs written to: {zip_path}")
+    return quotes
+
+def require_pypdf():
+    """Raises RuntimeError when pypdf (needed to merge chunks into one PDF) is missing."""
+    try:
+        import pypdf  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Combined PDF output needs the 'pypdf' package (pip install pypdf); use the zip output instead") from None
+
+def write_quotes_combined(quotes, output_path, chunk_size=20, executor=None):
+    """
+    Renders quotes into a single PDF file.
+
+    Quotes are laid out chunk_size at a time and each chunk is appended to the
+    output with pypdf, so the WeasyPrint layout of only one chunk (per worker) is
+    alive at once. Requires pypdf (see require_pypdf); write_quotes_zip does not.
+    """
+    require_pypdf()
+    from pypdf import PdfReader, PdfWriter
+    stamp_quotes(quotes)
+
+    render = executor.map if executor is not None else map
+    chunks = [quotes[i:i + chunk_size] for i in range(0, len(quotes), chunk_size)]
+    writer = PdfWriter()
+    for pdf_bytes in render(render_quotes_bytes, chunks):
+        writer.append(PdfReader(io.BytesIO(pdf_bytes)))
+    with open(output_path, 'wb') as f:
+        writer.write(f)
+    print(f"PDF successfully generated at: {output_path}")
+    return quotes
@@ -0,0 +1,99 @@
+# File: pdf_worker.py
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+import pdf_generator
+
+class PdfRenderQueue:
+    """
+    Renders quote PDFs in a pool of worker processes so WeasyPrint layout never
+    runs on the Tk main thread.
+
+    Jobs are submitted with submit(); completion is detected by polling the futures
+    with after(), so every callback (on_done, on_error, progress listeners) runs on
+    the Tk thread and may touch widgets. Several quotes render at once, one per worker.
+    Pending jobs can be cancelled outright; a job that is already rendering is marked
+    cancelled and its output file is removed when the worker finishes.
+    """
+    POLL_MS = 100
+
+    def __init__(self, tk_widget, max_workers=None):
+        self.widget = tk_widget
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.executor = None
+        self.jobs = {}
+        self.job_ids = itertools.count(1)
+        self.listeners = []
+        self.poll_job = None
+        self.finished = 0
+
+    def add_listener(self, callback):
+        """callback(done, total, active) is called on the Tk thread whenever progress changes."""
+        self.listeners.append(callback)
+
+    def submit(self, quote_data, output_path, on_done=None, on_error=None):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        job_id = next(self.job_ids)
+        pdf_generator.stamp_quotes([quote_data])
+        future = self.executor.submit(pdf_generator.create_quote_pdf, quote_data, output_path)
+        self.jobs[job_id] = {"future": future, "output_path": output_path, "on_done": on_done, "on_error": on_error, "cancelled": False}
+        self.notify()
+        self.schedule_poll()
+        return job_id
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None: return
+        job["cancelled"] = True
+        job["future"].cancel()
+
+    def cancel_all(self):
+        for job_id in list(self.jobs): self.cancel(job_id)
+
+    def active_count(self):
+        return len(self.jobs)
+
+    def schedule_poll(self):
+        if self.poll_job is None:
+            self.poll_job = self.widget.after(self.POLL_MS, self.poll)
+
+    def poll(self):
+        self.poll_job = None
+        for job_id, job in list(self.jobs.items()):
+            future = job["future"]
+            if not future.done(): continue
+            del self.jobs[job_id]
+            self.finished += 1
+            if job["cancelled"] or future.cancelled():
+                self.discard_output(job)
+                continue
+            try:
+                result = future.result()
+            except CancelledError:
+                continue
+            except Exception as e:
+                if job["on_error"]: job["on_error"](e)
+                continue
+            if job["on_done"]: job["on_done"](result, job["output_path"])
+        self.notify()
+        if self.jobs: self.schedule_poll()
+        else: self.finished = 0
+
+    def discard_output(self, job):
+        future = job["future"]
+        if future.cancelled() or future.exception() is not None: return
+        try:
+            os.remove(job["output_path"])
+        except OSError:
+            pass
+
+    def notify(self):
+        active = len(self.jobs)
+        for callback in self.listeners: callback(self.finished, self.finished + active, active)
+
+    def shutdown(self):
+        self.cancel_all()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
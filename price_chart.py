@@ -0,0 +1,113 @@
+# File: price_chart.py
+import math
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+from language_manager import lang
+
+class PriceChart:
+    """
+    Pie chart of the price breakdown shown on the quoting page.
+
+    update() only records the latest data; the actual drawing happens once after
+    a short debounce, so bursts of calculate_price calls cost a single render.
+    Renders are skipped when the breakdown and labels have not changed, and when
+    the number of slices stays the same the existing wedges, percentages and legend
+    are updated in place and painted with draw_idle() instead of rebuilding the pie.
+
+    matplotlib is only imported when there is a breakdown to plot; until then the
+    placeholder is a plain label, which keeps it off the start-up path.
+    """
+    DELAY_MS = 120
+    COLORS = ['#17A2B8', '#FFC107', '#28A745']
+    START_ANGLE = 90
+    PCT_DISTANCE = 0.85
+
+    def __init__(self, master, font_loader):
+        self.master = master
+        self.font_loader = font_loader
+        self.font = None
+        self.axes = None
+        self.canvas = None
+        self.placeholder = tb.Label(master, text=lang.get('chart_placeholder'), font=("Helvetica", 14), bootstyle="secondary", anchor=CENTER)
+        self.placeholder.pack(side=TOP, fill=BOTH, expand=True)
+        self.pending = None
+        self.job = None
+        self.shown_key = None
+        self.wedges, self.autotexts, self.legend = [], [], None
+
+    def update(self, data):
+        """Schedules a redraw for a {'total_material_cost':..., 'total_labor_cost':..., 'profit':...} dict."""
+        self.pending = data
+        if self.job is None: self.job = self.master.after(self.DELAY_MS, self.flush)
+
+    def show_placeholder(self):
+        self.update({})
+
+    def flush(self):
+        self.job = None
+        data, self.pending = self.pending or {}, None
+        chart_labels = {'total_material_cost': lang.get('chart_label_material'), 'total_labor_cost': lang.get('chart_label_labor'), 'profit': lang.get('chart_label_profit')}
+        slices = [(chart_labels.get(key, key), value) for key, value in data.items() if value > 0]
+        labels = [label for label, _ in slices]
+        values = [value for _, value in slices]
+        title = lang.get("chart_legend_title")
+        key = (tuple(labels), tuple(round(v, 2) for v in values), title) if slices else ("placeholder", lang.get('chart_placeholder'))
+        if key == self.shown_key: return
+        self.shown_key = key
+
+        if not slices:
+            self.draw_placeholder()
+            return
+        self.ensure_canvas()
+        if len(slices) == len(self.wedges):
+            self.update_wedges(labels, values, title)
+        else:
+            self.build_pie(labels, values, title)
+        self.canvas.draw_idle()
+
+    def ensure_canvas(self):
+        """Imports matplotlib and creates the figure the first time a pie is needed."""
+        if self.canvas is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.font = self.font_loader()
+            fig = Figure(figsize=(5, 4), dpi=100)
+            self.axes = fig.add_subplot(111)
+            self.canvas = FigureCanvasTkAgg(fig, master=self.master)
+        if self.placeholder.winfo_manager():
+            self.placeholder.pack_forget()
+            self.canvas.get_tk_widget().pack(side=TOP, fill=BOTH, expand=True)
+
+    def draw_placeholder(self):
+        self.placeholder.config(text=lang.get('chart_placeholder'))
+        if self.canvas is not None and self.canvas.get_tk_widget().winfo_manager():
+            self.canvas.get_tk_widget().pack_forget()
+            self.placeholder.pack(side=TOP, fill=BOTH, expand=True)
+
+    def build_pie(self, labels, values, title):
+        from matplotlib.artist import setp
+        ax = self.axes
+        ax.clear()
+        wedges, _, autotexts = ax.pie(values, autopct='%1.1f%%', startangle=self.START_ANGLE, colors=self.COLORS, wedgeprops={'edgecolor': 'white', 'linewidth': 1.5}, pctdistance=self.PCT_DISTANCE)
+        self.legend = ax.legend(wedges, labels, title=title, loc="center left", bbox_to_anchor=(0.95, 0, 0.5, 1))
+        setp(self.legend.get_texts(), fontproperties=self.font)
+        setp(self.legend.get_title(), fontproperties=self.font)
+        setp(autotexts, size=10, weight="bold", color="white")
+        ax.axis('equal')
+        self.wedges, self.autotexts = wedges, autotexts
+
+    def update_wedges(self, labels, values, title):
+        """Moves the existing wedges and labels to the new proportions (same maths as Axes.pie)."""
+        total = sum(values)
+        theta1 = self.START_ANGLE / 360.0
+        for wedge, autotext, value in zip(self.wedges, self.autotexts, values):
+            frac = value / total
+            theta2 = theta1 + frac
+            wedge.set_theta1(360 * theta1)
+            wedge.set_theta2(360 * theta2)
+            thetam = math.pi * (theta1 + theta2)
+            autotext.set_position((self.PCT_DISTANCE * math.cos(thetam), self.PCT_DISTANCE * math.sin(thetam)))
+            autotext.set_text(f"{frac * 100:.1f}%")
+            theta1 = theta2
+        for text, label in zip(self.legend.get_texts(), labels): text.set_text(label)
+        self.legend.get_title().set_text(title)
@@ -0,0 +1,84 @@
+# File: price_rules.py
+"""
+Price rules from the price_rules table, compiled for batch evaluation.
+
+Four rule types (see database.PRICE_RULE_TYPES): margin, discount, minimum and
+setup. A rule applies to one customer, one material, both or neither (NULL =
+any), from its min_quantity upwards. For each quote line the most specific
+matching rule set wins (customer+material, customer, material, general), and
+within it the highest quantity tier not above the line's quantity.
+
+Rules are grouped once into sorted tier arrays per (type, customer, material);
+resolve() then looks up every line of a batch with np.searchsorted.
+"""
+import database
+
+SPECIFICITY = ((True, True), (True, False), (False, True), (False, False))
+
+class PriceRules:
+    def __init__(self, rules, default_margin):
+        import numpy as np
+        self.default_margin = default_margin
+        grouped = {}
+        for rule in rules:
+            key = (rule['rule_type'], self.customer_key(rule['customer']), rule['material'] or None)
+            grouped.setdefault(key, []).append((rule['min_quantity'], rule['value']))
+        self.tables = {}
+        for key, tiers in grouped.items():
+            tiers.sort()
+            self.tables[key] = (np.array([q for q, _ in tiers], dtype=np.int64), np.array([v for _, v in tiers], dtype=float))
+
+    @staticmethod
+    def customer_key(customer):
+        return (customer or "").strip().lower() or None
+
+    def defaults(self):
+        return {'margin': self.default_margin, 'discount': 0.0, 'minimum': 0.0, 'setup': 0.0}
+
+    def resolve(self, quantities, customers=None, materials=None):
+        """
+        Returns {'margin', 'discount', 'minimum', 'setup'} arrays, one value per line.
+        customers and materials are lists parallel to quantities (or a single value for all).
+        """
+        import numpy as np
+        quantities = np.atleast_1d(np.asarray(quantities, dtype=np.int64))
+        count = quantities.shape[0]
+        customers = customers if isinstance(customers, (list, tuple)) else [customers] * count
+        materials = materials if isinstance(materials, (list, tuple)) else [materials] * count
+        result = {rule_type: np.full(count, value, dtype=float) for rule_type, value in self.defaults().items()}
+        if not self.tables: return result
+
+        groups = {}
+        for i, (customer, material) in enumerate(zip(customers, materials)):
+            groups.setdefault((self.customer_key(customer), material or None), []).append(i)
+        for (customer, material), indices in groups.items():
+            indices = np.array(indices)
+            group_quantities = quantities[indices]
+            for rule_type in result:
+                unresolved = np.ones(len(indices), dtype=bool)
+                for use_customer, use_material in SPECIFICITY:
+                    table = self.tables.get((rule_type, customer if use_customer else None, material if use_material else None))
+                    if table is None or (use_customer and customer is None) or (use_material and material is None): continue
+                    min_quantities, values = table
+                    tier = np.searchsorted(min_quantities, group_quantities, side='right') - 1
+                    hit = unresolved & (tier >= 0)
+                    result[rule_type][indices[hit]] = values[tier[hit]]
+                    unresolved &= ~hit
+                    if not unresolved.any(): break
+        return result
+
+    def resolve_one(self, quantity, customer=None, material=None):
+        return {rule_type: float(values[0]) for rule_type, values in self.resolve([quantity], [customer], [material]).items()}
+
+_compiled = None
+_compiled_from = None
+
+def get_rules(default_margin=None):
+    """Rules compiled from the database; recompiled only after the rules or the default margin change."""
+    global _compiled, _compiled_from
+    if default_margin is None: default_margin = database.get_settings().get('profit_margin', 0.25)
+    rows = database.get_price_rules()
+    if _compiled is None or _compiled_from[0] is not rows or _compiled_from[1] != default_margin:
+        _compiled = PriceRules(rows, default_margin)
+        _compiled_from = (rows, default_margin)
+    return _compiled
@@ -0,0 +1,203 @@
+# File: pricing_engine.py
+"""
+GUI-free pricing engine.
+
+All the price math that used to live in QuotingPage.calculate_price. Works on
+plain data (material cost, quantity, operations, margin) so quotes can be priced
+without Tk, and whole job lists can be re-priced in one batch call.
+
+Operations have a per-piece part ("cost", or hours x rate) and a per-lot part
+("setup_cost", or setup_hours x rate) that is charged once however many pieces
+are ordered. Besides the margin, a price can carry a further per-lot setup cost
+(added before the margin), a discount (a fraction of the price after margin)
+and a minimum charge for the lot. These usually come from price_rules.
+
+NumPy is only imported by the vectorized functions, so pricing a single quote
+(and starting the app) does not pay for loading it.
+"""
+
+BREAKDOWN_KEYS = (
+    "total_material_cost", "total_labor_cost", "setup_cost", "sub_total", "profit", "discount",
+    "final_price", "price_per_unit"
+)
+
+def operation_rate(op, hourly_rates=None):
+    rate = op.get("rate")
+    if rate is None or rate == "-":
+        rate = (hourly_rates or {}).get(op.get("rate_key"), 0)
+    return float(rate)
+
+def operation_cost(op, hourly_rates=None):
+    """
+    Cost of one operation per unit.
+
+    Accepts the dicts QuotingPage builds ({"method": "time", "hours", "rate", "cost"})
+    as well as plain data where the rate is given by key ({"hours": 2, "rate_key": "CNC"}).
+    """
+    if op.get("cost") is not None:
+        return float(op["cost"])
+    if op.get("method", "time") == "fixed":
+        return 0.0
+    return float(op.get("hours") or 0) * operation_rate(op, hourly_rates)
+
+def operation_setup_cost(op, hourly_rates=None):
+    """Cost of one operation per lot: its "setup_cost", or setup_hours at the operation's rate."""
+    if op.get("setup_cost") is not None:
+        return float(op["setup_cost"])
+    if op.get("method", "time") == "fixed" or not op.get("setup_hours"):
+        return 0.0
+    return float(op["setup_hours"]) * operation_rate(op, hourly_rates)
+
+def labor_cost_per_unit(operations, hourly_rates=None):
+    return sum(operation_cost(op, hourly_rates) for op in operations)
+
+def setup_cost_per_lot(operations, hourly_rates=None):
+    return sum(operation_setup_cost(op, hourly_rates) for op in operations)
+
+def configured_profit_margin():
+    """The profit_margin setting (MainApp.PROFIT_MARGIN); only read when no margin is given."""
+    import database
+    return database.get_settings().get('profit_margin', 0.25)
+
+def price_quote(quantity, material_cost_per_unit, operations, profit_margin, hourly_rates=None,
+                setup_cost=0.0, discount_rate=0.0, minimum_charge=0.0):
+    """Prices one quote and returns the full cost breakdown (setup_cost = operation setup + setup_cost)."""
+    quantity = int(quantity)
+    if quantity <= 0: raise ValueError("Quantity must be > 0")
+    total_labor_cost_per_unit = labor_cost_per_unit(operations, hourly_rates)
+    setup_cost = setup_cost_per_lot(operations, hourly_rates) + setup_cost
+    total_material_cost = material_cost_per_unit * quantity
+    total_labor_cost = total_labor_cost_per_unit * quantity
+    sub_total = total_material_cost + total_labor_cost + setup_cost
+    profit = sub_total * profit_margin
+    discount = (sub_total + profit) * discount_rate
+    final_price = max(sub_total + profit - discount, minimum_charge)
+    return {
+        "quantity": quantity, "material_cost_per_unit": material_cost_per_unit,
+        "total_labor_cost_per_unit": total_labor_cost_per_unit,
+        "total_material_cost": total_material_cost, "total_labor_cost": total_labor_cost,
+        "setup_cost": setup_cost, "sub_total": sub_total, "profit_margin": profit_margin, "profit": profit,
+        "discount_rate": discount_rate, "discount": discount, "minimum_charge": minimum_charge,
+        "final_price": final_price, "price_per_unit": final_price / quantity
+    }
+
+def price_quote_with_rules(quantity, material_cost_per_unit, operations, rules, customer=None, material=None, hourly_rates=None):
+    """price_quote with margin, setup, discount and minimum taken from compiled price_rules."""
+    terms = rules.resolve_one(quantity, customer, material)
+    return price_quote(quantity, material_cost_per_unit, operations, terms['margin'], hourly_rates,
+                       setup_cost=terms['setup'], discount_rate=terms['discount'], minimum_charge=terms['minimum'])
+
+def price_arrays(quantities, material_costs_per_unit, labor_costs_per_unit, profit_margins,
+                 setup_costs=0.0, discount_rates=0.0, minimum_charges=0.0):
+    """
+    Vectorized core of the engine. Every argument is a scalar or an array and the
+    usual NumPy broadcasting applies. Returns a dict of arrays keyed like BREAKDOWN_KEYS.
+    """
+    import numpy as np
+    quantities = np.asarray(quantities, dtype=np.int64)
+    if np.any(quantities <= 0): raise ValueError("Quantity must be > 0")
+    total_material_cost = np.asarray(material_costs_per_unit, dtype=float) * quantities
+    total_labor_cost = np.asarray(labor_costs_per_unit, dtype=float) * quantities
+    setup_cost = np.asarray(setup_costs, dtype=float)
+    sub_total = total_material_cost + total_labor_cost + setup_cost
+    profit = sub_total * np.asarray(profit_margins, dtype=float)
+    discount = (sub_total + profit) * np.asarray(discount_rates, dtype=float)
+    final_price = np.maximum(sub_total + profit - discount, np.asarray(minimum_charges, dtype=float))
+    return {
+        "total_material_cost": total_material_cost, "total_labor_cost": total_labor_cost,
+        "setup_cost": np.broadcast_to(setup_cost, sub_total.shape), "sub_total": sub_total, "profit": profit,
+        "discount": discount, "final_price": final_price, "price_per_unit": final_price / quantities
+    }
+
+def price_quotes_batch(quotes, material_costs, profit_margin, hourly_rates=None, rules=None):
+    """
+    Prices many quote variants in one call.
+
+    Each quote is a dict with "material" (a key of material_costs), "quantity",
+    "operations" and optionally its own "profit_margin". With compiled price rules
+    the margin (unless given per quote), setup, discount and minimum charge are
+    resolved for every line in one pass using "customer_name", "material" and
+    "quantity". Returns one breakdown dict per quote, in the same order and with
+    the same keys as price_quote.
+    """
+    import numpy as np
+    count = len(quotes)
+    quantities = np.empty(count, dtype=np.int64)
+    material_unit = np.empty(count)
+    labor_unit = np.empty(count)
+    margins = np.empty(count)
+    setup_lot = np.empty(count)
+    # Variants usually share their operation lists, so cost each list only once.
+    labor_cache = {}
+    for i, quote in enumerate(quotes):
+        quantities[i] = int(quote.get("quantity", 1))
+        material_unit[i] = material_costs.get(quote.get("material"), 0)
+        operations = quote.get("operations") or []
+        ops_key = id(operations)
+        if ops_key not in labor_cache:
+            labor_cache[ops_key] = (labor_cost_per_unit(operations, hourly_rates), setup_cost_per_lot(operations, hourly_rates))
+        labor_unit[i], setup_lot[i] = labor_cache[ops_key]
+        margins[i] = quote.get("profit_margin", profit_margin)
+
+    bad = np.flatnonzero(quantities <= 0)
+    if bad.size: raise ValueError(f"Quantity must be > 0 (quote #{bad[0] + 1})")
+    terms = {'setup': 0.0, 'discount': 0.0, 'minimum': 0.0}
+    if rules is not None:
+        terms = rules.resolve(quantities, [q.get("customer_name") for q in quotes], [q.get("material") for q in quotes])
+        own_margin = np.array(["profit_margin" in q for q in quotes], dtype=bool)
+        margins = np.where(own_margin, margins, terms['margin'])
+    arrays = price_arrays(quantities, material_unit, labor_unit, margins, setup_lot + terms['setup'], terms['discount'], terms['minimum'])
+
+    columns = {
+        "quantity": quantities.tolist(), "material_cost_per_unit": material_unit.tolist(),
+        "total_labor_cost_per_unit": labor_unit.tolist(), "profit_margin": margins.tolist(),
+        "discount_rate": np.broadcast_to(terms['discount'], (count,)).tolist(),
+        "minimum_charge": np.broadcast_to(terms['minimum'], (count,)).tolist()
+    }
+    columns.update({key: arrays[key].tolist() for key in BREAKDOWN_KEYS})
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+def price_matrix(operations, quantities, material_costs_per_unit, profit_margins, hourly_rates=None,
+                 rules=None, customer=None, material_names=None):
+    """
+    Quantity x material x margin what-if grid computed in one NumPy pass.
+    Returns a dict of arrays (keys as BREAKDOWN_KEYS plus "profit_margin"), each of
+    shape (Q, M, P). Operation setup is charged once per lot at every quantity.
+
+    With compiled price rules (and material_names parallel to the costs) setup,
+    discount and minimum charge follow the rules per quantity and material. If
+    profit_margins is None P is 1 and the margin follows the rules, or without
+    rules the profit_margin setting (as QuotingPage prices a single quote).
+    """
+    import numpy as np
+    quantities = np.asarray(quantities, dtype=np.int64).reshape(-1, 1, 1)
+    material_costs = np.asarray(material_costs_per_unit, dtype=float).reshape(1, -1, 1)
+    q_count, m_count = quantities.shape[0], material_costs.shape[1]
+    terms = {'setup': 0.0, 'discount': 0.0, 'minimum': 0.0}
+    if rules is not None:
+        grid_quantities = np.repeat(quantities.ravel(), m_count)
+        names = list(material_names or [None] * m_count) * q_count
+        terms = {key: values.reshape(q_count, m_count, 1) for key, values in rules.resolve(grid_quantities, customer, names).items()}
+    if profit_margins is None:
+        margins = terms['margin'] if rules is not None else np.full((1, 1, 1), configured_profit_margin())
+    else:
+        margins = np.asarray(profit_margins, dtype=float).reshape(1, 1, -1)
+    setup = setup_cost_per_lot(operations, hourly_rates) + np.asarray(terms['setup'], dtype=float)
+    arrays = price_arrays(quantities, material_costs, labor_cost_per_unit(operations, hourly_rates), margins,
+                          setup, terms['discount'], terms['minimum'])
+    arrays["profit_margin"] = margins
+    shape = (q_count, m_count, margins.shape[2])
+    return {key: np.broadcast_to(value, shape) for key, value in arrays.items()}
+
+def price_matrix_rows(matrix, quantities, material_names):
+    """Flattens a price_matrix result into table rows (quantity-major order)."""
+    rows = []
+    final_price, price_per_unit, margins = matrix["final_price"], matrix["price_per_unit"], matrix["profit_margin"]
+    for qi, quantity in enumerate(quantities):
+        for mi, material in enumerate(material_names):
+            for pi in range(final_price.shape[2]):
+                rows.append({
+                    "quantity": int(quantity), "material": material, "profit_margin_percent": float(margins[qi, mi, pi]) * 100,
+                    "price_per_unit": float(price_per_unit[qi, mi, pi]), "final_price": float(final_price[qi, mi, pi])
+                })
+    return rows
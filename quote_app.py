@@ -1,20 +1,40 @@
 # File: quote_app.py (Refactored Version)
+import sys
+from startup_profiler import StartupProfiler
+# ต้องสร้างก่อน import อื่น ๆ เพื่อจับเวลา import ได้ครบเมื่อรันด้วย --profile-startup
+profiler = StartupProfiler.from_argv(sys.argv)
+
+import importlib
+import multiprocessing
+import threading
+import time
+from datetime import datetime
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from ttkbootstrap.scrolled import ScrolledText
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib import font_manager
 from tkinter import messagebox
-import pdf_generator
 import database
+import pricing_engine
+import price_rules
+import scheduler
+import routing_library
 from settings_window import SettingsWindow
+from history_page import HistoryPage
+from customers_page import CustomersPage
+from autocomplete_entry import AutocompleteEntry
+from tree_view_model import TreeViewModel
+from price_chart import PriceChart
+from pdf_worker import PdfRenderQueue
 from language_manager import lang
 from app_config import ICON_PATH
 
+# โมดูลที่ import ช้า: โหลดเมื่อใช้งานจริงครั้งแรก หรือโหลดล่วงหน้าใน background หลังหน้าต่างแสดงแล้ว
+HEAVY_MODULES = ("numpy", "matplotlib.figure", "matplotlib.backends.backend_tkagg", "matplotlib.font_manager", "jinja2", "weasyprint")
+WARM_UP_DELAY_MS = 500
+
 # ===================================================================
 # ===== PAGE CLASSES (แต่ละหน้าเป็นคลาสของตัวเอง) =======================
 # ===================================================================
@@ -39,6 +59,8 @@ class QuotingPage(tb.Frame):
         self.widgets = {}
         self.quote_operations = []
         self.op_counter = 0
+        # เลขที่และวันที่ของใบเสนอราคาที่ออกไปแล้ว บันทึกซ้ำจะใช้เลขเดิม (และได้ PDF จากแคชถ้าไม่มีอะไรเปลี่ยน)
+        self.issued_quote = None
 
         self.grid_columnconfigure(0, weight=3)
         self.grid_columnconfigure(1, weight=2)
@@ -66,7 +88,7 @@ class QuotingPage(tb.Frame):
         self.widgets['job_name_entry'].grid(row=0, column=1, sticky=EW, pady=2)
         self.widgets['customer_name_label'] = tb.Label(self.widgets['quote_info_frame'], text=lang.get("customer_name"))
         self.widgets['customer_name_label'].grid(row=1, column=0, sticky=W, pady=2)
-        self.widgets['customer_name_entry'] = tb.Entry(self.widgets['quote_info_frame'])
+        self.widgets['customer_name_entry'] = AutocompleteEntry(self.widgets['quote_info_frame'], database.search_customer_names)
         self.widgets['customer_name_entry'].grid(row=1, column=1, sticky=EW, pady=2)
         
         self.widgets['part_details_frame'] = tb.Labelframe(header_frame, text=f" {lang.get('part_details')} ", padding=15)
@@ -87,13 +109,16 @@ class QuotingPage(tb.Frame):
         ops_tab_frame = tb.Frame(self.widgets['notebook'], padding=15)
         cost_summary_tab_frame = tb.Frame(self.widgets['notebook'], padding=15)
         notes_tab_frame = tb.Frame(self.widgets['notebook'], padding=15)
+        price_breaks_tab_frame = tb.Frame(self.widgets['notebook'], padding=15)
         self.widgets['notebook'].add(ops_tab_frame, text=lang.get("tab_operations"))
         self.widgets['notebook'].add(cost_summary_tab_frame, text=lang.get("tab_cost_summary"))
         self.widgets['notebook'].add(notes_tab_frame, text=lang.get("tab_notes"))
+        self.widgets['notebook'].add(price_breaks_tab_frame, text=lang.get("tab_price_breaks"))
         
         self.populate_ops_tab(ops_tab_frame)
         self.populate_cost_tab(cost_summary_tab_frame)
         self.populate_notes_tab(notes_tab_frame)
+        self.populate_price_breaks_tab(price_breaks_tab_frame)
         
     def build_right_panel(self, parent):
         self.widgets['price_card'] = tb.Labelframe(parent, text=lang.get("price_summary"), padding=20, bootstyle="success")
@@ -105,19 +130,40 @@ class QuotingPage(tb.Frame):
         self.widgets['unit_thb_label'].grid(row=0, column=1, sticky=SE, padx=10)
         self.widgets['price_per_unit_label'] = tb.Label(self.widgets['price_card'], text=lang.get("price_per_unit", price=0), bootstyle="inverse-success")
         self.widgets['price_per_unit_label'].grid(row=1, column=0, columnspan=2, sticky=EW, pady=(5,0))
+        self.widgets['lead_time_label'] = tb.Label(self.widgets['price_card'], text=lang.get("lead_time_none"), bootstyle="success")
+        self.widgets['lead_time_label'].grid(row=2, column=0, columnspan=2, sticky=EW, pady=(5,0))
         
         self.widgets['chart_frame'] = tb.Labelframe(parent, text=lang.get('chart_title'), padding=15)
         self.widgets['chart_frame'].pack(fill=BOTH, expand=True, pady=15)
-        fig = plt.Figure(figsize=(5, 4), dpi=100)
-        self.widgets['chart_axes'] = fig.add_subplot(111)
-        canvas = FigureCanvasTkAgg(fig, master=self.widgets['chart_frame'])
-        canvas.get_tk_widget().pack(side=TOP, fill=BOTH, expand=True)
-        self.widgets['chart_canvas'] = canvas
+        self.chart = PriceChart(self.widgets['chart_frame'], self.app.load_thai_font)
         
         self.widgets['save_pdf_btn'] = tb.Button(parent, text=f"💾 {lang.get('save_pdf', default='Save PDF')}", command=self.save_pdf, bootstyle="info")
         self.widgets['save_pdf_btn'].pack(fill=X, pady=(15,0), ipady=10)
 
+        self.widgets['pdf_progress_frame'] = tb.Frame(parent)
+        self.widgets['pdf_progress_frame'].grid_columnconfigure(0, weight=1)
+        self.widgets['pdf_progress_bar'] = tb.Progressbar(self.widgets['pdf_progress_frame'], mode="determinate", bootstyle="info-striped")
+        self.widgets['pdf_progress_bar'].grid(row=0, column=0, sticky=EW)
+        self.widgets['pdf_cancel_btn'] = tb.Button(self.widgets['pdf_progress_frame'], text=lang.get("pdf_cancel_btn"), bootstyle="danger-link", command=self.app.pdf_queue.cancel_all)
+        self.widgets['pdf_cancel_btn'].grid(row=0, column=1, padx=(5, 0))
+        self.widgets['pdf_status_label'] = tb.Label(parent, text="", bootstyle="secondary", wraplength=450)
+        self.widgets['pdf_status_label'].pack(fill=X, pady=(5, 0))
+        self.app.pdf_queue.add_listener(self.on_pdf_progress)
+
     def populate_ops_tab(self, parent):
+        self.widgets['routing_frame'] = tb.Labelframe(parent, text=lang.get("routing_library"), padding=10)
+        self.widgets['routing_frame'].pack(fill=X, pady=(0, 10))
+        self.widgets['routing_frame'].grid_columnconfigure(0, weight=1)
+        self.widgets['routing_entry'] = AutocompleteEntry(self.widgets['routing_frame'], routing_library.search_names, delay_ms=50)
+        self.widgets['routing_entry'].grid(row=0, column=0, sticky=EW, padx=5)
+        self.widgets['routing_entry'].bind("<Return>", lambda e: self.insert_routing())
+        self.widgets['routing_insert_btn'] = tb.Button(self.widgets['routing_frame'], text=lang.get("routing_insert_btn"), bootstyle="primary", command=self.insert_routing)
+        self.widgets['routing_insert_btn'].grid(row=0, column=1, padx=5)
+        self.widgets['routing_save_btn'] = tb.Button(self.widgets['routing_frame'], text=lang.get("routing_save_btn"), bootstyle="success-outline", command=self.save_routing)
+        self.widgets['routing_save_btn'].grid(row=0, column=2, padx=5)
+        self.widgets['routing_delete_btn'] = tb.Button(self.widgets['routing_frame'], text=lang.get("routing_delete_btn"), bootstyle="danger-link", command=self.delete_routing)
+        self.widgets['routing_delete_btn'].grid(row=0, column=3, padx=5)
+
         self.widgets['add_op_subframe'] = tb.Labelframe(parent, text=lang.get("op_add_new"), padding=10)
         self.widgets['add_op_subframe'].pack(fill=X, pady=(0, 15))
         self.widgets['add_op_subframe'].grid_columnconfigure(1, weight=1)
@@ -143,6 +189,10 @@ class QuotingPage(tb.Frame):
         self.widgets['op_rate_combo'] = tb.Combobox(self.widgets['op_time_frame'], state="readonly", values=list(self.app.HOURLY_RATES.keys()))
         self.widgets['op_rate_combo'].grid(row=0, column=3, padx=5, sticky=EW)
         if list(self.app.HOURLY_RATES.keys()): self.widgets['op_rate_combo'].current(0)
+        self.widgets['op_setup_label'] = tb.Label(self.widgets['op_time_frame'], text=lang.get("op_setup_hours"))
+        self.widgets['op_setup_label'].grid(row=1, column=0, padx=5, pady=(5, 0))
+        self.widgets['op_setup_entry'] = tb.Entry(self.widgets['op_time_frame'], width=8)
+        self.widgets['op_setup_entry'].grid(row=1, column=1, padx=5, pady=(5, 0))
         self.widgets['op_time_frame'].grid_columnconfigure(3, weight=1)
 
         self.widgets['op_fixed_frame'] = tb.Frame(self.widgets['add_op_subframe'])
@@ -151,6 +201,9 @@ class QuotingPage(tb.Frame):
         self.widgets['op_cost_label'].grid(row=0, column=0, padx=5)
         self.widgets['op_cost_entry'] = tb.Entry(self.widgets['op_fixed_frame'])
         self.widgets['op_cost_entry'].grid(row=0, column=1, padx=5, sticky=EW)
+        self.widgets['op_per_lot_var'] = tk.BooleanVar(value=False)
+        self.widgets['op_per_lot_check'] = tb.Checkbutton(self.widgets['op_fixed_frame'], text=lang.get("op_per_lot"), variable=self.widgets['op_per_lot_var'])
+        self.widgets['op_per_lot_check'].grid(row=0, column=2, padx=5)
         self.widgets['op_fixed_frame'].grid_columnconfigure(1, weight=1)
         
         self.widgets['add_op_button'] = tb.Button(self.widgets['add_op_subframe'], text=lang.get("op_add_btn"), bootstyle="primary", command=self.add_operation)
@@ -165,6 +218,7 @@ class QuotingPage(tb.Frame):
         scrollbar = tb.Scrollbar(op_list_frame, orient=VERTICAL, command=self.widgets['ops_tree'].yview)
         self.widgets['ops_tree'].configure(yscroll=scrollbar.set)
         scrollbar.pack(side=RIGHT, fill=Y)
+        self.ops_view = TreeViewModel(self.widgets['ops_tree'])
         
         self.widgets['delete_op_button'] = tb.Button(parent, text=lang.get("op_delete_btn"), bootstyle="danger-outline", command=self.delete_operation)
         self.widgets['delete_op_button'].pack(fill=X, pady=(10,0))
@@ -180,13 +234,80 @@ class QuotingPage(tb.Frame):
             return label, value_label
         self.widgets['cost_material_label_tab'], self.widgets['cost_material_value'] = create_cost_row("cost_material", 0)
         self.widgets['cost_labor_label_tab'], self.widgets['cost_labor_value'] = create_cost_row("cost_labor", 1)
-        self.widgets['cost_subtotal_label_tab'], self.widgets['cost_subtotal_value'] = create_cost_row("cost_total", 2)
-        self.widgets['cost_profit_label_tab'], self.widgets['cost_profit_value'] = create_cost_row("profit", 3)
+        self.widgets['cost_setup_label_tab'], self.widgets['cost_setup_value'] = create_cost_row("cost_setup", 2)
+        self.widgets['cost_subtotal_label_tab'], self.widgets['cost_subtotal_value'] = create_cost_row("cost_total", 3)
+        self.widgets['cost_profit_label_tab'], self.widgets['cost_profit_value'] = create_cost_row("profit", 4)
+        self.widgets['cost_discount_label_tab'], self.widgets['cost_discount_value'] = create_cost_row("cost_discount", 5)
 
     def populate_notes_tab(self, parent):
         self.widgets['notes_text'] = ScrolledText(parent, wrap=WORD, autohide=True, padding=10)
         self.widgets['notes_text'].pack(fill=BOTH, expand=True)
 
+    def populate_price_breaks_tab(self, parent):
+        parent.grid_columnconfigure(1, weight=1)
+        parent.grid_rowconfigure(4, weight=1)
+        self.widgets['pb_quantities_label'] = tb.Label(parent, text=lang.get("pb_quantities"))
+        self.widgets['pb_quantities_label'].grid(row=0, column=0, sticky=W, padx=5, pady=2)
+        self.widgets['pb_quantities_entry'] = tb.Entry(parent)
+        self.widgets['pb_quantities_entry'].grid(row=0, column=1, sticky=EW, padx=5, pady=2)
+        self.widgets['pb_quantities_entry'].insert(0, "1, 10, 50, 100, 500")
+        self.widgets['pb_margins_label'] = tb.Label(parent, text=lang.get("pb_margins"))
+        self.widgets['pb_margins_label'].grid(row=1, column=0, sticky=W, padx=5, pady=2)
+        self.widgets['pb_margins_entry'] = tb.Entry(parent)
+        self.widgets['pb_margins_entry'].grid(row=1, column=1, sticky=EW, padx=5, pady=2)
+        # เว้นว่างไว้ = ใช้อัตรากำไรตามกฎราคา (price rules) ของแต่ละจำนวน/วัสดุ
+        self.widgets['pb_materials_label'] = tb.Label(parent, text=lang.get("pb_materials"))
+        self.widgets['pb_materials_label'].grid(row=2, column=0, sticky=NW, padx=5, pady=2)
+        self.widgets['pb_materials_list'] = tk.Listbox(parent, selectmode=EXTENDED, exportselection=False, height=4)
+        self.widgets['pb_materials_list'].grid(row=2, column=1, sticky=EW, padx=5, pady=2)
+        self.refresh_price_break_materials()
+        self.widgets['pb_calculate_btn'] = tb.Button(parent, text=lang.get("pb_calculate_btn"), bootstyle="primary", command=self.calculate_price_breaks)
+        self.widgets['pb_calculate_btn'].grid(row=3, column=0, columnspan=2, sticky=EW, padx=5, pady=(10, 10))
+
+        table_frame = tb.Frame(parent)
+        table_frame.grid(row=4, column=0, columnspan=2, sticky="nsew")
+        columns = self.price_break_columns()
+        self.widgets['pb_tree'] = tb.Treeview(table_frame, columns=[val[0] for val in columns.values()], show='headings', bootstyle="primary")
+        for val in columns.values(): self.widgets['pb_tree'].heading(val[0], text=val[0]); self.widgets['pb_tree'].column(val[0], width=val[1], anchor=E)
+        self.widgets['pb_tree'].pack(fill=BOTH, expand=True, side=LEFT)
+        scrollbar = tb.Scrollbar(table_frame, orient=VERTICAL, command=self.widgets['pb_tree'].yview)
+        self.widgets['pb_tree'].configure(yscroll=scrollbar.set)
+        scrollbar.pack(side=RIGHT, fill=Y)
+        self.price_break_rows = []
+
+    def price_break_columns(self):
+        return {"col_quantity": (lang.get("col_quantity"), 80), "col_material": (lang.get("col_material"), 220), "col_margin": (lang.get("col_margin"), 80), "col_unit_price": (lang.get("col_unit_price"), 120), "col_total_price": (lang.get("col_total_price"), 120)}
+
+    def refresh_price_break_materials(self):
+        listbox = self.widgets['pb_materials_list']
+        selected = {listbox.get(i) for i in listbox.curselection()}
+        listbox.delete(0, END)
+        for i, name in enumerate(self.app.MATERIAL_COSTS.keys()):
+            listbox.insert(END, name)
+            if name in selected: listbox.selection_set(i)
+
+    def build_price_break_rows(self):
+        """Computes the quantity x material x margin grid from the Price Breaks tab inputs."""
+        quantities = [int(v) for v in self.widgets['pb_quantities_entry'].get().replace(';', ',').split(',') if v.strip()]
+        margins = [float(v) for v in self.widgets['pb_margins_entry'].get().replace(';', ',').split(',') if v.strip()] or None
+        listbox = self.widgets['pb_materials_list']
+        materials = [listbox.get(i) for i in listbox.curselection()] or [self.widgets['material_combo'].get()]
+        if not quantities: raise ValueError("Quantities are required")
+        matrix = pricing_engine.price_matrix(self.quote_operations, quantities, [self.app.MATERIAL_COSTS.get(m, 0) for m in materials], margins,
+                                             rules=price_rules.get_rules(self.app.PROFIT_MARGIN), customer=self.widgets['customer_name_entry'].get(), material_names=materials)
+        return pricing_engine.price_matrix_rows(matrix, quantities, materials)
+
+    def calculate_price_breaks(self):
+        try:
+            self.price_break_rows = self.build_price_break_rows()
+        except ValueError as e:
+            messagebox.showerror(lang.get("error_title"), lang.get("error_numeric_only") + f"\n({e})")
+            return
+        tree = self.widgets['pb_tree']
+        tree.delete(*tree.get_children())
+        for row in self.price_break_rows:
+            tree.insert('', END, values=(row['quantity'], row['material'], f"{row['profit_margin_percent']:g}%", f"{row['price_per_unit']:,.2f}", f"{row['final_price']:,.2f}"))
+
     def update_language(self):
         self.widgets['quote_info_frame'].config(text=f" {lang.get('quote_info')} ")
         self.widgets['job_name_label'].config(text=lang.get("job_name"))
@@ -197,6 +318,16 @@ class QuotingPage(tb.Frame):
         self.widgets['notebook'].tab(0, text=lang.get("tab_operations"))
         self.widgets['notebook'].tab(1, text=lang.get("tab_cost_summary"))
         self.widgets['notebook'].tab(2, text=lang.get("tab_notes"))
+        self.widgets['notebook'].tab(3, text=lang.get("tab_price_breaks"))
+        self.widgets['pb_quantities_label'].config(text=lang.get("pb_quantities"))
+        self.widgets['pb_margins_label'].config(text=lang.get("pb_margins"))
+        self.widgets['pb_materials_label'].config(text=lang.get("pb_materials"))
+        self.widgets['pb_calculate_btn'].config(text=lang.get("pb_calculate_btn"))
+        for i, val in enumerate(self.price_break_columns().values()): self.widgets['pb_tree'].heading(i, text=val[0])
+        self.widgets['routing_frame'].config(text=lang.get("routing_library"))
+        self.widgets['routing_insert_btn'].config(text=lang.get("routing_insert_btn"))
+        self.widgets['routing_save_btn'].config(text=lang.get("routing_save_btn"))
+        self.widgets['routing_delete_btn'].config(text=lang.get("routing_delete_btn"))
         self.widgets['add_op_subframe'].config(text=lang.get("op_add_new"))
         self.widgets['op_desc_label'].config(text=lang.get("op_desc"))
         self.widgets['op_method_label'].config(text=lang.get("op_pricing_method"))
@@ -204,6 +335,8 @@ class QuotingPage(tb.Frame):
         self.widgets['op_hours_label'].config(text=lang.get("op_hours"))
         self.widgets['op_rate_label'].config(text=lang.get("op_machine_rate"))
         self.widgets['op_cost_label'].config(text=lang.get("op_fixed_cost"))
+        self.widgets['op_setup_label'].config(text=lang.get("op_setup_hours"))
+        self.widgets['op_per_lot_check'].config(text=lang.get("op_per_lot"))
         self.widgets['add_op_button'].config(text=lang.get("op_add_btn"))
         self.widgets['delete_op_button'].config(text=lang.get("op_delete_btn"))
         tree_columns = {"col_id": (lang.get("col_id"), 50), "col_desc": (lang.get("col_desc"), 300), "col_details": (lang.get("col_details"), 150), "col_cost": (lang.get("col_cost"), 100)}
@@ -211,8 +344,11 @@ class QuotingPage(tb.Frame):
         self.widgets['price_card'].config(text=lang.get("price_summary"))
         self.widgets['chart_frame'].config(text=lang.get('chart_title'))
         self.widgets['save_pdf_btn'].config(text=f"💾 {lang.get('save_pdf', default='Save PDF')}")
+        self.widgets['pdf_cancel_btn'].config(text=lang.get("pdf_cancel_btn"))
         self.widgets['cost_material_label_tab'].config(text=lang.get("cost_material"))
         self.widgets['cost_labor_label_tab'].config(text=lang.get("cost_labor"))
+        self.widgets['cost_setup_label_tab'].config(text=lang.get("cost_setup"))
+        self.widgets['cost_discount_label_tab'].config(text=lang.get("cost_discount"))
         self.widgets['cost_subtotal_label_tab'].config(text=lang.get("cost_total"))
         self.refresh_operations_table()
         self.calculate_price()
@@ -220,6 +356,7 @@ class QuotingPage(tb.Frame):
     def refresh_data(self):
         self.widgets['material_combo']['values'] = list(self.app.MATERIAL_COSTS.keys())
         self.widgets['op_rate_combo']['values'] = list(self.app.HOURLY_RATES.keys())
+        self.refresh_price_break_materials()
 
     def toggle_op_inputs(self, event=None):
         if self.widgets['op_method_var'].get() == lang.get("op_method_time"):
@@ -237,13 +374,19 @@ class QuotingPage(tb.Frame):
             op_data = {"desc": desc}
             if method == lang.get("op_method_time"):
                 hours = float(self.widgets['op_hours_entry'].get() or 0)
+                setup_hours = float(self.widgets['op_setup_entry'].get() or 0)
                 rate_key = self.widgets['op_rate_combo'].get()
                 rate_value = self.app.HOURLY_RATES.get(rate_key, 0)
                 cost = hours * rate_value
-                op_data.update({"method": "time", "hours": hours, "rate": rate_value, "cost": cost})
+                op_data.update({"method": "time", "hours": hours, "rate": rate_value, "cost": cost,
+                                "setup_hours": setup_hours, "setup_cost": setup_hours * rate_value, "machine": rate_key})
             else:
                 cost = float(self.widgets['op_cost_entry'].get() or 0)
-                op_data.update({"method": "fixed", "hours": "-", "rate": "-", "cost": cost})
+                # ราคาเหมาต่อล็อต (เช่นค่าทำจิ๊ก) คิดครั้งเดียว ไม่คูณจำนวนชิ้น
+                if self.widgets['op_per_lot_var'].get():
+                    op_data.update({"method": "fixed", "hours": "-", "rate": "-", "cost": 0.0, "setup_hours": 0.0, "setup_cost": cost})
+                else:
+                    op_data.update({"method": "fixed", "hours": "-", "rate": "-", "cost": cost, "setup_hours": 0.0, "setup_cost": 0.0})
             self.op_counter += 1
             op_data["id"] = self.op_counter
             self.quote_operations.append(op_data)
@@ -251,103 +394,143 @@ class QuotingPage(tb.Frame):
             self.calculate_price()
             self.widgets['op_desc_entry'].delete(0, END)
             self.widgets['op_hours_entry'].delete(0, END)
+            self.widgets['op_setup_entry'].delete(0, END)
             self.widgets['op_cost_entry'].delete(0, END)
         except (ValueError, tk.TclError) as e:
             messagebox.showerror(lang.get("error_title"), lang.get("error_numeric_only") + f"\n({e})")
 
+    def insert_routing(self):
+        """แทรกทุก operation ของ routing ในครั้งเดียว แล้ว sync ตารางและคำนวณราคาใหม่ครั้งเดียว"""
+        self.widgets['routing_entry'].hide_suggestions()
+        name = self.widgets['routing_entry'].get().strip()
+        if not name: return
+        try:
+            operations = routing_library.get_library().expand(name, self.app.HOURLY_RATES, record_use=True)
+        except ValueError as e:
+            messagebox.showerror(lang.get("error_title"), lang.get("routing_machine_missing", error=e))
+            return
+        if operations is None:
+            messagebox.showwarning(lang.get("routing_library"), lang.get("routing_not_found", name=name))
+            return
+        for op_data in operations:
+            self.op_counter += 1
+            op_data["id"] = self.op_counter
+        self.quote_operations.extend(operations)
+        self.refresh_operations_table()
+        self.calculate_price()
+        self.widgets['routing_entry'].delete(0, END)
+
+    def save_routing(self):
+        name = self.widgets['routing_entry'].get().strip()
+        if not name or not self.quote_operations:
+            messagebox.showwarning(lang.get("routing_library"), lang.get("routing_save_hint"))
+            return
+        existing = routing_library.get_library().get(name)
+        if existing and not messagebox.askyesno(lang.get("routing_library"), lang.get("routing_overwrite", name=existing['name'])): return
+        try:
+            operations = routing_library.routing_operations(self.quote_operations, self.app.HOURLY_RATES)
+        except ValueError as e:
+            messagebox.showerror(lang.get("error_title"), lang.get("routing_op_no_machine", error=e))
+            return
+        database.save_routing(existing['name'] if existing else name, operations)
+        self.widgets['pdf_status_label'].config(text=lang.get("routing_saved", name=name, count=len(self.quote_operations)))
+
+    def delete_routing(self):
+        routing = routing_library.get_library().get(self.widgets['routing_entry'].get())
+        if routing is None: return
+        if messagebox.askyesno(lang.get("routing_library"), lang.get("routing_delete_confirm", name=routing['name'])):
+            database.delete_routing(routing['id'])
+            self.widgets['routing_entry'].delete(0, END)
+
     def delete_operation(self):
-        if not self.widgets['ops_tree'].selection(): return
-        selected_item = self.widgets['ops_tree'].selection()[0]
-        values = self.widgets['ops_tree'].item(selected_item, "values")
-        if not values: return
-        op_id_to_delete = int(values[0])
-        self.quote_operations = [op for op in self.quote_operations if op['id'] != op_id_to_delete]
+        ids_to_delete = set(self.ops_view.selected_keys())
+        if not ids_to_delete: return
+        self.quote_operations = [op for op in self.quote_operations if op['id'] not in ids_to_delete]
         self.refresh_operations_table()
         self.calculate_price()
 
+    @staticmethod
+    def operation_details(op):
+        setup_hours = op.get('setup_hours') or 0
+        if op['method'] == 'time':
+            if setup_hours: return lang.get("op_details_time_setup", hours=op['hours'], setup_hours=setup_hours, rate=op['rate'])
+            return lang.get("op_details_time", hours=op['hours'], rate=op['rate'])
+        return lang.get("op_details_fixed_lot") if op.get('setup_cost') else lang.get("op_details_fixed")
+
     def refresh_operations_table(self):
-        tree = self.widgets['ops_tree']
-        for item in tree.get_children(): tree.delete(item)
+        rows = []
         for op in self.quote_operations:
-            details = lang.get("op_details_fixed")
-            if op['method'] == 'time':
-                details = lang.get("op_details_time", hours=op['hours'], rate=op['rate'])
             cost_str = f"{op['cost']:,.2f}"
-            tree.insert('', END, values=(op['id'], op['desc'], details, cost_str))
+            if op.get('setup_cost'): cost_str = lang.get("op_cost_with_setup", cost=cost_str, setup=f"{op['setup_cost']:,.2f}")
+            rows.append((op['id'], (op['id'], op['desc'], self.operation_details(op), cost_str)))
+        self.ops_view.sync(rows)
 
     def draw_initial_chart(self):
-        ax = self.widgets['chart_axes']
-        ax.clear()
-        ax.text(0.5, 0.5, lang.get('chart_placeholder'), fontproperties=self.app.thai_font, ha='center', va='center', fontsize=14, color='grey')
-        self.widgets['chart_canvas'].draw()
+        self.chart.show_placeholder()
 
     def update_pie_chart(self, data):
-        ax = self.widgets['chart_axes']
-        ax.clear()
-        chart_labels = { 'total_material_cost': lang.get('chart_label_material'), 'total_labor_cost': lang.get('chart_label_labor'), 'profit': lang.get('chart_label_profit') }
-        labels = [chart_labels.get(key, key) for key in data.keys()]
-        values = list(data.values())
-        filtered_labels = [label for i, label in enumerate(labels) if values[i] > 0]
-        filtered_values = [value for value in values if value > 0]
-        if not filtered_values:
-            self.draw_initial_chart()
-            return
-        colors = ['#17A2B8', '#FFC107', '#28A745']
-        wedges, _, autotexts = ax.pie(filtered_values, autopct='%1.1f%%', startangle=90, colors=colors, wedgeprops={'edgecolor': 'white', 'linewidth': 1.5}, pctdistance=0.85)
-        legend = ax.legend(wedges, filtered_labels, title=lang.get("chart_legend_title"), loc="center left", bbox_to_anchor=(0.95, 0, 0.5, 1))
-        plt.setp(legend.get_texts(), fontproperties=self.app.thai_font)
-        plt.setp(legend.get_title(), fontproperties=self.app.thai_font)
-        plt.setp(autotexts, size=10, weight="bold", color="white")
-        ax.axis('equal')
-        self.widgets['chart_canvas'].draw()
+        self.chart.update(data)
 
     def calculate_price(self, return_data=False):
         try:
             quantity = int(self.widgets['quantity_entry'].get() or 1)
-            if quantity <= 0: raise ValueError("Quantity must be > 0")
-            material_cost_per_unit = self.app.MATERIAL_COSTS.get(self.widgets['material_combo'].get(), 0)
-            total_material_cost = material_cost_per_unit * quantity
-            total_labor_cost_per_unit = sum(op['cost'] for op in self.quote_operations)
-            total_labor_cost = total_labor_cost_per_unit * quantity
-            sub_total = total_material_cost + total_labor_cost
-            profit = sub_total * self.app.PROFIT_MARGIN
-            final_price = sub_total + profit
+            material = self.widgets['material_combo'].get()
+            material_cost_per_unit = self.app.MATERIAL_COSTS.get(material, 0)
+            price_data = pricing_engine.price_quote_with_rules(quantity, material_cost_per_unit, self.quote_operations, price_rules.get_rules(self.app.PROFIT_MARGIN),
+                                                               customer=self.widgets['customer_name_entry'].get(), material=material)
+            total_material_cost, total_labor_cost = price_data['total_material_cost'], price_data['total_labor_cost']
+            sub_total, profit, final_price = price_data['sub_total'], price_data['profit'], price_data['final_price']
             
             unit_str = lang.get("unit_thb")
             self.widgets['final_price_label'].config(text=f"{final_price:,.2f}")
-            self.widgets['price_per_unit_label'].config(text=lang.get("price_per_unit", price=final_price / quantity if quantity > 0 else 0))
+            self.widgets['price_per_unit_label'].config(text=lang.get("price_per_unit", price=price_data['price_per_unit']))
             self.widgets['cost_material_value'].config(text=f"{total_material_cost:,.2f} {unit_str}")
             self.widgets['cost_labor_value'].config(text=f"{total_labor_cost:,.2f} {unit_str}")
+            self.widgets['cost_setup_value'].config(text=f"{price_data['setup_cost']:,.2f} {unit_str}")
             self.widgets['cost_subtotal_value'].config(text=f"{sub_total:,.2f} {unit_str}")
             self.widgets['cost_profit_value'].config(text=f"{profit:,.2f} {unit_str}")
-            self.widgets['cost_profit_label_tab'].config(text=lang.get("profit", percent=self.app.PROFIT_MARGIN*100))
+            self.widgets['cost_profit_label_tab'].config(text=lang.get("profit", percent=price_data['profit_margin']))
+            self.widgets['cost_discount_value'].config(text=f"-{price_data['discount']:,.2f} {unit_str}")
             
-            chart_data = {'total_material_cost': total_material_cost, 'total_labor_cost': total_labor_cost, 'profit': profit}
+            chart_data = {'total_material_cost': total_material_cost, 'total_labor_cost': total_labor_cost + price_data['setup_cost'], 'profit': profit}
             self.update_pie_chart(chart_data)
+            self.update_lead_time(quantity)
 
             if return_data:
-                return {
-                    "quantity": quantity, "material_cost_per_unit": material_cost_per_unit,
-                    "total_labor_cost_per_unit": total_labor_cost_per_unit, "sub_total": sub_total,
-                    "profit": profit, "final_price": final_price
-                }
+                return price_data
         except (ValueError, ZeroDivisionError) as e:
             messagebox.showerror(lang.get("error_title"), lang.get('error_numeric_only') + f"\n\n({e})")
             self.clear_results()
             if return_data: return None
 
+    def update_lead_time(self, quantity):
+        """คาดการณ์วันส่งมอบจากกำลังการผลิตและงานที่ค้างอยู่ (scheduler)"""
+        try:
+            estimate = scheduler.get_scheduler().lead_time(self.quote_operations, quantity, self.app.HOURLY_RATES)
+        except ValueError as e:
+            self.widgets['lead_time_label'].config(text=lang.get("lead_time_error", error=e))
+            return
+        if estimate is None:
+            self.widgets['lead_time_label'].config(text=lang.get("lead_time_none"))
+        else:
+            self.widgets['lead_time_label'].config(text=lang.get("lead_time", days=estimate['days'], date=estimate['finish'].strftime("%d/%m/%Y"), jobs=estimate['backlog_jobs']))
+
     def clear_results(self):
         unit_str = lang.get("unit_thb")
         self.widgets['final_price_label'].config(text="0.00")
         self.widgets['price_per_unit_label'].config(text=lang.get("price_per_unit", price=0))
+        self.widgets['lead_time_label'].config(text=lang.get("lead_time_none"))
         self.widgets['cost_material_value'].config(text=f"0.00 {unit_str}")
         self.widgets['cost_labor_value'].config(text=f"0.00 {unit_str}")
+        self.widgets['cost_setup_value'].config(text=f"0.00 {unit_str}")
         self.widgets['cost_subtotal_value'].config(text=f"0.00 {unit_str}")
         self.widgets['cost_profit_value'].config(text=f"0.00 {unit_str}")
+        self.widgets['cost_discount_value'].config(text=f"0.00 {unit_str}")
         self.draw_initial_chart()
 
     def clear_form(self, clear_job_info=True):
         if clear_job_info:
+            self.issued_quote = None
             self.widgets['job_name_entry'].delete(0, END)
             self.widgets['customer_name_entry'].delete(0, END)
         if list(self.app.MATERIAL_COSTS.keys()): self.widgets['material_combo'].current(0)
@@ -370,10 +553,13 @@ class QuotingPage(tb.Frame):
         
         operations_for_pdf = []
         for op in self.quote_operations:
-            details = lang.get("op_details_fixed")
-            if op['method'] == 'time':
-                details = lang.get("op_details_time", hours=op['hours'], rate=op['rate'])
-            operations_for_pdf.append({"desc": op['desc'], "details": details, "cost": op['cost'] * price_data['quantity']})
+            cost = op['cost'] * price_data['quantity'] + (op.get('setup_cost') or 0)
+            operations_for_pdf.append({"desc": op['desc'], "details": self.operation_details(op), "cost": cost})
+
+        price_breaks_for_pdf = self.price_break_rows
+        if price_breaks_for_pdf:
+            try: price_breaks_for_pdf = self.build_price_break_rows()
+            except ValueError: pass
 
         quote_data_for_pdf = {
             "job_name": self.widgets['job_name_entry'].get(),
@@ -383,17 +569,69 @@ class QuotingPage(tb.Frame):
             "quantity": price_data['quantity'],
             "material_cost_per_unit": price_data['material_cost_per_unit'],
             "total_labor_cost_per_unit": price_data['total_labor_cost_per_unit'],
+            "setup_cost": price_data['setup_cost'],
             "sub_total": price_data['sub_total'],
-            "profit_margin_percent": self.app.PROFIT_MARGIN * 100,
+            "profit_margin_percent": price_data['profit_margin'] * 100,
             "profit": price_data['profit'],
-            "final_price": price_data['final_price']
+            "discount": price_data['discount'],
+            "final_price": price_data['final_price'],
+            "price_breaks": price_breaks_for_pdf,
+            **(self.issued_quote or {})
         }
         
-        try:
-            pdf_generator.create_quote_pdf(quote_data_for_pdf, filepath)
-            messagebox.showinfo(lang.get("success_title"), f"{lang.get('pdf_saved_success', default='PDF saved successfully at:')}\n{filepath}")
-        except Exception as e:
-            messagebox.showerror(lang.get("error_title"), f"{lang.get('pdf_saved_error', default='Failed to create PDF:')}\n{e}")
+        # เก็บข้อมูลสำหรับบันทึกประวัติไว้ตอนนี้ เพราะฟอร์มอาจถูกแก้ไขระหว่างที่ PDF กำลังสร้าง
+        history_data = dict(quote_data_for_pdf, material=self.widgets['material_combo'].get(), profit_margin=price_data['profit_margin'])
+        operations = list(self.quote_operations)
+        self.app.pdf_queue.submit(quote_data_for_pdf, filepath,
+                                  on_done=lambda result, path: self.on_pdf_saved(result, dict(history_data, quote_id=result.get('quote_id')), operations, path),
+                                  on_error=self.on_pdf_error)
+
+    def on_pdf_saved(self, result, history_data, operations, filepath):
+        self.issued_quote = {"quote_id": result.get('quote_id'), "date": result.get('date')}
+        self.save_to_history(history_data, operations)
+        self.widgets['pdf_status_label'].config(text=f"{lang.get('pdf_saved_success', default='PDF saved successfully at:')}\n{filepath}")
+
+    def on_pdf_error(self, error):
+        messagebox.showerror(lang.get("error_title"), f"{lang.get('pdf_saved_error', default='Failed to create PDF:')}\n{error}")
+
+    def on_pdf_progress(self, done, total, active):
+        """Shows the background PDF queue state under the Save PDF button."""
+        frame = self.widgets['pdf_progress_frame']
+        if active:
+            if not frame.winfo_manager(): frame.pack(fill=X, pady=(5, 0), before=self.widgets['pdf_status_label'])
+            self.widgets['pdf_progress_bar'].config(maximum=total, value=done)
+            self.widgets['pdf_status_label'].config(text=lang.get("pdf_progress", done=done, total=total))
+        elif frame.winfo_manager():
+            frame.pack_forget()
+
+    def save_to_history(self, history_data, operations):
+        """Persists the quote and its operations so it can be found on the history page."""
+        database.save_quote(history_data, operations)
+        database.ensure_customer(history_data['customer_name'])
+
+    def load_quote(self, quote):
+        """Fills the form from a quote saved in the history store."""
+        self.clear_form()
+        if quote['quote_id']:
+            self.issued_quote = {"quote_id": quote['quote_id'], "date": datetime.strptime(quote['created_at'][:10], "%Y-%m-%d").strftime("%d/%m/%Y")}
+        self.widgets['job_name_entry'].insert(0, quote['job_name'] or "")
+        self.widgets['customer_name_entry'].insert(0, quote['customer_name'] or "")
+        if quote['material'] in self.app.MATERIAL_COSTS: self.widgets['material_combo'].set(quote['material'])
+        self.widgets['quantity_entry'].delete(0, END)
+        self.widgets['quantity_entry'].insert(0, str(quote['quantity'] or 1))
+        self.widgets['notes_text'].delete("1.0", END)
+        self.widgets['notes_text'].insert("1.0", quote['notes'] or "")
+        for op in quote['operations']:
+            self.op_counter += 1
+            setup = {"setup_hours": op['setup_hours'] or 0.0, "setup_cost": op['setup_cost'] or 0.0, "machine": op['machine']}
+            if op['method'] == 'time':
+                op_data = {"desc": op['desc'], "method": "time", "hours": op['hours'], "rate": op['rate'], "cost": op['cost'], **setup}
+            else:
+                op_data = {"desc": op['desc'], "method": "fixed", "hours": "-", "rate": "-", "cost": op['cost'], **setup}
+            op_data["id"] = self.op_counter
+            self.quote_operations.append(op_data)
+        self.refresh_operations_table()
+        self.calculate_price()
 
 # ===================================================================
 # ===== MAIN APP CLASS ==============================================
@@ -410,20 +648,56 @@ class MainApp(tb.Window):
             print(f"Could not find icon file at: {ICON_PATH}")
 
 
+        profiler.mark("window created")
+
         database.initialize_db()
         self.refresh_data_from_db()
+        profiler.mark("database loaded")
+        self.pdf_queue = PdfRenderQueue(self)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         
-        try:
-            font_path = 'C:/Windows/Fonts/tahoma.ttf'
-            self.thai_font = font_manager.FontProperties(fname=font_path)
-        except FileNotFoundError:
-            self.thai_font = font_manager.FontProperties()
-
+        self.thai_font = None
         self.configure_styles()
         
         self.pages = {}
         self.create_main_layout()
         self.show_page("quoting")
+        profiler.mark("layout built")
+        self.after_idle(self.on_first_idle)
+
+    def on_first_idle(self):
+        profiler.mark("first idle (window shown)")
+        self.after(WARM_UP_DELAY_MS, lambda: threading.Thread(target=self.warm_up_heavy_modules, daemon=True).start())
+
+    def warm_up_heavy_modules(self):
+        """Imports chart/PDF dependencies in the background so the first use is instant."""
+        for name in HEAVY_MODULES:
+            started = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                print(f"Background import of {name} failed: {e}")
+            profiler.record(f"{name} (background)", time.perf_counter() - started)
+        profiler.report()
+
+    def on_close(self):
+        if self.pdf_queue.active_count() and not messagebox.askyesno(lang.get("app_title"), lang.get("pdf_jobs_running_confirm")):
+            return
+        self.pdf_queue.shutdown()
+        missing = lang.missing_report()["requested"]
+        if missing: print(f"Missing translations ({lang.lang_code}): {', '.join(missing)}")
+        self.destroy()
+
+    def load_thai_font(self):
+        """Font for Thai text in the chart; matplotlib's font_manager is imported on first use."""
+        if self.thai_font is None:
+            from matplotlib import font_manager
+            try:
+                font_path = 'C:/Windows/Fonts/tahoma.ttf'
+                self.thai_font = font_manager.FontProperties(fname=font_path)
+            except FileNotFoundError:
+                self.thai_font = font_manager.FontProperties()
+        return self.thai_font
 
     def configure_styles(self):
         style = tb.Style.get_instance()
@@ -457,15 +731,17 @@ class MainApp(tb.Window):
         self.content_frame.grid(row=0, column=1, sticky="nsew")
         
         self.pages["quoting"] = QuotingPage(self.content_frame, self)
-        self.pages["history"] = PlaceholderPage(self.content_frame, self)
-        self.pages["customers"] = PlaceholderPage(self.content_frame, self)
+        self.pages["history"] = HistoryPage(self.content_frame, self)
+        self.pages["customers"] = CustomersPage(self.content_frame, self)
 
         for page in self.pages.values():
             page.place(x=0, y=0, relwidth=1, relheight=1)
 
     def show_page(self, page_name):
         page = self.pages.get(page_name)
-        if page: page.tkraise()
+        if page:
+            page.tkraise()
+            if hasattr(page, 'on_show'): page.on_show()
 
     def refresh_data_from_db(self):
         all_settings = database.get_settings()
@@ -495,5 +771,8 @@ class MainApp(tb.Window):
             if hasattr(page, 'refresh_data'): page.refresh_data()
 
 if __name__ == "__main__":
+    # จำเป็นสำหรับ process pool ของ PdfRenderQueue เมื่อรันเป็น EXE (PyInstaller)
+    multiprocessing.freeze_support()
+    profiler.mark("module imports")
     app = MainApp()
     app.mainloop()
\ No newline at end of file
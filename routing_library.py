@@ -0,0 +1,123 @@
+# File: routing_library.py
+"""
+Routing library: named, reusable operation sequences ("Flange: turning +
+drilling + grinding") stored in the routings tables.
+
+Routings are indexed in an in-memory trie on every word of their name, so a
+search-as-you-type lookup walks at most len(prefix) nodes per typed word
+instead of scanning the table. Typing several words narrows to routings that
+have a word starting with each of them. Results are ranked by how often a
+routing was inserted, then by name.
+
+    library = get_library()
+    library.search("fla tu")          # -> ["Flange: turning + drilling + grinding"]
+    ops = library.expand("Flange: turning + drilling + grinding", hourly_rates, record_use=True)
+"""
+import re
+import database
+from scheduler import machine_for
+
+WORD = re.compile(r'\w+')
+
+def words(text):
+    return WORD.findall((text or "").casefold())
+
+class RoutingTrie:
+    """Prefix index: each node keeps the ids of every routing with a word passing through it."""
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()
+
+    def add(self, word, routing_id):
+        node = self
+        for char in word:
+            node = node.children.get(char) or node.children.setdefault(char, RoutingTrie())
+            node.ids.add(routing_id)
+
+    def find(self, prefix):
+        node = self
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None: return set()
+        return node.ids
+
+class RoutingLibrary:
+    def __init__(self, routings):
+        self.routings = routings
+        self.by_id = {routing["id"]: routing for routing in routings}
+        self.by_name = {routing["name"].casefold(): routing for routing in routings}
+        self.trie = RoutingTrie()
+        for routing in routings:
+            for word in set(words(routing["name"])):
+                self.trie.add(word, routing["id"])
+
+    def search(self, text, limit=10):
+        """Names of the routings matching every typed word prefix, most used first."""
+        terms = words(text)
+        if not terms: return []
+        ids = None
+        for term in sorted(terms, key=len, reverse=True):
+            found = self.trie.find(term)
+            ids = set(found) if ids is None else ids & found
+            if not ids: return []
+        matches = sorted((self.by_id[i] for i in ids), key=lambda routing: (-routing["use_count"], routing["name"].casefold()))
+        return [routing["name"] for routing in matches[:limit]]
+
+    def get(self, name):
+        return self.by_name.get((name or "").strip().casefold())
+
+    def expand(self, name, hourly_rates, record_use=False):
+        """
+        Operation dicts for a routing, built the same way QuotingPage.add_operation
+        does, priced at the current hourly rates. Returns None for an unknown name;
+        raises ValueError when a time operation's machine has no hourly rate.
+        """
+        routing = self.get(name)
+        if routing is None: return None
+        operations = []
+        for op in routing["operations"]:
+            if op["method"] == "fixed":
+                per_lot = op["per_lot"]
+                operations.append({"desc": op["desc"], "method": "fixed", "hours": "-", "rate": "-", "cost": 0.0 if per_lot else op["cost"],
+                                   "setup_hours": 0.0, "setup_cost": op["cost"] if per_lot else 0.0})
+            else:
+                if op["machine"] not in hourly_rates:
+                    raise ValueError(f"Operation '{op['desc']}' of routing '{routing['name']}' uses machine '{op['machine']}', which has no hourly rate")
+                rate = hourly_rates[op["machine"]]
+                operations.append({"desc": op["desc"], "method": "time", "hours": op["hours"], "rate": rate, "cost": op["hours"] * rate,
+                                   "setup_hours": op["setup_hours"], "setup_cost": op["setup_hours"] * rate, "machine": op["machine"]})
+        if record_use: database.record_routing_use(routing["id"])
+        return operations
+
+def routing_operations(operations, hourly_rates):
+    """
+    Quote operations (QuotingPage dicts) in the form save_routing stores them; the
+    machine is kept instead of the rate. Raises ValueError for a time operation
+    whose machine cannot be resolved (an old quote whose rate matches no machine).
+    """
+    result = []
+    for op in operations:
+        if op["method"] == "fixed":
+            per_lot = bool(op.get("setup_cost")) and not op.get("cost")
+            result.append({"desc": op["desc"], "method": "fixed", "cost": op.get("setup_cost") if per_lot else op["cost"], "per_lot": per_lot})
+        else:
+            machine = machine_for(op, hourly_rates)
+            if machine is None: raise ValueError(f"Cannot tell which machine operation '{op['desc']}' uses")
+            result.append({"desc": op["desc"], "method": "time", "machine": machine, "hours": op["hours"], "setup_hours": op.get("setup_hours") or 0})
+    return result
+
+_library = None
+
+def get_library():
+    """Library built from the database; the trie is rebuilt only after routings are added or deleted."""
+    global _library
+    routings = database.get_routings()
+    if _library is None or _library.routings is not routings:
+        _library = RoutingLibrary(routings)
+    return _library
+
+def search_names(text, limit=10):
+    """search_func for AutocompleteEntry."""
+    return get_library().search(text, limit)
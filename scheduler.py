@@ -0,0 +1,236 @@
+# File: scheduler.py
+"""
+Machine-capacity scheduler and lead-time estimator.
+
+Every quote still competing for machine time (accepted jobs, plus open quotes
+younger than OPEN_QUOTE_DAYS) is replayed in one event-driven simulation:
+
+    estimate = get_scheduler().lead_time(operations, quantity)
+    estimate["finish"], estimate["days"]
+
+Each operation needs one machine of its class (the rate key it was priced with)
+for setup_hours + hours x quantity working hours. A priority queue holds the
+operations that are ready, ordered by ready time, then job priority (accepted
+before open, older before newer, the new quote last); each machine class keeps
+a heap of the working time at which each of its machines becomes free. Popping
+an operation books it on the earliest free machine, and its finish time makes
+the job's next operation ready. This is greedy list scheduling without
+preemption, so it runs in O(n log n) for n operations.
+
+Times inside the simulation are hours from midnight today. Every machine class
+has a ShiftCalendar (its own shifts from the machine_shifts table, or the
+factory default '*') that maps wall-clock hours to cumulative working hours and
+back, so work stops outside shifts and on days off.
+"""
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+import database
+
+OPEN_QUOTE_DAYS = 30
+HORIZON_DAYS = 366
+STATUS_PRIORITY = {'accepted': 0, 'open': 1}
+NEW_JOB_PRIORITY = 2
+
+class ShiftCalendar:
+    """Working intervals of one machine class from day 0 (midnight of the plan date) onwards."""
+    def __init__(self, shifts, first_weekday, horizon_days=HORIZON_DAYS):
+        self.shifts = {}
+        for weekday, start_hour, end_hour in shifts:
+            self.shifts.setdefault(weekday, []).append((start_hour, end_hour))
+        if not any(end > start for day in self.shifts.values() for start, end in day):
+            raise ValueError("Shift calendar has no working hours")
+        self.first_weekday = first_weekday
+        self.starts, self.lengths, self.worked = [], [], []
+        self.days = 0
+        self.extend(horizon_days)
+
+    def extend(self, days):
+        total = self.worked[-1] + self.lengths[-1] if self.starts else 0.0
+        for day in range(self.days, self.days + days):
+            # กะที่ซ้อนกันในวันเดียวกันให้รวมเป็นช่วงเดียว
+            for start, end in sorted(self.shifts.get((self.first_weekday + day) % 7, ())):
+                start, end = day * 24 + start, day * 24 + end
+                if self.starts and start <= self.starts[-1] + self.lengths[-1]:
+                    added = max(end - (self.starts[-1] + self.lengths[-1]), 0.0)
+                    self.lengths[-1] += added
+                else:
+                    added = end - start
+                    self.starts.append(start); self.lengths.append(added); self.worked.append(total)
+                total += added
+        self.days += days
+
+    def working_at(self, wall):
+        """Working hours done between day 0 and wall-clock hour wall."""
+        while wall > self.days * 24: self.extend(HORIZON_DAYS)
+        i = bisect_right(self.starts, wall) - 1
+        if i < 0: return 0.0
+        return self.worked[i] + min(wall - self.starts[i], self.lengths[i])
+
+    def wall_at(self, working, starting=False):
+        """
+        Wall-clock hour at which the given working hours are reached: for a finish
+        the end of the shift it falls on, for a start (starting=True) the next shift.
+        """
+        while working >= self.worked[-1] + self.lengths[-1]: self.extend(HORIZON_DAYS)
+        if starting:
+            i = bisect_right(self.worked, working) - 1
+        else:
+            i = max(bisect_left(self.worked, working) - 1, 0)
+            if working > self.worked[i] + self.lengths[i]: i += 1
+        return self.starts[i] + (working - self.worked[i])
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+def parse_shifts(text):
+    """
+    Shift calendar typed as "Mon-Fri 08:00-12:00, 13:00-17:00; Sat 08:00-12:00"
+    into ((weekday, start_hour, end_hour), ...). Blank text gives ().
+    """
+    shifts = []
+    for part in filter(None, (part.strip() for part in text.split(";"))):
+        days_text, _, times_text = part.partition(" ")
+        days = []
+        for item in days_text.split(","):
+            first, _, last = item.partition("-")
+            try:
+                first, last = WEEKDAYS.index(first.strip().title()), WEEKDAYS.index((last or first).strip().title())
+            except ValueError:
+                raise ValueError(f"Unknown day in shift '{part}' (use {', '.join(WEEKDAYS)})")
+            days += [day % 7 for day in range(first, last + 1 if last >= first else last + 8)]
+        for span in filter(None, (span.strip() for span in times_text.split(","))):
+            try:
+                start, end = (int(h) + int(m) / 60 for h, m in (t.strip().split(":") for t in span.split("-")))
+            except ValueError:
+                raise ValueError(f"Invalid shift time '{span}' (use HH:MM-HH:MM)")
+            if not 0 <= start < end <= 24: raise ValueError(f"Invalid shift time '{span}'")
+            shifts += [(day, start, end) for day in days]
+    return tuple(sorted(shifts))
+
+def format_shifts(shifts):
+    """Inverse of parse_shifts; consecutive days with the same shift times are written as a range."""
+    by_day = {}
+    for weekday, start, end in sorted(shifts):
+        by_day.setdefault(weekday, []).append(f"{int(start):02d}:{round(start % 1 * 60):02d}-{int(end):02d}:{round(end % 1 * 60):02d}")
+    parts, day = [], 0
+    while day < 7:
+        if day not in by_day:
+            day += 1
+            continue
+        last = day
+        while last + 1 in by_day and by_day[last + 1] == by_day[day]: last += 1
+        days = WEEKDAYS[day] if last == day else f"{WEEKDAYS[day]}-{WEEKDAYS[last]}"
+        parts.append(f"{days} {', '.join(by_day[day])}")
+        day = last + 1
+    return "; ".join(parts)
+
+def machine_rates(settings=None):
+    """Hourly rate per machine class (the settings minus the non-rate keys, as on the settings Rates tab)."""
+    settings = settings if settings is not None else database.get_settings()
+    return {key: value for key, value in settings.items() if key not in ('profit_margin', 'Wire EDM_sqmm')}
+
+def machine_for(op, hourly_rates):
+    """Machine class of an operation; quotes saved before it was recorded are matched by their rate."""
+    if op.get("machine"): return op["machine"]
+    if op.get("method") == "fixed" or op.get("rate") in (None, "-"): return None
+    matches = [key for key, rate in hourly_rates.items() if rate == op["rate"]]
+    return matches[0] if len(matches) == 1 else None
+
+def operation_hours(op, quantity):
+    hours = op.get("hours")
+    hours = float(hours) if isinstance(hours, (int, float)) else 0.0
+    return float(op.get("setup_hours") or 0) + hours * quantity
+
+class Scheduler:
+    def __init__(self):
+        self.backlog = None
+        self.backlog_key = None
+        self.calendars = {}
+        self.calendars_key = None
+
+    def load_backlog(self, now):
+        """Backlog jobs as (priority, quote id, [(machine, hours), ...]); reloaded only after quotes or capacity change."""
+        created_since = (now - timedelta(days=OPEN_QUOTE_DAYS)).strftime("%Y-%m-%d")
+        key = (database.schedule_revision(), created_since)
+        if self.backlog_key != key:
+            rates, counts = machine_rates(), database.get_capacity()["machines"]
+            self.backlog = []
+            for job in database.get_backlog(created_since=created_since):
+                steps = [(machine_for(op, rates), operation_hours(op, job["quantity"])) for op in job["operations"]]
+                # งานบนเครื่องที่ตั้งจำนวนเป็น 0 (ส่งจ้างนอก) ไม่กินกำลังการผลิต
+                steps = [(machine, hours) for machine, hours in steps if machine and hours > 0 and counts.get(machine, 1) > 0]
+                if steps: self.backlog.append((STATUS_PRIORITY[job["status"]], job["id"], steps))
+            self.backlog_key = key
+        return self.backlog
+
+    def calendar(self, machine, today):
+        capacity = database.get_capacity()
+        if self.calendars_key is None or self.calendars_key[0] is not capacity or self.calendars_key[1] != today:
+            self.calendars, self.calendars_key = {}, (capacity, today)
+        if machine not in self.calendars:
+            shifts = capacity["shifts"].get(machine) or capacity["shifts"].get(database.DEFAULT_CALENDAR, database.DEFAULT_SHIFTS)
+            self.calendars[machine] = ShiftCalendar(shifts, today.weekday())
+        return self.calendars[machine]
+
+    def simulate(self, jobs, now):
+        """
+        jobs: (priority, job_id, [(machine, hours), ...]). Returns {job_id: [(machine, start, finish), ...]}
+        with start/finish in wall-clock hours from midnight of now's date.
+        """
+        today = now.date()
+        origin = (now - datetime.combine(today, datetime.min.time())).total_seconds() / 3600
+        counts = database.get_capacity()["machines"]
+        free = {}
+        ready = [(origin, priority, index, 0) for index, (priority, _, _) in enumerate(jobs)]
+        heapq.heapify(ready)
+        booked = {job_id: [] for _, job_id, _ in jobs}
+        while ready:
+            ready_at, priority, index, step = heapq.heappop(ready)
+            _, job_id, steps = jobs[index]
+            machine, hours = steps[step]
+            calendar = self.calendar(machine, today)
+            if machine not in free:
+                count = counts.get(machine, 1)
+                if count <= 0: raise ValueError(f"No machines available for '{machine}'")
+                free[machine] = [calendar.working_at(origin)] * count
+            # เครื่องที่ว่างเร็วที่สุดของกลุ่ม เริ่มได้เมื่อทั้งเครื่องว่างและงานขั้นก่อนหน้าเสร็จแล้ว
+            start = max(free[machine][0], calendar.working_at(ready_at))
+            finish = start + hours
+            heapq.heapreplace(free[machine], finish)
+            finish_at = calendar.wall_at(finish)
+            booked[job_id].append((machine, calendar.wall_at(start, starting=True), finish_at))
+            if step + 1 < len(steps): heapq.heappush(ready, (finish_at, priority, index, step + 1))
+        return booked
+
+    def lead_time(self, operations, quantity, hourly_rates=None, now=None):
+        """
+        Lead time of a new quote booked behind the current backlog. Returns
+        {"finish": datetime, "days": calendar days, "operations": [(desc, machine, start, finish)],
+        "backlog_jobs": count}, or None when no operation needs a machine.
+        """
+        now = now or datetime.now()
+        rates = machine_rates(hourly_rates)
+        steps, descs = [], []
+        for op in operations:
+            machine, hours = machine_for(op, rates), operation_hours(op, quantity)
+            if machine and hours > 0:
+                steps.append((machine, hours)); descs.append(op.get("desc", ""))
+        if not steps: return None
+        backlog = self.load_backlog(now)
+        booked = self.simulate(backlog + [(NEW_JOB_PRIORITY, None, steps)], now)[None]
+        midnight = datetime.combine(now.date(), datetime.min.time())
+        at = lambda hours: midnight + timedelta(hours=hours)
+        finish = at(booked[-1][2])
+        return {
+            "finish": finish, "days": (finish.date() - now.date()).days,
+            "operations": [(desc, machine, at(start), at(end)) for desc, (machine, start, end) in zip(descs, booked)],
+            "backlog_jobs": len(backlog),
+        }
+
+_scheduler = None
+
+def get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler()
+    return _scheduler
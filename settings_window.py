@@ -4,9 +4,14 @@ from tkinter import ttk
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from tkinter import messagebox
+from tkinter import filedialog
 import database
+import wire_edm
+import scheduler
 from language_manager import lang
 from ttkbootstrap.dialogs import Querybox
+from virtual_list import VirtualList
+from tree_view_model import TreeViewModel
 
 class SettingsWindow(tb.Toplevel):
     def __init__(self, parent):
@@ -23,14 +28,20 @@ class SettingsWindow(tb.Toplevel):
         general_frame = tb.Frame(notebook, padding=15)
         rates_frame = tb.Frame(notebook, padding=15)
         materials_frame = tb.Frame(notebook, padding=15)
+        rules_frame = tb.Frame(notebook, padding=15)
+        capacity_frame = tb.Frame(notebook, padding=15)
 
         notebook.add(general_frame, text=lang.get("tab_general"))
         notebook.add(rates_frame, text=lang.get("tab_rates"))
         notebook.add(materials_frame, text=lang.get("tab_materials"))
+        notebook.add(rules_frame, text=lang.get("tab_price_rules"))
+        notebook.add(capacity_frame, text=lang.get("tab_capacity"))
 
         self.create_general_tab(general_frame)
         self.create_rates_tab(rates_frame)
         self.create_materials_tab(materials_frame)
+        self.create_price_rules_tab(rules_frame)
+        self.create_capacity_tab(capacity_frame)
 
         # เปลี่ยนปุ่ม Save ให้เรียกใช้ฟังก์ชันใหม่ที่ถูกต้อง
         save_button = tb.Button(self, text=lang.get("save_all_settings"), bootstyle="success", command=self.save_all_changes)
@@ -61,6 +72,10 @@ class SettingsWindow(tb.Toplevel):
         tb.Separator(parent_frame, orient=HORIZONTAL).pack(fill=X, pady=15)
         tb.Label(parent_frame, text=lang.get("rates_special_header"), font=("Helvetica", 12, "bold")).pack(pady=(0, 15), anchor=tk.W)
         self.create_setting_row(parent_frame, 'Wire EDM_sqmm', lang.get("rate_sqmm"))
+        self.create_wire_speeds_row(parent_frame)
+
+        import_btn = tb.Button(parent_frame, text=lang.get("import_file_btn"), bootstyle="info-outline", command=self.import_rates_file)
+        import_btn.pack(fill=X, pady=(15, 0))
         
     def create_setting_row(self, parent, key_name, label_text):
         row_frame = tb.Frame(parent)
@@ -71,18 +86,43 @@ class SettingsWindow(tb.Toplevel):
         entry.pack(side=LEFT, fill=X, expand=True)
         self.settings_widgets[key_name] = entry
 
+    def create_wire_speeds_row(self, parent):
+        """ความเร็วตัด Wire EDM ที่วัดได้จริงต่อวัสดุ (ช่องว่าง = ใช้อัตราจาก Wire EDM_sqmm)"""
+        frame = tb.Labelframe(parent, text=lang.get("wire_speeds_header"), padding=10)
+        frame.pack(fill=X, pady=(10, 0))
+        frame.grid_columnconfigure(1, weight=1)
+        self.wire_material_combo = tb.Combobox(frame, state="readonly", values=list(database.get_all_materials()))
+        self.wire_material_combo.grid(row=0, column=0, sticky=W, padx=5, pady=3)
+        self.wire_material_combo.bind("<<ComboboxSelected>>", self.load_wire_speeds)
+        self.wire_speeds_entry = tb.Entry(frame)
+        self.wire_speeds_entry.grid(row=0, column=1, sticky=EW, padx=5, pady=3)
+        tb.Button(frame, text=lang.get("wire_speeds_save_btn"), bootstyle="success-outline", command=self.save_wire_speeds).grid(row=0, column=2, padx=5, pady=3)
+        tb.Label(frame, text=lang.get("wire_speeds_note"), bootstyle="secondary", wraplength=600).grid(row=1, column=0, columnspan=3, sticky=W, pady=(5, 0))
+        if self.wire_material_combo["values"]:
+            self.wire_material_combo.current(0)
+            self.load_wire_speeds()
+
+    def load_wire_speeds(self, event=None):
+        self.wire_speeds_entry.delete(0, END)
+        self.wire_speeds_entry.insert(0, wire_edm.format_speed_points(database.get_wire_edm_speeds().get(self.wire_material_combo.get(), ())))
+
+    def save_wire_speeds(self):
+        material = self.wire_material_combo.get()
+        if not material: return
+        try:
+            database.set_wire_edm_speeds(material, wire_edm.parse_speed_points(self.wire_speeds_entry.get()))
+        except ValueError as e:
+            messagebox.showerror(lang.get("error_title"), str(e), parent=self)
+            return
+        messagebox.showinfo(lang.get("success_title"), lang.get("settings_saved"), parent=self)
+
     def create_materials_tab(self, parent):
-        table_frame = tb.Frame(parent)
-        table_frame.pack(fill=BOTH, expand=True)
-        columns = {"name": (lang.get("material"), 400), "cost": (lang.get("op_fixed_cost"), 100)}
-        self.material_tree = tb.Treeview(table_frame, columns=[val[0] for val in columns.values()], show='headings', bootstyle="primary")
-        for val in columns.values():
-            self.material_tree.heading(val[0], text=val[0])
-            self.material_tree.column(val[0], width=val[1])
-        self.material_tree.pack(side=LEFT, fill=BOTH, expand=True)
-        scrollbar = tb.Scrollbar(table_frame, orient=VERTICAL, command=self.material_tree.yview)
-        self.material_tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=RIGHT, fill=Y)
+        # รายการวัสดุอาจมีหลายพันรายการ จึงใช้ VirtualList ที่ render เฉพาะแถวที่มองเห็น
+        columns = [(lang.get("material"), 400), (lang.get("op_fixed_cost"), 100)]
+        material_list = VirtualList(parent, columns, count_rows=lambda: 0, fetch_rows=lambda offset, limit: [])
+        material_list.pack(fill=BOTH, expand=True)
+        self.material_tree = material_list.tree
+        self.material_view = TreeViewModel(material_list)
         self.material_tree.bind("<Double-1>", self.edit_material_cost)
 
         action_frame = tb.Labelframe(parent, text=lang.get("op_add_new"), padding=10)
@@ -99,13 +139,12 @@ class SettingsWindow(tb.Toplevel):
 
         delete_btn = tb.Button(parent, text=lang.get("op_delete_btn"), bootstyle="danger-outline", command=self.delete_selected_material)
         delete_btn.pack(fill=X, pady=(10,0))
+        import_btn = tb.Button(parent, text=lang.get("import_file_btn"), bootstyle="info-outline", command=self.import_materials_file)
+        import_btn.pack(fill=X, pady=(10,0))
     
     def refresh_material_tree(self):
-        for item in self.material_tree.get_children():
-            self.material_tree.delete(item)
         materials = database.get_all_materials()
-        for name, cost in materials.items():
-            self.material_tree.insert("", END, values=(name, f"{cost:,.2f}"))
+        self.material_view.sync((name, (name, f"{cost:,.2f}")) for name, cost in materials.items())
 
     def add_new_material(self):
         name = self.new_mat_name_entry.get().strip()
@@ -125,21 +164,19 @@ class SettingsWindow(tb.Toplevel):
             messagebox.showerror(lang.get("error_title"), lang.get("error_numeric_only"))
 
     def delete_selected_material(self):
-        selected_item = self.material_tree.selection()
-        if not selected_item:
+        selected = self.material_view.selected_keys()
+        if not selected:
             messagebox.showwarning("ไม่ได้เลือกรายการ", "กรุณาเลือกวัสดุที่ต้องการลบ")
             return
-        item_values = self.material_tree.item(selected_item, "values")
-        material_name = item_values[0]
+        material_name = selected[0]
         if messagebox.askyesno("ยืนยันการลบ", f"คุณต้องการลบ '{material_name}' ใช่หรือไม่?"):
             database.delete_material(material_name)
             self.refresh_material_tree()
 
     def edit_material_cost(self, event):
-        selected_item = self.material_tree.selection()
-        if not selected_item: return
-        item_values = self.material_tree.item(selected_item, "values")
-        name, old_cost = item_values[0], item_values[1]
+        selected = self.material_view.selected_keys()
+        if not selected: return
+        name, old_cost = self.material_view.rows[selected[0]]
         new_cost = Querybox.get_string(prompt=f"แก้ไขราคาสำหรับ:\n{name}", title="แก้ไขราคาวัสดุ", initialvalue=old_cost.replace(',', ''))
         if new_cost:
             try:
@@ -148,6 +185,135 @@ class SettingsWindow(tb.Toplevel):
             except ValueError:
                 messagebox.showerror(lang.get("error_title"), lang.get("error_numeric_only"))
 
+    def create_price_rules_tab(self, parent):
+        """กฎราคา: อัตรากำไร/ส่วนลดตามขั้นจำนวน, ราคาขั้นต่ำ และค่าตั้งเครื่องต่อ lot แยกตามลูกค้า/วัสดุได้"""
+        self.rule_type_names = {rule_type: lang.get(f"rule_type_{rule_type}") for rule_type in database.PRICE_RULE_TYPES}
+        columns = {"col_rule_type": (lang.get("col_rule_type"), 120), "col_customer": (lang.get("col_customer"), 150), "col_material": (lang.get("col_material"), 150),
+                   "col_min_quantity": (lang.get("col_min_quantity"), 80), "col_rule_value": (lang.get("col_rule_value"), 80)}
+        self.rules_tree = tb.Treeview(parent, columns=[val[0] for val in columns.values()], show='headings', bootstyle="primary", height=10)
+        for val in columns.values(): self.rules_tree.heading(val[0], text=val[0]); self.rules_tree.column(val[0], width=val[1], anchor=W)
+        self.rules_tree.pack(fill=BOTH, expand=True)
+        self.rules_view = TreeViewModel(self.rules_tree)
+
+        form = tb.Labelframe(parent, text=lang.get("op_add_new"), padding=10)
+        form.pack(fill=X, pady=(15, 0))
+        form.grid_columnconfigure(1, weight=1)
+        form.grid_columnconfigure(3, weight=1)
+        tb.Label(form, text=lang.get("col_rule_type")).grid(row=0, column=0, sticky=W, padx=5, pady=3)
+        self.rule_type_combo = tb.Combobox(form, state="readonly", values=list(self.rule_type_names.values()))
+        self.rule_type_combo.current(0)
+        self.rule_type_combo.grid(row=0, column=1, sticky=EW, padx=5, pady=3)
+        tb.Label(form, text=lang.get("col_rule_value")).grid(row=0, column=2, sticky=W, padx=5, pady=3)
+        self.rule_value_entry = tb.Entry(form, width=10)
+        self.rule_value_entry.grid(row=0, column=3, sticky=EW, padx=5, pady=3)
+        tb.Label(form, text=lang.get("col_customer")).grid(row=1, column=0, sticky=W, padx=5, pady=3)
+        self.rule_customer_entry = tb.Entry(form)
+        self.rule_customer_entry.grid(row=1, column=1, sticky=EW, padx=5, pady=3)
+        tb.Label(form, text=lang.get("col_material")).grid(row=1, column=2, sticky=W, padx=5, pady=3)
+        self.rule_material_combo = tb.Combobox(form, values=[""] + list(database.get_all_materials()))
+        self.rule_material_combo.grid(row=1, column=3, sticky=EW, padx=5, pady=3)
+        tb.Label(form, text=lang.get("col_min_quantity")).grid(row=2, column=0, sticky=W, padx=5, pady=3)
+        self.rule_min_qty_entry = tb.Entry(form, width=10)
+        self.rule_min_qty_entry.insert(0, "1")
+        self.rule_min_qty_entry.grid(row=2, column=1, sticky=EW, padx=5, pady=3)
+        tb.Button(form, text=lang.get("op_add_btn"), bootstyle="success", command=self.add_price_rule).grid(row=2, column=3, sticky=EW, padx=5, pady=3)
+        tb.Label(parent, text=lang.get("price_rules_note"), bootstyle="secondary", wraplength=600).pack(anchor=W, pady=(10, 0))
+
+        tb.Button(parent, text=lang.get("op_delete_btn"), bootstyle="danger-outline", command=self.delete_selected_price_rule).pack(fill=X, pady=(10, 0))
+        self.refresh_price_rules()
+
+    def refresh_price_rules(self):
+        any_text = lang.get("rule_any")
+        self.rules_view.sync((rule['id'], (self.rule_type_names[rule['rule_type']], rule['customer'] or any_text, rule['material'] or any_text,
+                                           rule['min_quantity'], f"{rule['value']:g}")) for rule in database.get_price_rules())
+
+    def add_price_rule(self):
+        rule_type = {name: rule_type for rule_type, name in self.rule_type_names.items()}[self.rule_type_combo.get()]
+        try:
+            database.add_price_rule(rule_type, float(self.rule_value_entry.get()), int(self.rule_min_qty_entry.get() or 1),
+                                    self.rule_customer_entry.get(), self.rule_material_combo.get())
+        except ValueError as e:
+            messagebox.showerror(lang.get("error_title"), lang.get("error_numeric_only") + f"\n({e})", parent=self)
+            return
+        self.rule_value_entry.delete(0, END)
+        self.refresh_price_rules()
+
+    def delete_selected_price_rule(self):
+        for rule_id in self.rules_view.selected_keys(): database.delete_price_rule(rule_id)
+        self.refresh_price_rules()
+
+    def create_capacity_tab(self, parent):
+        """จำนวนเครื่องและกะทำงานของแต่ละกลุ่มเครื่อง ใช้คำนวณ lead time (ช่องกะว่าง = ใช้ปฏิทินกลาง)"""
+        capacity = database.get_capacity()
+        machines = sorted(set(scheduler.machine_rates()) | set(capacity["machines"]))
+        parent.grid_columnconfigure(2, weight=1)
+        tb.Label(parent, text=lang.get("capacity_machine"), font=("Helvetica", 10, "bold")).grid(row=0, column=0, sticky=W, padx=5, pady=(0, 8))
+        tb.Label(parent, text=lang.get("capacity_count"), font=("Helvetica", 10, "bold")).grid(row=0, column=1, sticky=W, padx=5, pady=(0, 8))
+        tb.Label(parent, text=lang.get("capacity_shifts"), font=("Helvetica", 10, "bold")).grid(row=0, column=2, sticky=W, padx=5, pady=(0, 8))
+        self.capacity_widgets = {}
+        for row, machine in enumerate([database.DEFAULT_CALENDAR] + machines, start=1):
+            label = lang.get("capacity_default_calendar") if machine == database.DEFAULT_CALENDAR else machine
+            tb.Label(parent, text=label).grid(row=row, column=0, sticky=W, padx=5, pady=3)
+            count_entry = None
+            if machine != database.DEFAULT_CALENDAR:
+                count_entry = tb.Entry(parent, width=6)
+                count_entry.insert(0, str(capacity["machines"].get(machine, 1)))
+                count_entry.grid(row=row, column=1, sticky=W, padx=5, pady=3)
+            shifts_entry = tb.Entry(parent)
+            shifts_entry.insert(0, scheduler.format_shifts(capacity["shifts"].get(machine, ())))
+            shifts_entry.grid(row=row, column=2, sticky=EW, padx=5, pady=3)
+            self.capacity_widgets[machine] = (count_entry, shifts_entry)
+        row = len(self.capacity_widgets) + 1
+        tb.Label(parent, text=lang.get("capacity_note"), bootstyle="secondary", wraplength=600).grid(row=row, column=0, columnspan=3, sticky=W, pady=(10, 0))
+        tb.Button(parent, text=lang.get("capacity_save_btn"), bootstyle="success-outline", command=self.save_capacity).grid(row=row + 1, column=0, columnspan=3, sticky=EW, pady=(10, 0))
+
+    def save_capacity(self):
+        capacity = database.get_capacity()
+        try:
+            changes = []
+            for machine, (count_entry, shifts_entry) in self.capacity_widgets.items():
+                count = int(count_entry.get()) if count_entry is not None else None
+                if count is not None and count < 0: raise ValueError(lang.get("error_numeric_only"))
+                shifts = scheduler.parse_shifts(shifts_entry.get())
+                if machine == database.DEFAULT_CALENDAR and not shifts: raise ValueError(lang.get("capacity_default_required"))
+                changes.append((machine, count, shifts))
+        except ValueError as e:
+            messagebox.showerror(lang.get("error_title"), str(e), parent=self)
+            return
+        for machine, count, shifts in changes:
+            if count is not None and count != capacity["machines"].get(machine): database.set_machine_count(machine, count)
+            if shifts != capacity["shifts"].get(machine, ()): database.set_machine_shifts(machine, shifts)
+        messagebox.showinfo(lang.get("success_title"), lang.get("settings_saved"), parent=self)
+
+    def ask_import_file(self):
+        return filedialog.askopenfilename(parent=self, title=lang.get("import_file_title"), filetypes=[("CSV / Excel", "*.csv *.xlsx"), ("All files", "*.*")])
+
+    def import_materials_file(self):
+        filepath = self.ask_import_file()
+        if not filepath: return
+        try:
+            count = database.import_materials_from_file(filepath)
+        except (OSError, ValueError) as e:
+            messagebox.showerror(lang.get("error_title"), str(e))
+            return
+        self.refresh_material_tree()
+        messagebox.showinfo(lang.get("success_title"), lang.get("import_success", count=count))
+
+    def import_rates_file(self):
+        filepath = self.ask_import_file()
+        if not filepath: return
+        try:
+            count = database.import_settings_from_file(filepath)
+        except (OSError, ValueError) as e:
+            messagebox.showerror(lang.get("error_title"), str(e))
+            return
+        settings = database.get_settings()
+        for key, widget in self.settings_widgets.items():
+            if key in settings:
+                widget.delete(0, END)
+                widget.insert(0, str(settings[key]))
+        messagebox.showinfo(lang.get("success_title"), lang.get("import_success", count=count))
+
     def load_current_values(self):
         settings = database.get_settings()
         for key, widget in self.settings_widgets.items():
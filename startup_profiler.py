@@ -0,0 +1,70 @@
+# File: startup_profiler.py
+import builtins
+import sys
+import time
+
+class StartupProfiler:
+    """
+    Collects import and initialisation timings for --profile-startup.
+
+    When enabled, the builtin __import__ is wrapped so every first-time import made
+    directly by the application modules is timed (inclusive of its own imports).
+    Phases of MainApp start-up are recorded with mark(). When disabled every method
+    is a no-op, so the normal start-up path pays nothing.
+    """
+    FLAG = "--profile-startup"
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.imports = []
+        self.phases = []
+        self._depth = 0
+        self._original_import = None
+        if enabled: self._install_import_timer()
+
+    @classmethod
+    def from_argv(cls, argv):
+        return cls(enabled=cls.FLAG in argv)
+
+    def _install_import_timer(self):
+        self._original_import = builtins.__import__
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if self._depth or name in sys.modules:
+                return self._original_import(name, globals, locals, fromlist, level)
+            self._depth += 1
+            started = time.perf_counter()
+            try:
+                return self._original_import(name, globals, locals, fromlist, level)
+            finally:
+                self._depth -= 1
+                self.imports.append((name, time.perf_counter() - started))
+        builtins.__import__ = timed_import
+
+    def stop_import_timer(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def mark(self, label):
+        """Records the time spent since the previous mark under label."""
+        if not self.enabled: return
+        now = time.perf_counter()
+        self.phases.append((label, now - self.last))
+        self.last = now
+
+    def record(self, label, seconds):
+        if self.enabled: self.imports.append((label, seconds))
+
+    def report(self):
+        if not self.enabled: return
+        self.stop_import_timer()
+        lines = ["", "=== Startup profile ===", "Imports (first load, inclusive):"]
+        for name, seconds in sorted(self.imports, key=lambda item: item[1], reverse=True):
+            if seconds >= 0.001: lines.append(f"  {seconds * 1000:9.1f} ms  {name}")
+        lines.append("Phases:")
+        for label, seconds in self.phases:
+            lines.append(f"  {seconds * 1000:9.1f} ms  {label}")
+        lines.append(f"Total since process start of profiler: {(time.perf_counter() - self.start) * 1000:.1f} ms")
+        print("\n".join(lines), flush=True)
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cycle_time
+
+def old_g83_minutes(depth, feed, rapid, count, peck_depth_q):
+    """The peck loop OperationManagerWindow used before the closed form."""
+    total_rapid_dist, current_drilled_depth, depth_remaining = 0, 0, depth
+    while depth_remaining > 1e-4:
+        peck = min(peck_depth_q, depth_remaining)
+        depth_after_peck = current_drilled_depth + peck
+        depth_remaining -= peck
+        if depth_remaining > 1e-4:
+            total_rapid_dist += depth_after_peck + current_drilled_depth
+        current_drilled_depth = depth_after_peck
+    return (depth / feed + total_rapid_dist / rapid) * count
+
+@pytest.mark.parametrize("depth, peck", [(10, 3), (9, 3), (9.00005, 3), (2, 5), (0, 2), (45.5, 0.7), (30, 30), (100, 1)])
+@pytest.mark.parametrize("count", [1, 8])
+def test_g83_closed_form_matches_old_loop(depth, peck, count):
+    expected = old_g83_minutes(depth, 150.0, 5000.0, count, peck)
+    assert float(cycle_time.drilling_cycle_time("G83", depth, 150.0, 5000.0, count, peck=peck)) == pytest.approx(expected)
+
+def test_g81_and_g82():
+    assert float(cycle_time.drilling_cycle_time("G81", 10, 100, count=3)) == pytest.approx(0.3)
+    assert float(cycle_time.drilling_cycle_time("G82", 10, 100, count=3, dwell_ms=600)) == pytest.approx(0.33)
+
+def test_mixed_cycles_in_one_call():
+    minutes = cycle_time.drilling_cycle_time(["G81", "G82", "G83"], [10, 10, 10], 100, 5000, [1, 1, 2], dwell_ms=[0, 600, 0], peck=[0, 0, 3])
+    expected = [0.1, 0.11, old_g83_minutes(10, 100, 5000, 2, 3)]
+    assert minutes.tolist() == pytest.approx(expected)
+
+@pytest.mark.parametrize("kwargs", [
+    {"feed": 0}, {"feed": -5}, {"rapid": 0}, {"depth": -1}, {"count": -1}, {"cycle": "G84"},
+    {"cycle": "G83", "peck": 0}, {"cycle": "G83", "peck": None}, {"cycle": "G82", "dwell_ms": -10},
+])
+def test_invalid_input_raises_value_error(kwargs):
+    args = dict({"cycle": "G81", "depth": 10, "feed": 100, "rapid": 5000, "count": 1, "peck": 3}, **kwargs)
+    with pytest.raises(ValueError):
+        cycle_time.drilling_cycle_time(**args)
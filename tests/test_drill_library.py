@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import drill_library
+
+ROWS = [
+    ["Materail", "Hi Carbon", "", "", "", "", "", ""],
+    ["", "", "", "", "", "", "", ""],
+    ["Tool diameter", "S", "F", "Cutting speed", "Feed speed per tooth", "Cycle", "Q", "Number of tooth"],
+    ["2", "1800", "90", "11.3", "0.025", "G83", "0.4", "2"],
+    ["1", "2000", "70", "6.283 ", "0.018", "g83", "0.2", "2"],
+    ["3", "1500", "100", "14.1", "0.033", "", "", "2"],
+    ["Material", "Aluminium"],
+    ["Tool diameter", "S", "F"],
+    ["5", "4000", "400", "62.8", "0.05", "G81", "", "2"],
+]
+
+def make_library():
+    return drill_library.DrillLibrary({name: drill_library.DrillTable.from_rows(rows) for name, rows in drill_library.parse_rows(ROWS).items()})
+
+def test_parse_rows_splits_material_blocks():
+    tables = drill_library.parse_rows(ROWS)
+    assert list(tables) == ["Hi Carbon", "Aluminium"]
+    assert [row[0] for row in tables["Hi Carbon"]] == [2.0, 1.0, 3.0]
+    assert tables["Hi Carbon"][1] == (1.0, 2000.0, 70.0, 6.283, 0.018, "G83", 0.2, 2.0)
+    # ช่อง Cycle ว่างถือเป็น G83 และ Q ที่ว่างเป็น None
+    assert tables["Hi Carbon"][2][5:7] == ("G83", None)
+
+def test_lookup_nearest_and_interpolated():
+    library = make_library()
+    assert library.lookup("Hi Carbon", 1.4)["S"] == 2000.0
+    assert library.lookup("Hi Carbon", 1.6)["diameter"] == 2.0
+    assert library.lookup("Hi Carbon", 1.5, interpolate=True)["F"] == pytest.approx(80.0)
+    assert library.lookup("Hi Carbon", 10)["diameter"] == 3.0
+
+def test_lookup_many_matches_lookup():
+    library = make_library()
+    diameters = [0.5, 1.4, 1.6, 2.5, 9.0]
+    many = library.lookup_many("Hi Carbon", diameters)
+    assert many["S"].tolist() == [library.lookup("Hi Carbon", d)["S"] for d in diameters]
+
+def test_unknown_material_raises_even_with_one_table():
+    library = drill_library.DrillLibrary({"Hi Carbon": make_library().table("Hi Carbon")})
+    with pytest.raises(ValueError, match="Stainless"):
+        library.lookup("Stainless", 3)
+    with pytest.raises(ValueError):
+        library.lookup_many("", [3])
+
+def test_load_writes_and_reuses_binary_cache(tmp_path):
+    source = tmp_path / "drills.csv"
+    source.write_text("\n".join(",".join(row) for row in ROWS), encoding="utf-8")
+    cache = tmp_path / "cache" / "drills.npz"
+    first = drill_library.DrillLibrary.load(str(source), str(cache))
+    assert cache.exists()
+    second = drill_library.DrillLibrary.load(str(source), str(cache))
+    assert second.materials() == first.materials()
+    assert second.lookup("Hi Carbon", 1.6) == first.lookup("Hi Carbon", 1.6)
@@ -0,0 +1,79 @@
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gcode_time
+
+def estimate(program, **kwargs):
+    return gcode_time.estimate_lines(program.strip().splitlines(), **kwargs)
+
+def test_rapid_and_linear_moves():
+    result = estimate("""
+        G21 G90
+        G0 X100 (rapid)
+        G1 X200 Y0 F100 ; feed
+        G91 G1 Y50
+    """, rapid_rate=5000)
+    tool = result.tools[0]
+    assert tool.rapid_mm == pytest.approx(100) and tool.rapid_minutes == pytest.approx(0.02)
+    assert tool.feed_mm == pytest.approx(150) and tool.feed_minutes == pytest.approx(1.5)
+
+def test_inch_units_apply_to_feed_on_the_same_block():
+    tool = estimate("G20 G1 X1 F10").tools[0]
+    assert tool.feed_mm == pytest.approx(25.4)
+    assert tool.feed_minutes == pytest.approx(0.1)
+
+def test_feed_per_rev():
+    tool = estimate("S1000 G95 G1 X10 F0.1").tools[0]
+    assert tool.feed_minutes == pytest.approx(10 / 100)
+
+def test_arcs_with_centre_offsets_and_radius():
+    full = estimate("G1 X10 Y0 F100\nG2 X10 Y0 I-10 J0").tools[0]
+    assert full.feed_mm == pytest.approx(10 + 2 * math.pi * 10)
+    quarter = estimate("G0 X10 Y0\nG3 X0 Y10 R10 F100").tools[0]
+    assert quarter.feed_mm == pytest.approx(math.pi * 10 / 2)
+    large = estimate("G0 X10 Y0\nG2 X0 Y10 R-10 F100").tools[0]
+    assert large.feed_mm == pytest.approx(3 * math.pi * 10 / 2)
+    helix = estimate("G17 G0 X10 Y0 Z0\nG3 X10 Y0 I-10 Z-5 F100").tools[0]
+    assert helix.feed_mm == pytest.approx(math.hypot(2 * math.pi * 10, 5))
+
+def test_canned_cycles_until_g80():
+    result = estimate("""
+        G0 X0 Y0 Z10
+        G99 G81 X0 Y0 Z-5 R2 F100
+        X10
+        G80
+        X20
+    """)
+    tool = result.tools[0]
+    assert tool.holes == 2
+    assert tool.feed_mm == pytest.approx(14)
+    assert tool.feed_minutes == pytest.approx(0.14)
+    # Z10 -> R2, ก้นรู -> R2 (G99), 10 mm ไปรูที่สอง, R2 -> R2, ก้นรู -> R2 แล้ว X20 เป็น rapid
+    assert tool.rapid_mm == pytest.approx(10 + 8 + 7 + 10 + 7 + 10)
+
+def test_g83_pecks_and_g82_dwell():
+    peck = estimate("G0 Z2\nG83 X0 Y0 Z-5 R2 Q2 F100").tools[0]
+    # Z0 -> Z2, ลึก 7 mm, Q2 -> 4 peck, ถอย 3 ครั้ง = (n-1)^2 * Q = 18 mm
+    assert peck.rapid_mm == pytest.approx(2 + 7 + 18)
+    dwell = estimate("G0 Z2\nG82 X0 Y0 Z-5 R2 P600 F100").tools[0]
+    assert dwell.dwell_minutes == pytest.approx(0.01)
+
+def test_tool_changes_split_time_per_tool():
+    result = estimate("""
+        T1 M06
+        G1 X10 F100
+        T2 M06
+        G1 X30
+        G4 P500
+    """, tool_change_minutes=0.25)
+    assert sorted(result.tools) == [1, 2]
+    assert result.tool_changes == 2
+    assert result.tools[1].feed_minutes == pytest.approx(0.1)
+    assert result.tools[2].feed_minutes == pytest.approx(0.2)
+    assert result.tools[2].dwell_minutes == pytest.approx(500 / 60000)
+    assert result.total_minutes == pytest.approx(0.3 + 500 / 60000 + 0.5)
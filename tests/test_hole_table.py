@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import drill_library
+import hole_table
+
+def test_rows_without_header_use_field_order():
+    holes = hole_table.parse_hole_rows([["6.8", "15", "4", "g81"], ["3.3", "10"], ["", ""]])
+    assert holes == [{"diameter": 6.8, "depth": 15.0, "count": 4, "cycle": "G81"},
+                     {"diameter": 3.3, "depth": 10.0, "count": 1, "cycle": None}]
+
+def test_header_columns_in_any_order():
+    holes = hole_table.parse_hole_rows([["Qty", "Depth", "Cycle", "Diameter"], ["2", "12", "G83", "5"]])
+    assert holes == [{"diameter": 5.0, "depth": 12.0, "count": 2, "cycle": "G83"}]
+
+@pytest.mark.parametrize("header", [
+    ["", "Diameter", "Depth", "Qty"],          # คอลัมน์แรกว่าง (เช่นคอลัมน์ลำดับใน Excel)
+    ["1", "Diameter", "Depth", "Qty"],         # ช่องแรกเป็นตัวเลข
+    ["No.", "ขนาด", "ความลึก", "จำนวน"],
+])
+def test_header_detected_from_whole_row(header):
+    holes = hole_table.parse_hole_rows([header, ["A1", "8.5", "20", "3"]])
+    assert holes == [{"diameter": 8.5, "depth": 20.0, "count": 3, "cycle": None}]
+
+def test_unknown_header_needs_diameter_and_depth():
+    with pytest.raises(ValueError, match="diameter"):
+        hole_table.parse_hole_rows([["Size", "Length"], ["5", "10"]])
+
+def test_invalid_rows_raise():
+    with pytest.raises(ValueError, match="row 2"):
+        hole_table.parse_hole_rows([["5", "10"], ["5", "x"]])
+    with pytest.raises(ValueError, match="G84"):
+        hole_table.parse_hole_rows([["5", "10", "1", "G84"]])
+
+def test_pasted_text_with_tabs_and_thousands_separator():
+    holes = hole_table.parse_pasted_text("Diameter\tDepth\tQty\n10\t1,200\t2\n")
+    assert holes == [{"diameter": 10.0, "depth": 1200.0, "count": 2, "cycle": None}]
+
+def test_time_hole_table_uses_library_parameters():
+    rows = [["Material", "Steel"], ["Tool diameter", "S", "F"], ["5", "1000", "100", "", "", "G81", "1", "2"]]
+    library = drill_library.DrillLibrary({name: drill_library.DrillTable.from_rows(r) for name, r in drill_library.parse_rows(rows).items()})
+    timed = hole_table.time_hole_table([{"diameter": 5.2, "depth": 10.0, "count": 3, "cycle": None}], "Steel", library=library)
+    assert timed[0]["cycle"] == "G81" and timed[0]["feed"] == 100.0
+    assert timed[0]["minutes"] == pytest.approx(10 / 100 * 3)
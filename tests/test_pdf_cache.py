@@ -0,0 +1,76 @@
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdf_generator
+from pdf_cache import PdfRenderCache
+
+class FakeRenderer:
+    """Stands in for QuoteRenderer: the 'PDF' is just the rendered text."""
+    template_name = 'quote.html'
+
+    def __init__(self, directory):
+        self.templates_dir = str(directory)
+        self.css_path = os.path.join(self.templates_dir, 'style.css')
+        for path in (os.path.join(self.templates_dir, self.template_name), self.css_path):
+            with open(path, 'w') as f: f.write('x')
+        self.renders = 0
+        self.html_renders = 0
+
+    def render_html(self, quote_data):
+        self.html_renders += 1
+        return f"{quote_data['quote_id']}|{quote_data['date']}|{quote_data['job_name']}"
+
+    def write_pdf(self, html, target):
+        self.renders += 1
+        with open(target, 'w') as f: f.write(html)
+
+def setup_fakes(tmp_path, monkeypatch):
+    renderer = FakeRenderer(tmp_path)
+    monkeypatch.setattr(pdf_generator, '_renderer', renderer)
+    monkeypatch.setattr(pdf_generator, '_cache', PdfRenderCache(str(tmp_path / 'cache')))
+    return renderer
+
+def test_same_content_keeps_each_quote_id_and_date(tmp_path, monkeypatch):
+    renderer = setup_fakes(tmp_path, monkeypatch)
+    first = {"job_name": "Flange", "quote_id": "QT-20261018-000001", "date": "18/10/2026"}
+    second = {"job_name": "Flange", "quote_id": "QT-20261018-000002", "date": "19/10/2026"}
+    pdf_generator.create_quote_pdf(first, str(tmp_path / 'a.pdf'))
+    result = pdf_generator.create_quote_pdf(second, str(tmp_path / 'b.pdf'))
+
+    assert second == {"job_name": "Flange", "quote_id": "QT-20261018-000002", "date": "19/10/2026"}
+    assert result['quote_id'] == "QT-20261018-000002" and result['date'] == "19/10/2026"
+    assert (tmp_path / 'b.pdf').read_text() == "QT-20261018-000002|19/10/2026|Flange"
+    assert renderer.renders == 2
+    assert renderer.html_renders == 2
+
+def test_identical_quote_is_served_from_cache(tmp_path, monkeypatch):
+    renderer = setup_fakes(tmp_path, monkeypatch)
+    quote = {"job_name": "Flange", "quote_id": "QT-EXPLICIT-REV2", "date": "18/10/2026"}
+    pdf_generator.create_quote_pdf(quote, str(tmp_path / 'a.pdf'))
+    result = pdf_generator.create_quote_pdf(quote, str(tmp_path / 'b.pdf'))
+
+    assert result['quote_id'] == "QT-EXPLICIT-REV2"
+    assert (tmp_path / 'b.pdf').read_text() == "QT-EXPLICIT-REV2|18/10/2026|Flange"
+    assert renderer.renders == 1
+
+class FixedClock:
+    today = datetime(2026, 10, 18)
+
+    @classmethod
+    def now(cls):
+        return cls.today
+
+def test_resaved_quote_keeps_its_number_and_hits_the_cache(tmp_path, monkeypatch):
+    renderer = setup_fakes(tmp_path, monkeypatch)
+    monkeypatch.setattr(pdf_generator, 'datetime', FixedClock)
+    issued = pdf_generator.create_quote_pdf(pdf_generator.stamp_quotes([{"job_name": "Flange", "quote_id": "QT-1"}])[0], str(tmp_path / 'a.pdf'))
+    # QuotingPage.save_pdf ส่งเลขที่และวันที่เดิมกลับมาเมื่อบันทึกซ้ำ แม้จะเป็นวันถัดไป
+    monkeypatch.setattr(FixedClock, 'today', datetime(2026, 10, 19))
+    again = pdf_generator.stamp_quotes([{"job_name": "Flange", "quote_id": issued['quote_id'], "date": issued['date']}])[0]
+    result = pdf_generator.create_quote_pdf(again, str(tmp_path / 'b.pdf'))
+
+    assert result['date'] == "18/10/2026"
+    assert renderer.renders == 1
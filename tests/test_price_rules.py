@@ -0,0 +1,92 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import price_rules
+import pricing_engine
+from price_rules import PriceRules
+
+OPERATIONS = [{"desc": "Turning", "method": "time", "hours": 0.5, "rate": 550.0, "cost": 275.0}]
+STEEL = "เหล็ก (Steel S45C)"
+
+def rule(rule_type, value, min_quantity=1, customer=None, material=None):
+    return {"rule_type": rule_type, "value": value, "min_quantity": min_quantity, "customer": customer, "material": material}
+
+def test_quantity_tiers_start_at_their_min_quantity():
+    rules = PriceRules([rule("discount", 0.05, 10), rule("discount", 0.10, 100), rule("margin", 0.2, 50)], 0.25)
+    resolved = rules.resolve([1, 9, 10, 11, 99, 100, 5000])
+    assert resolved["discount"].tolist() == pytest.approx([0, 0, 0.05, 0.05, 0.05, 0.10, 0.10])
+    # ต่ำกว่าขั้นแรกของ margin ใช้ค่าเริ่มต้น
+    assert resolved["margin"].tolist() == pytest.approx([0.25, 0.25, 0.25, 0.25, 0.2, 0.2, 0.2])
+
+def test_tiers_are_sorted_whatever_the_row_order():
+    rules = PriceRules([rule("discount", 0.10, 100), rule("discount", 0.05, 10)], 0.25)
+    assert rules.resolve([50, 100])["discount"].tolist() == pytest.approx([0.05, 0.10])
+
+def test_specific_rules_take_precedence_over_general_ones():
+    rules = PriceRules([
+        rule("margin", 0.20),
+        rule("margin", 0.30, material=STEEL),
+        rule("margin", 0.15, customer="ACME Co."),
+        rule("margin", 0.10, customer="ACME Co.", material=STEEL),
+    ], 0.25)
+    assert rules.resolve_one(5)["margin"] == pytest.approx(0.20)
+    assert rules.resolve_one(5, material=STEEL)["margin"] == pytest.approx(0.30)
+    assert rules.resolve_one(5, customer=" acme co. ")["margin"] == pytest.approx(0.15)
+    assert rules.resolve_one(5, customer="ACME Co.", material=STEEL)["margin"] == pytest.approx(0.10)
+    assert rules.resolve_one(5, customer="Other", material="Brass")["margin"] == pytest.approx(0.20)
+
+def test_specific_rule_below_its_first_tier_falls_back_to_general():
+    rules = PriceRules([rule("discount", 0.02), rule("discount", 0.08, 100, material=STEEL)], 0.25)
+    resolved = rules.resolve([10, 100], materials=STEEL)
+    assert resolved["discount"].tolist() == pytest.approx([0.02, 0.08])
+
+def test_minimum_charge_clamps_the_final_price():
+    rules = PriceRules([rule("minimum", 2000.0)], 0.25)
+    small = pricing_engine.price_quote_with_rules(1, 80.0, OPERATIONS, rules)
+    assert small["final_price"] == pytest.approx(2000.0)
+    assert small["price_per_unit"] == pytest.approx(2000.0)
+    large = pricing_engine.price_quote_with_rules(10, 80.0, OPERATIONS, rules)
+    assert large["final_price"] == pytest.approx((80 + 275) * 10 * 1.25)
+
+def test_setup_and_discount_rules_apply_per_lot():
+    rules = PriceRules([rule("setup", 500.0), rule("discount", 0.1)], 0.25)
+    result = pricing_engine.price_quote_with_rules(4, 80.0, OPERATIONS, rules)
+    assert result["setup_cost"] == pytest.approx(500.0)
+    assert result["final_price"] == pytest.approx(((80 + 275) * 4 + 500) * 1.25 * 0.9)
+
+@pytest.mark.parametrize("quantity", [1, 7, 250])
+def test_no_rules_reproduce_the_old_formula(quantity):
+    result = pricing_engine.price_quote_with_rules(quantity, 80.0, OPERATIONS, PriceRules([], 0.25), customer="ACME Co.", material=STEEL)
+    sub_total = 80.0 * quantity + 275.0 * quantity
+    assert result["sub_total"] == pytest.approx(sub_total)
+    assert result["final_price"] == pytest.approx(sub_total * 1.25)
+    assert result["discount"] == 0 and result["setup_cost"] == 0
+
+def test_batch_with_rules_matches_single_quotes():
+    rules = PriceRules([rule("margin", 0.3, material=STEEL), rule("discount", 0.05, 10), rule("minimum", 1500.0, customer="ACME Co.")], 0.25)
+    quotes = [
+        {"material": STEEL, "quantity": 1, "operations": OPERATIONS, "customer_name": "ACME Co."},
+        {"material": "Brass", "quantity": 20, "operations": OPERATIONS},
+        {"material": STEEL, "quantity": 50, "operations": OPERATIONS, "profit_margin": 0.4},
+    ]
+    costs = {STEEL: 80.0, "Brass": 180.0}
+    batch = pricing_engine.price_quotes_batch(quotes, costs, 0.25, rules=rules)
+    for quote, row in zip(quotes, batch):
+        single = pricing_engine.price_quote_with_rules(quote["quantity"], costs[quote["material"]], OPERATIONS, rules, quote.get("customer_name"), quote["material"])
+        if "profit_margin" in quote:
+            assert row["profit_margin"] == pytest.approx(0.4)
+            continue
+        for key in pricing_engine.BREAKDOWN_KEYS:
+            assert row[key] == pytest.approx(single[key]), key
+
+def test_get_rules_recompiles_only_after_a_change(db):
+    first = price_rules.get_rules()
+    assert price_rules.get_rules() is first
+    db.add_price_rule("discount", 0.1, 10)
+    second = price_rules.get_rules()
+    assert second is not first
+    assert second.resolve_one(10)["discount"] == pytest.approx(0.1)
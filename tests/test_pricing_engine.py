@@ -0,0 +1,66 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pricing_engine
+
+MATERIALS = {"Steel": 80.0, "Aluminium": 180.0}
+OPERATIONS = [
+    {"desc": "Turning", "method": "time", "hours": 0.5, "rate": 550.0, "cost": 275.0},
+    {"desc": "Heat treat", "method": "fixed", "hours": "-", "rate": "-", "cost": 120.0},
+]
+
+def old_calculate_price(quantity, material_cost_per_unit, operations, profit_margin):
+    """The formula QuotingPage.calculate_price used before the engine was extracted."""
+    total_material_cost = material_cost_per_unit * quantity
+    total_labor_cost_per_unit = sum(op['cost'] for op in operations)
+    sub_total = total_material_cost + total_labor_cost_per_unit * quantity
+    profit = sub_total * profit_margin
+    return {"total_labor_cost_per_unit": total_labor_cost_per_unit, "sub_total": sub_total, "profit": profit, "final_price": sub_total + profit}
+
+@pytest.mark.parametrize("quantity", [1, 7, 250])
+@pytest.mark.parametrize("material", ["Steel", "Aluminium"])
+def test_price_quote_matches_old_calculate_price(quantity, material):
+    expected = old_calculate_price(quantity, MATERIALS[material], OPERATIONS, 0.25)
+    result = pricing_engine.price_quote(quantity, MATERIALS[material], OPERATIONS, 0.25)
+    for key, value in expected.items():
+        assert result[key] == pytest.approx(value)
+    assert result["price_per_unit"] == pytest.approx(expected["final_price"] / quantity)
+
+def test_batch_agrees_with_scalar_pricing():
+    setup_op = dict(OPERATIONS[0], setup_hours=1.0, setup_cost=550.0)
+    quotes = [
+        {"material": "Steel", "quantity": 1, "operations": OPERATIONS},
+        {"material": "Aluminium", "quantity": 40, "operations": OPERATIONS},
+        {"material": "Steel", "quantity": 12, "operations": [setup_op], "profit_margin": 0.4},
+        {"material": "Unknown", "quantity": 3, "operations": []},
+    ]
+    batch = pricing_engine.price_quotes_batch(quotes, MATERIALS, 0.25)
+    for quote, row in zip(quotes, batch):
+        single = pricing_engine.price_quote(quote["quantity"], MATERIALS.get(quote["material"], 0), quote["operations"], quote.get("profit_margin", 0.25))
+        assert row.keys() == single.keys()
+        for key, value in single.items():
+            assert row[key] == pytest.approx(value), key
+
+def test_rate_key_operations_use_hourly_rates():
+    operations = [{"hours": 2, "rate_key": "CNC"}]
+    result = pricing_engine.price_quote(1, 0, operations, 0.0, hourly_rates={"CNC": 600})
+    assert result["final_price"] == pytest.approx(1200)
+
+def test_quantity_must_be_positive():
+    with pytest.raises(ValueError):
+        pricing_engine.price_quote(0, 80, OPERATIONS, 0.25)
+    with pytest.raises(ValueError, match="#2"):
+        pricing_engine.price_quotes_batch([{"quantity": 1}, {"quantity": 0}], MATERIALS, 0.25)
+
+def test_price_matrix_without_margins_uses_configured_margin(db):
+    db.update_settings({'profit_margin': 0.3})
+    matrix = pricing_engine.price_matrix(OPERATIONS, [1, 10], [80.0], None)
+    assert matrix["profit_margin"].shape == (2, 1, 1)
+    assert float(matrix["profit_margin"][0, 0, 0]) == pytest.approx(0.3)
+    for qi, quantity in enumerate([1, 10]):
+        expected = pricing_engine.price_quote(quantity, 80.0, OPERATIONS, 0.3)
+        assert float(matrix["final_price"][qi, 0, 0]) == pytest.approx(expected["final_price"])
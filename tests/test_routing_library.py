@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import routing_library
+
+RATES = {"CNC Milling": 800.0, "Lathe": 600.0}
+
+def test_time_op_without_machine_is_not_saved():
+    ops = [{"desc": "old op", "method": "time", "hours": 1, "rate": 123.0}]
+    with pytest.raises(ValueError, match="old op"):
+        routing_library.routing_operations(ops, RATES)
+
+def test_expand_refuses_machine_without_rate():
+    library = routing_library.RoutingLibrary([{"id": 1, "name": "Flange", "use_count": 0, "operations": [
+        {"desc": "mill", "method": "time", "machine": "EDM Drill", "hours": 1.0, "setup_hours": 0.0, "cost": 0.0, "per_lot": False}]}])
+    with pytest.raises(ValueError, match="EDM Drill"):
+        library.expand("Flange", RATES)
@@ -0,0 +1,95 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scheduler
+from scheduler import Scheduler, ShiftCalendar, parse_shifts
+
+MONDAY = datetime(2026, 10, 19, 8, 0)
+WEEKDAYS_8_TO_17 = parse_shifts("Mon-Fri 08:00-17:00")
+
+def cnc(hours, setup_hours=0.0, desc="Milling"):
+    return {"desc": desc, "method": "time", "hours": hours, "setup_hours": setup_hours, "rate": 600.0, "machine": "CNC"}
+
+def test_calendar_maps_wall_clock_to_working_hours():
+    calendar = ShiftCalendar(WEEKDAYS_8_TO_17, first_weekday=0)
+    assert calendar.working_at(6) == 0
+    assert calendar.working_at(10) == pytest.approx(2)
+    assert calendar.working_at(20) == pytest.approx(9)
+    # งานที่เสร็จพอดีสิ้นกะจบที่ 17:00 ส่วนงานที่เริ่มตรงนั้นเริ่มกะถัดไป
+    assert calendar.wall_at(9) == pytest.approx(17)
+    assert calendar.wall_at(9, starting=True) == pytest.approx(24 + 8)
+
+def test_calendar_skips_the_weekend():
+    calendar = ShiftCalendar(WEEKDAYS_8_TO_17, first_weekday=0)
+    friday_close = 4 * 24 + 17
+    assert calendar.working_at(friday_close) == pytest.approx(45)
+    assert calendar.working_at(5 * 24 + 12) == pytest.approx(45)
+    assert calendar.wall_at(45, starting=True) == pytest.approx(7 * 24 + 8)
+    assert calendar.wall_at(46) == pytest.approx(7 * 24 + 9)
+
+def test_calendar_needs_working_hours():
+    with pytest.raises(ValueError):
+        ShiftCalendar((), first_weekday=0)
+
+def test_job_crosses_shift_boundary(db):
+    db.set_machine_shifts("CNC", parse_shifts("Mon-Fri 08:00-12:00, 13:00-17:00"))
+    estimate = Scheduler().lead_time([cnc(3.0, setup_hours=1.0)], 2, now=datetime(2026, 10, 19, 15, 0))
+    # 7 ชั่วโมง: 2 ชั่วโมงวันจันทร์ (15-17) แล้ว 4 ชั่วโมงเช้าวันอังคาร ข้ามพักเที่ยงอีก 1 ชั่วโมง
+    assert estimate["operations"][0][2] == datetime(2026, 10, 19, 15, 0)
+    assert estimate["finish"] == datetime(2026, 10, 20, 14, 0)
+    assert estimate["days"] == 1
+    # งานที่เสร็จพอดีก่อนพักเที่ยงจบที่ 12:00 ไม่ใช่ 13:00
+    two_steps = Scheduler().lead_time([cnc(6.0), cnc(1.0, desc="Deburr")], 1, now=datetime(2026, 10, 19, 15, 0))
+    assert two_steps["operations"][0][3] == datetime(2026, 10, 20, 12, 0)
+    assert two_steps["operations"][1][2:] == (datetime(2026, 10, 20, 13, 0), datetime(2026, 10, 20, 14, 0))
+
+def test_weekend_and_off_days(db):
+    db.set_machine_shifts("CNC", WEEKDAYS_8_TO_17)
+    friday = Scheduler().lead_time([cnc(3.0)], 1, now=datetime(2026, 10, 23, 16, 0))
+    assert friday["finish"] == datetime(2026, 10, 26, 10, 0)
+    assert friday["days"] == 3
+    saturday = Scheduler().lead_time([cnc(1.0)], 1, now=datetime(2026, 10, 24, 9, 0))
+    assert saturday["operations"][0][2] == datetime(2026, 10, 26, 8, 0)
+    # ปฏิทินกลาง (จันทร์-เสาร์) ใช้กับเครื่องที่ไม่ได้ตั้งกะเอง
+    lathe = {"desc": "Turning", "method": "time", "hours": 1.0, "machine": "Lathe"}
+    assert Scheduler().lead_time([lathe], 1, now=datetime(2026, 10, 24, 9, 0))["finish"] == datetime(2026, 10, 24, 10, 0)
+
+def test_backlog_queues_ahead_of_the_new_quote(db):
+    db.set_machine_shifts("CNC", WEEKDAYS_8_TO_17)
+    old = db.save_quote({"quote_id": "Q-1", "quantity": 1, "created_at": "2026-10-18 10:00:00"}, [cnc(5.0)])
+    db.set_quote_status(old, "accepted")
+    estimate = Scheduler().lead_time([cnc(2.0)], 1, now=MONDAY)
+    assert estimate["backlog_jobs"] == 1
+    assert estimate["operations"][0][2] == datetime(2026, 10, 19, 13, 0)
+    db.set_machine_count("CNC", 2)
+    assert Scheduler().lead_time([cnc(2.0)], 1, now=MONDAY)["finish"] == datetime(2026, 10, 19, 10, 0)
+
+def test_zero_capacity_machines(db):
+    db.set_machine_shifts("CNC", WEEKDAYS_8_TO_17)
+    db.save_quote({"quote_id": "Q-1", "quantity": 1, "created_at": "2026-10-18 10:00:00"}, [cnc(5.0)])
+    db.set_machine_count("CNC", 0)
+    planner = Scheduler()
+    # งานค้างบนเครื่องที่ไม่มี (ส่งจ้างนอก) ไม่ถูกนับ แต่งานใหม่ที่ต้องใช้เครื่องนั้นจองไม่ได้
+    assert planner.load_backlog(MONDAY) == []
+    with pytest.raises(ValueError, match="CNC"):
+        planner.lead_time([cnc(1.0)], 1, now=MONDAY)
+
+def test_empty_queue(db):
+    planner = Scheduler()
+    assert planner.simulate([], MONDAY) == {}
+    assert planner.lead_time([], 1, now=MONDAY) is None
+    assert planner.lead_time([{"desc": "Heat treat", "method": "fixed", "cost": 120.0}], 5, now=MONDAY) is None
+    estimate = planner.lead_time([cnc(1.5)], 1, now=MONDAY)
+    assert estimate["backlog_jobs"] == 0
+    assert estimate["finish"] == datetime(2026, 10, 19, 9, 30)
+
+def test_machine_for_matches_old_quotes_by_rate():
+    rates = {"Lathe": 550, "CNC": 600, "Milling": 600}
+    assert scheduler.machine_for({"rate": 550, "method": "time"}, rates) == "Lathe"
+    assert scheduler.machine_for({"rate": 600, "method": "time"}, rates) is None
+    assert scheduler.machine_for({"rate": "-", "method": "fixed"}, rates) is None
@@ -0,0 +1,75 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import pricing_engine
+
+TURNING = {"desc": "Turning", "method": "time", "hours": 0.5, "rate": 600.0, "cost": 300.0, "setup_hours": 2.0}
+HEAT_TREAT = {"desc": "Heat treat", "method": "fixed", "hours": "-", "rate": "-", "cost": 0.0, "setup_cost": 450.0}
+
+def test_setup_is_charged_once_per_lot():
+    single = pricing_engine.price_quote(1, 80.0, [TURNING, HEAT_TREAT], 0.25)
+    lot = pricing_engine.price_quote(20, 80.0, [TURNING, HEAT_TREAT], 0.25)
+    setup = 2.0 * 600.0 + 450.0
+    assert single["setup_cost"] == lot["setup_cost"] == pytest.approx(setup)
+    assert single["price_per_unit"] == pytest.approx((80 + 300 + setup) * 1.25)
+    assert lot["price_per_unit"] == pytest.approx((80 + 300 + setup / 20) * 1.25)
+
+def test_setup_hours_use_the_rate_key_rate():
+    operations = [{"hours": 0.25, "setup_hours": 1.5, "rate_key": "CNC"}]
+    result = pricing_engine.price_quote(4, 0, operations, 0.0, hourly_rates={"CNC": 600})
+    assert result["setup_cost"] == pytest.approx(900)
+    assert result["final_price"] == pytest.approx(4 * 150 + 900)
+
+def test_price_matrix_amortises_setup_across_quantities():
+    quantities = [1, 10, 100]
+    matrix = pricing_engine.price_matrix([TURNING, HEAT_TREAT], quantities, [80.0], [0.25])
+    for qi, quantity in enumerate(quantities):
+        expected = pricing_engine.price_quote(quantity, 80.0, [TURNING, HEAT_TREAT], 0.25)
+        assert float(matrix["setup_cost"][qi, 0, 0]) == pytest.approx(expected["setup_cost"])
+        assert float(matrix["price_per_unit"][qi, 0, 0]) == pytest.approx(expected["price_per_unit"])
+    per_unit = matrix["price_per_unit"][:, 0, 0]
+    assert per_unit[0] > per_unit[1] > per_unit[2]
+
+def test_setup_columns_round_trip(db):
+    pk = db.save_quote({"quote_id": "Q-1", "job_name": "Shaft", "quantity": 5, "final_price": 1000}, [dict(TURNING, setup_cost=1200.0, machine="Lathe")])
+    op = db.get_quote(pk)["operations"][0]
+    assert (op["setup_hours"], op["setup_cost"], op["machine"]) == (2.0, 1200.0, "Lathe")
+
+def test_old_quote_operations_table_is_migrated(tmp_path, monkeypatch):
+    path = tmp_path / "old.db"
+    # ตารางประวัติแบบเดิมก่อนแยกเวลา setup และก่อนมีสถานะงาน
+    with sqlite3.connect(path) as conn:
+        conn.execute('''CREATE TABLE quotes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, quote_id TEXT, created_at TEXT NOT NULL,
+            job_name TEXT NOT NULL DEFAULT '', customer_name TEXT NOT NULL DEFAULT '', material TEXT,
+            quantity INTEGER, profit_margin REAL, final_price REAL, notes TEXT NOT NULL DEFAULT '')''')
+        conn.execute('''CREATE TABLE quote_operations (
+            quote_pk INTEGER NOT NULL REFERENCES quotes(id) ON DELETE CASCADE, position INTEGER NOT NULL,
+            desc TEXT, method TEXT, hours REAL, rate REAL, cost REAL,
+            PRIMARY KEY (quote_pk, position)) WITHOUT ROWID''')
+        conn.execute("INSERT INTO quotes (quote_id, created_at, job_name, quantity, final_price) VALUES ('Q-OLD', '2024-01-05 10:00:00', 'Old job', 3, 900)")
+        conn.execute("INSERT INTO quote_operations VALUES (1, 0, 'Turning', 'time', 0.5, 600, 300)")
+    database.close_db()
+    monkeypatch.setattr(database, 'DATABASE_PATH', str(path))
+    try:
+        database.initialize_db()
+        columns = {row[1] for row in database.connect_db().execute("PRAGMA table_info(quote_operations)")}
+        assert {"setup_hours", "setup_cost", "machine"} <= columns
+        old = database.get_quote(1)
+        assert old["status"] == "open"
+        assert old["operations"] == [{"desc": "Turning", "method": "time", "hours": 0.5, "rate": 600.0, "cost": 300.0,
+                                      "setup_hours": None, "setup_cost": None, "machine": None}]
+        # ข้อมูลเดิมที่ไม่มี setup ยังคิดราคาได้เหมือนเดิม
+        assert pricing_engine.price_quote(3, 0, old["operations"], 0.0)["final_price"] == pytest.approx(900)
+        pk = database.save_quote({"quote_id": "Q-NEW", "quantity": 2}, [TURNING])
+        assert database.get_quote(pk)["operations"][0]["setup_hours"] == 2.0
+        # รันซ้ำได้โดยไม่เพิ่มคอลัมน์ซ้ำ
+        database.initialize_db()
+    finally:
+        database.close_db()
@@ -0,0 +1,81 @@
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time_models
+from time_models.base import TimeModel
+
+MODELS = ("drilling", "edm_sinker", "grinding", "milling", "turning", "wire")
+
+def test_registry_discovers_every_model_module():
+    assert set(MODELS) <= set(time_models.available_models())
+    assert "base" not in time_models.available_models()
+    for name in MODELS:
+        model = time_models.get_model(name)
+        assert isinstance(model, TimeModel) and model.name == name
+        assert time_models.get_model(name) is model
+
+def test_unknown_model_raises_key_error():
+    with pytest.raises(KeyError, match="planing"):
+        time_models.get_model("planing")
+
+def test_models_for_rate():
+    assert "turning" in time_models.models_for_rate("Lathe")
+    assert "grinding" not in time_models.models_for_rate("Lathe")
+
+def test_time_model_requires_compute():
+    class Incomplete(TimeModel):
+        fields = (("length", "Length", 1.0),)
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_turning():
+    rpm = 1000 * 150 / (math.pi * 50)
+    # ผิว 3 mm ที่ 1 mm/pass = 3 pass
+    minutes = time_models.get_model("turning").estimate(diameter=50, length=100, stock=3, depth_per_pass=1, feed_per_rev=0.2, cutting_speed=150, count=2)
+    assert minutes == pytest.approx(3 * 100 / (0.2 * rpm) * 2)
+
+def test_milling():
+    feed = 0.08 * 4 * 1000 * 120 / (math.pi * 20)
+    minutes = time_models.get_model("milling").estimate(length=100, width=50, depth=2, tool_diameter=20, stepover=12, depth_per_pass=1)
+    # ceil(50 / 12) = 5 แนว x 2 ชั้น
+    assert minutes == pytest.approx(5 * 2 * (100 + 20) / feed)
+
+def test_grinding():
+    minutes = time_models.get_model("grinding").estimate(length=200, width=50, stock=0.2, downfeed=0.01, crossfeed=5, table_speed=15, overrun=20, spark_out=2)
+    assert minutes == pytest.approx(10 * (20 + 2) * 220 / 15000)
+
+def test_edm_sinker():
+    model = time_models.get_model("edm_sinker")
+    assert model.estimate(volume=1000, removal_rate=20, finish_allowance=0.5, count=3) == pytest.approx(225)
+    with pytest.raises(ValueError):
+        model.estimate(removal_rate=0)
+
+def test_drilling_mixes_cycles_in_one_batch():
+    rows = [
+        {"cycle": "G81", "depth": 10, "feed": 100, "count": 4},
+        {"cycle": "G82", "depth": 10, "feed": 100, "dwell_ms": 600},
+        {"cycle": "G83", "depth": 10, "feed": 100, "rapid": 1000, "peck": 3},
+    ]
+    minutes = time_models.estimate_batch("drilling", rows)
+    # G83: ceil(10 / 3) = 4 peck, ถอย 3 ครั้ง = 9 x 3 = 27 mm rapid
+    assert minutes == pytest.approx([0.4, 0.11, 0.1 + 27 / 1000])
+
+def test_missing_fields_use_defaults():
+    model = time_models.get_model("turning")
+    assert model.estimate_batch([{"length": ""}]) == pytest.approx([model.estimate(**model.defaults())])
+    assert model.estimate_batch([]) == []
+
+def test_wire_uses_measured_speeds_and_sqmm_fallback(db):
+    model = time_models.get_model("wire")
+    measured, other = list(db.get_all_materials())[:2]
+    # 10 mm ตัดได้ 40 mm²/min, 100 mm ได้ 160 mm²/min -> 20 mm ได้ 40 + 120 x 10/90
+    db.set_wire_edm_speeds(measured, [(10, 40), (100, 160)])
+    settings = db.get_settings()
+    assert model.estimate(length=100, thickness=20, material=measured) == pytest.approx(100 * 20 / (40 + 120 * 10 / 90))
+    hours = model.estimate(length=100, thickness=20, material=other) / 60
+    assert hours == pytest.approx(100 * 20 * settings['Wire EDM_sqmm'] / settings['Wire EDM'])
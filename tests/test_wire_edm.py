@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wire_edm
+
+STEEL = "เหล็ก (Steel S45C)"
+BRASS = "ทองเหลือง (Brass)"
+
+def make_estimator():
+    fallback = wire_edm.fallback_area_rate({"Wire EDM": 900, "Wire EDM_sqmm": 0.15})
+    return wire_edm.WireEdmEstimator({STEEL: ((10, 40), (100, 160))}, fallback, lambda: {STEEL, BRASS})
+
+def test_unknown_material_raises():
+    with pytest.raises(ValueError, match="Steel"):
+        make_estimator().estimate(100, 20, "Steel")
+
+def test_measured_speeds_are_interpolated():
+    assert make_estimator().area_rate(STEEL, 20) == pytest.approx(120)
+
+def test_material_without_speeds_matches_sqmm_formula():
+    # สูตรเดิมของหน้าคำนวณ Wire EDM: ชั่วโมง = ความยาว x ความหนา x ราคาต่อ mm² / ค่าเครื่องต่อชั่วโมง
+    minutes = make_estimator().estimate(100, 20, BRASS)
+    assert float(minutes) / 60 == pytest.approx(100 * 20 * 0.15 / 900)
+
+def test_skim_passes_add_time_and_nothing_else_does():
+    estimator = make_estimator()
+    rough = float(estimator.estimate(100, 20, STEEL))
+    assert rough == pytest.approx(100 * 20 / 120)
+    assert float(estimator.estimate(100, 20, STEEL, skims=1)) == pytest.approx(rough + 100 / (120 / 20 * wire_edm.SKIM_SPEED_FACTOR))
@@ -0,0 +1,43 @@
+# File: time_models/__init__.py
+"""
+Registry of machining time models.
+
+Each module in this package defines MODEL, a TimeModel instance (see base.py).
+Only the module names are discovered up front; a model module is imported the
+first time it is asked for, so adding a process means adding one module here
+and nothing else.
+
+    from time_models import get_model, estimate_batch
+    estimate_batch("turning", [{"diameter": 40, "length": 120, "stock": 3}])
+"""
+import importlib
+import pkgutil
+
+# รายชื่อสำรองสำหรับ EXE ที่ pkgutil ค้นโมดูลในแพ็กเกจไม่เจอ
+BUILTIN_MODELS = ("drilling", "edm_sinker", "grinding", "milling", "turning", "wire")
+
+_models = {}
+_names = None
+
+def available_models():
+    """Names of all time models (modules are not imported)."""
+    global _names
+    if _names is None:
+        found = {name for _, name, is_pkg in pkgutil.iter_modules(__path__) if not is_pkg and not name.startswith('_') and name != 'base'}
+        _names = sorted(found | set(BUILTIN_MODELS))
+    return list(_names)
+
+def get_model(name):
+    model = _models.get(name)
+    if model is None:
+        if name not in available_models(): raise KeyError(f"Unknown time model: {name}")
+        model = _models[name] = importlib.import_module(f"{__name__}.{name}").MODEL
+    return model
+
+def estimate_batch(name, rows):
+    """Minutes for every row (dict of model fields) with the named model."""
+    return get_model(name).estimate_batch(rows)
+
+def models_for_rate(rate_key):
+    """Models whose time is charged at the given hourly-rate key (e.g. 'Lathe')."""
+    return [name for name in available_models() if rate_key in get_model(name).rate_keys]
@@ -0,0 +1,56 @@
+# File: time_models/base.py
+from abc import ABC, abstractmethod
+
+class TimeModel(ABC):
+    """
+    A machining process time model.
+
+    Subclasses set name, title, rate_keys (the hourly-rate settings the time is
+    charged at) and fields, a tuple of (field, label, default). compute() gets one
+    NumPy array (or scalar) per field and returns minutes; estimate_batch() and
+    estimate() fill in defaults and convert rows of dicts to those arrays.
+    """
+    name = ""
+    title = ""
+    rate_keys = ()
+    fields = ()
+    text_fields = ()
+
+    @abstractmethod
+    def compute(self, **columns):
+        """Minutes for one array (or scalar) per field."""
+
+    def defaults(self):
+        return {field: default for field, _, default in self.fields}
+
+    def columns(self, rows):
+        import numpy as np
+        defaults = self.defaults()
+        columns = {}
+        for field in defaults:
+            values = [defaults[field] if row.get(field) in (None, "") else row[field] for row in rows]
+            columns[field] = np.array(values, dtype=str if field in self.text_fields else float)
+        return columns
+
+    def estimate_batch(self, rows):
+        """Minutes for each row (a dict of field values; missing fields use the defaults)."""
+        import numpy as np
+        rows = list(rows)
+        if not rows: return []
+        minutes = np.broadcast_to(self.compute(**self.columns(rows)), (len(rows),))
+        return minutes.astype(float).tolist()
+
+    def estimate(self, **params):
+        return self.estimate_batch([params])[0]
+
+def passes(amount, per_pass):
+    """Number of passes needed to remove amount with at most per_pass each."""
+    import numpy as np
+    if np.any(np.asarray(per_pass) <= 0): raise ValueError("Depth per pass must be > 0")
+    return np.maximum(np.ceil(np.asarray(amount, dtype=float) / per_pass - 1e-9), 0)
+
+def spindle_rpm(cutting_speed, diameter):
+    """rpm for a cutting speed in m/min on a diameter in mm."""
+    import numpy as np
+    if np.any(np.asarray(diameter) <= 0): raise ValueError("Diameter must be > 0")
+    return 1000.0 * np.asarray(cutting_speed, dtype=float) / (np.pi * np.asarray(diameter, dtype=float))
@@ -0,0 +1,24 @@
+# File: time_models/drilling.py
+from time_models.base import TimeModel
+from cycle_time import drilling_cycle_time
+
+class DrillingModel(TimeModel):
+    """G81/G82/G83 canned cycles (see cycle_time)."""
+    name = "drilling"
+    title = "Drilling (G81/G82/G83)"
+    rate_keys = ("CNC", "Milling", "Basic Machine")
+    text_fields = ("cycle",)
+    fields = (
+        ("cycle", "Cycle (G81/G82/G83)", "G81"),
+        ("depth", "Depth (mm)", 10.0),
+        ("feed", "Feed G01 (mm/min)", 150.0),
+        ("rapid", "Rapid G00 (mm/min)", 5000.0),
+        ("count", "Number of holes", 1.0),
+        ("dwell_ms", "Dwell (ms)", 500.0),
+        ("peck", "Peck depth Q (mm)", 3.0),
+    )
+
+    def compute(self, cycle, depth, feed, rapid, count, dwell_ms, peck):
+        return drilling_cycle_time(cycle, depth, feed, rapid, count, dwell_ms=dwell_ms, peck=peck)
+
+MODEL = DrillingModel()
@@ -0,0 +1,21 @@
+# File: time_models/edm_sinker.py
+from time_models.base import TimeModel
+
+class EdmSinkerModel(TimeModel):
+    """Sinker EDM: volume removed at the roughing removal rate, plus a finishing allowance as a fraction of roughing time."""
+    name = "edm_sinker"
+    title = "EDM sinker"
+    rate_keys = ("EDM Sinker",)
+    fields = (
+        ("volume", "Volume removed (mm³)", 1000.0),
+        ("removal_rate", "Removal rate (mm³/min)", 20.0),
+        ("finish_allowance", "Finishing allowance (fraction)", 0.5),
+        ("count", "Quantity", 1.0),
+    )
+
+    def compute(self, volume, removal_rate, finish_allowance, count):
+        import numpy as np
+        if np.any(removal_rate <= 0): raise ValueError("Removal rate must be > 0")
+        return volume / removal_rate * (1 + finish_allowance) * count
+
+MODEL = EdmSinkerModel()
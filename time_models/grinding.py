@@ -0,0 +1,25 @@
+# File: time_models/grinding.py
+from time_models.base import TimeModel, passes
+
+class GrindingModel(TimeModel):
+    """Reciprocating surface grinding: table strokes over length + overrun, crossfeed across the width, downfeed through the stock, plus spark-out passes."""
+    name = "grinding"
+    title = "Surface grinding"
+    rate_keys = ("Grinding",)
+    fields = (
+        ("length", "Length (mm)", 200.0),
+        ("width", "Width (mm)", 50.0),
+        ("stock", "Stock (mm)", 0.2),
+        ("downfeed", "Downfeed per pass (mm)", 0.01),
+        ("crossfeed", "Crossfeed per stroke (mm)", 5.0),
+        ("table_speed", "Table speed (m/min)", 15.0),
+        ("overrun", "Overrun (mm)", 20.0),
+        ("spark_out", "Spark-out passes", 2.0),
+        ("count", "Quantity", 1.0),
+    )
+
+    def compute(self, length, width, stock, downfeed, crossfeed, table_speed, overrun, spark_out, count):
+        strokes = passes(width, crossfeed) * (passes(stock, downfeed) + spark_out)
+        return strokes * (length + overrun) / (table_speed * 1000.0) * count
+
+MODEL = GrindingModel()
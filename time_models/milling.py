@@ -0,0 +1,27 @@
+# File: time_models/milling.py
+from time_models.base import TimeModel, passes, spindle_rpm
+
+class MillingModel(TimeModel):
+    """Face/pocket milling: a width x depth area cleared in stepover x depth_per_pass passes (each pass adds the tool diameter for entry/exit)."""
+    name = "milling"
+    title = "Milling"
+    rate_keys = ("Milling", "CNC")
+    fields = (
+        ("length", "Cut length (mm)", 100.0),
+        ("width", "Cut width (mm)", 50.0),
+        ("depth", "Total depth (mm)", 2.0),
+        ("tool_diameter", "Tool diameter (mm)", 20.0),
+        ("stepover", "Stepover (mm)", 12.0),
+        ("depth_per_pass", "Depth per pass (mm)", 1.0),
+        ("cutting_speed", "Cutting speed (m/min)", 120.0),
+        ("feed_per_tooth", "Feed per tooth (mm)", 0.08),
+        ("teeth", "Number of teeth", 4.0),
+        ("count", "Quantity", 1.0),
+    )
+
+    def compute(self, length, width, depth, tool_diameter, stepover, depth_per_pass, cutting_speed, feed_per_tooth, teeth, count):
+        feed = feed_per_tooth * teeth * spindle_rpm(cutting_speed, tool_diameter)
+        pass_count = passes(width, stepover) * passes(depth, depth_per_pass)
+        return pass_count * (length + tool_diameter) / feed * count
+
+MODEL = MillingModel()
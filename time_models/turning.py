@@ -0,0 +1,23 @@
+# File: time_models/turning.py
+from time_models.base import TimeModel, passes, spindle_rpm
+
+class TurningModel(TimeModel):
+    """Longitudinal turning: radial stock removed in passes of depth_per_pass at constant cutting speed."""
+    name = "turning"
+    title = "Turning (Lathe)"
+    rate_keys = ("Lathe", "CNC")
+    fields = (
+        ("diameter", "Diameter (mm)", 50.0),
+        ("length", "Cut length (mm)", 100.0),
+        ("stock", "Radial stock (mm)", 2.0),
+        ("depth_per_pass", "Depth per pass (mm)", 1.0),
+        ("feed_per_rev", "Feed (mm/rev)", 0.2),
+        ("cutting_speed", "Cutting speed (m/min)", 150.0),
+        ("count", "Quantity", 1.0),
+    )
+
+    def compute(self, diameter, length, stock, depth_per_pass, feed_per_rev, cutting_speed, count):
+        rpm = spindle_rpm(cutting_speed, diameter)
+        return passes(stock, depth_per_pass) * length / (feed_per_rev * rpm) * count
+
+MODEL = TurningModel()
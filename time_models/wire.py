@@ -0,0 +1,21 @@
+# File: time_models/wire.py
+from time_models.base import TimeModel
+import wire_edm
+
+class WireModel(TimeModel):
+    """Wire EDM contours (see wire_edm)."""
+    name = "wire"
+    title = "Wire EDM"
+    rate_keys = ("Wire EDM",)
+    text_fields = ("material",)
+    fields = (
+        ("length", "Contour length (mm)", 100.0),
+        ("thickness", "Thickness (mm)", 20.0),
+        ("material", "Material", wire_edm.DEFAULT_MATERIAL),
+        ("skims", "Skim passes", 0.0),
+    )
+
+    def compute(self, length, thickness, material, skims):
+        return wire_edm.get_estimator().estimate(length, thickness, material, skims)
+
+MODEL = WireModel()
@@ -0,0 +1,60 @@
+# File: tree_view_model.py
+from virtual_list import VirtualList
+
+class TreeViewModel:
+    """
+    Keeps a Treeview in sync with a list of (key, values) rows.
+
+    sync() compares the new rows with what is already displayed and applies only
+    the differences: deleted keys are removed, changed rows are updated in place,
+    new keys are inserted and moved rows are re-positioned. The Treeview item id
+    of each row is str(key), so callers can map a selection back to their data
+    with key_of(). A VirtualList can be used instead of a Treeview for very long
+    lists; it then only renders the rows that are visible.
+    """
+    def __init__(self, view):
+        self.view = view
+        self.virtual = isinstance(view, VirtualList)
+        self.tree = view.tree if self.virtual else view
+        self.rows = {}
+        self.order = []
+        self.keys_by_item = {}
+
+    def sync(self, rows):
+        rows = [(key, tuple(values)) for key, values in rows]
+        if self.virtual:
+            self.view.set_rows(rows)
+            self.rows, self.order = dict(rows), [key for key, _ in rows]
+            self.keys_by_item = {}
+            return
+
+        new_rows = dict(rows)
+        new_order = [key for key, _ in rows]
+        removed = [str(key) for key in self.order if key not in new_rows]
+        if removed: self.tree.delete(*removed)
+
+        kept_order = [key for key in self.order if key in new_rows]
+        for index, (key, values) in enumerate(rows):
+            old_values = self.rows.get(key)
+            if old_values is None:
+                self.tree.insert('', index, iid=str(key), values=values)
+            elif old_values != values:
+                self.tree.item(str(key), values=values)
+
+        if kept_order != [key for key in new_order if key in self.rows]:
+            for index, key in enumerate(new_order): self.tree.move(str(key), '', index)
+        self.rows, self.order = new_rows, new_order
+        self.keys_by_item = {str(key): key for key in new_order}
+
+    def key_of(self, item):
+        """Maps a Treeview item id back to the row key."""
+        if self.virtual:
+            index = self.tree.index(item)
+            return self.view.row_keys[index] if index < len(self.view.row_keys) else None
+        return self.keys_by_item.get(item)
+
+    def selected_keys(self):
+        if self.virtual:
+            key = self.view.selected_key()
+            return [] if key is None else [key]
+        return [key for key in (self.key_of(item) for item in self.tree.selection()) if key is not None]
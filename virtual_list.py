@@ -0,0 +1,105 @@
+# File: virtual_list.py
+import tkinter as tk
+from tkinter import ttk
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+
+class VirtualList(tb.Frame):
+    """
+    A Treeview that only holds the rows currently on screen.
+
+    The list asks count_rows() for the total and fetch_rows(offset, limit) for the
+    visible window, which returns (key, values) pairs. Scrolling reuses the same
+    handful of Treeview items, so lists with tens of thousands of records stay
+    as fast as a list with twenty.
+    """
+    DEFAULT_ROW_HEIGHT = 24
+
+    def __init__(self, parent, columns, count_rows, fetch_rows, bootstyle="primary"):
+        super().__init__(parent)
+        self.count_rows = count_rows
+        self.fetch_rows = fetch_rows
+        self.offset = 0
+        self.total = 0
+        self.visible_rows = 20
+        self.row_keys = []
+        self.selected = None
+
+        self.tree = tb.Treeview(self, columns=[val[0] for val in columns], show='headings', selectmode='browse', bootstyle=bootstyle)
+        for heading, width in columns: self.tree.heading(heading, text=heading); self.tree.column(heading, width=width, anchor=W)
+        self.tree.pack(side=LEFT, fill=BOTH, expand=True)
+        self.scrollbar = tb.Scrollbar(self, orient=VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=RIGHT, fill=Y)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(1, "units"))
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+
+    def set_headings(self, headings):
+        for i, heading in enumerate(headings): self.tree.heading(i, text=heading)
+
+    def row_height(self):
+        height = ttk.Style().lookup('Treeview', 'rowheight')
+        try:
+            return int(height) or self.DEFAULT_ROW_HEIGHT
+        except (TypeError, ValueError, tk.TclError):
+            return self.DEFAULT_ROW_HEIGHT
+
+    def on_resize(self, event):
+        rows = max(1, event.height // self.row_height() - 1)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
+
+    def set_rows(self, rows):
+        """Shows an in-memory list of (key, values) rows instead of fetching from a data source."""
+        self.count_rows = lambda: len(rows)
+        self.fetch_rows = lambda offset, limit: rows[offset:offset + limit]
+        self.refresh()
+
+    def refresh(self):
+        """Re-reads the row count and redraws the current window (call after data changes)."""
+        self.total = self.count_rows()
+        self.scroll_to(self.offset)
+
+    def scroll_to(self, offset):
+        self.offset = max(0, min(int(offset), self.total - self.visible_rows))
+        self.render()
+
+    def scroll_by(self, amount, what):
+        step = self.visible_rows if what.startswith("page") else 3
+        self.scroll_to(self.offset + int(amount) * step)
+        return "break"
+
+    def on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.scroll_to(float(args[0]) * self.total)
+        elif action == "scroll":
+            self.scroll_by(args[0], args[1])
+
+    def render(self):
+        rows = self.fetch_rows(self.offset, self.visible_rows) if self.total else []
+        existing = self.tree.get_children()
+        for i, (key, values) in enumerate(rows):
+            iid = f"row{i}"
+            if i < len(existing): self.tree.item(iid, values=values)
+            else: self.tree.insert('', END, iid=iid, values=values)
+        if len(existing) > len(rows): self.tree.delete(*existing[len(rows):])
+        self.row_keys = [key for key, _ in rows]
+
+        # Keep the selection on the same record, not on the same screen row.
+        if self.selected in self.row_keys: self.tree.selection_set(f"row{self.row_keys.index(self.selected)}")
+        elif self.tree.selection(): self.tree.selection_remove(*self.tree.selection())
+        if self.total: self.scrollbar.set(self.offset / self.total, min(1.0, (self.offset + self.visible_rows) / self.total))
+        else: self.scrollbar.set(0, 1)
+
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            index = int(selection[0][3:])
+            if index < len(self.row_keys): self.selected = self.row_keys[index]
+
+    def selected_key(self):
+        return self.selected if self.tree.selection() else None
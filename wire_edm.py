@@ -0,0 +1,149 @@
+# File: wire_edm.py
+"""
+Wire EDM cutting-time estimator for many contours at once.
+
+The rough cut runs at an area rate (mm^2 of cut face per minute) that depends on
+the material and the workpiece thickness. The shop enters measured rates per
+material (named as on the Materials tab) and thickness in the wire_edm_speeds
+table; thicknesses between those points are interpolated. A material without its
+own points cuts at the rate implied by the 'Wire EDM_sqmm' price and the
+'Wire EDM' hourly rate (hourly / (price per mm^2 x 60)). Each skim (finishing)
+pass retraces the contour at SKIM_SPEED_FACTOR times the rough linear speed.
+
+    estimator = get_estimator()
+    minutes = estimator.estimate(lengths, thicknesses, materials, skims=2)
+"""
+from functools import lru_cache
+import database
+
+DEFAULT_MATERIAL = next(iter(database.DEFAULT_MATERIALS))
+SKIM_SPEED_FACTOR = 3.0
+
+def fallback_area_rate(settings):
+    """mm^2/min implied by the per-mm^2 price and the hourly rate, or None when either is not set."""
+    hourly_rate, sqmm_rate = settings.get('Wire EDM') or 0, settings.get('Wire EDM_sqmm') or 0
+    if hourly_rate <= 0 or sqmm_rate <= 0: return None
+    return hourly_rate / (sqmm_rate * 60)
+
+class WireEdmEstimator:
+    def __init__(self, speed_table, fallback_rate=None, known_materials=None,
+                 skim_speed_factor=SKIM_SPEED_FACTOR):
+        """
+        speed_table: {material: ((thickness, ...), (mm^2/min, ...))} with thicknesses ascending.
+        known_materials: callable returning the material names that may use
+        fallback_rate; None allows only the materials in speed_table.
+        """
+        self.speed_table = speed_table
+        self.fallback_rate = fallback_rate
+        self.known_materials = known_materials
+        self.skim_speed_factor = skim_speed_factor
+        # แคชผลค้นตารางต่อ (วัสดุ, ความหนา) ต่อ estimator หนึ่งตัว
+        self.area_rate = lru_cache(maxsize=1024)(self._area_rate)
+
+    def materials(self):
+        names = set(self.speed_table)
+        if self.known_materials is not None: names.update(self.known_materials())
+        return sorted(names)
+
+    def _area_rate(self, material, thickness):
+        import numpy as np
+        if material in self.speed_table:
+            thicknesses, rates = self.speed_table[material]
+            return float(np.interp(thickness, thicknesses, rates))
+        if self.known_materials is None or material not in self.known_materials():
+            raise ValueError(f"Unknown material '{material}' for Wire EDM")
+        if self.fallback_rate is None:
+            raise ValueError(f"No Wire EDM cutting speeds for '{material}' and no Wire EDM_sqmm rate to fall back on")
+        return self.fallback_rate
+
+    def area_rates(self, materials, thicknesses):
+        """Rough-cut mm^2/min for every (material, thickness) pair; each distinct pair is looked up once."""
+        import numpy as np
+        materials = np.asarray(materials, dtype=str)
+        thicknesses = np.asarray(thicknesses, dtype=float)
+        materials, thicknesses = np.broadcast_arrays(materials, thicknesses)
+        pairs = np.rec.fromarrays([materials.ravel(), thicknesses.ravel()])
+        unique, inverse = np.unique(pairs, return_inverse=True)
+        rates = np.array([self.area_rate(str(m), float(t)) for m, t in unique])
+        return rates[inverse].reshape(thicknesses.shape)
+
+    def estimate(self, lengths, thicknesses, materials, skims=0):
+        """
+        Minutes per contour. lengths (mm), thicknesses (mm), materials, skims (extra
+        passes) broadcast together.
+        """
+        import numpy as np
+        lengths = np.asarray(lengths, dtype=float)
+        thicknesses = np.asarray(thicknesses, dtype=float)
+        skims = np.asarray(skims, dtype=float)
+        if np.any(lengths < 0) or np.any(thicknesses <= 0) or np.any(skims < 0):
+            raise ValueError("Length must be >= 0, thickness > 0 and skim passes >= 0")
+        area_rate = self.area_rates(materials, thicknesses)
+        rough = lengths * thicknesses / area_rate
+        linear_speed = area_rate / thicknesses
+        skim = skims * lengths / (linear_speed * self.skim_speed_factor)
+        return rough + skim
+
+    def estimate_contours(self, contours, material="", skims=0):
+        """contours: dicts with "length", "thickness" and optional "material" and "skims"."""
+        if not contours: return []
+        minutes = self.estimate(
+            [c["length"] for c in contours], [c["thickness"] for c in contours],
+            [c.get("material") or material for c in contours],
+            [c.get("skims", skims) for c in contours])
+        return minutes.tolist()
+
+def parse_contours(text):
+    """
+    Contours typed or pasted one per line: length, thickness[, skims[, material]].
+    Tabs, commas or semicolons separate the values; lines that do not start with
+    a number (headers, blanks) are skipped.
+    """
+    contours = []
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        separator = "\t" if "\t" in line else (";" if ";" in line else ",")
+        cells = [cell.strip() for cell in line.split(separator)]
+        try:
+            length = float(cells[0])
+        except ValueError:
+            continue
+        try:
+            contour = {"length": length, "thickness": float(cells[1])}
+            if len(cells) > 2 and cells[2]: contour["skims"] = int(float(cells[2]))
+        except (IndexError, ValueError):
+            raise ValueError(f"Invalid contour on line {line_no}: {line.strip()}")
+        if len(cells) > 3 and cells[3]: contour["material"] = cells[3]
+        contours.append(contour)
+    return contours
+
+def parse_speed_points(text):
+    """
+    Cutting speeds typed as "thickness:rate" pairs, e.g. "10:110, 20:140, 40:160"
+    (mm : mm^2/min), into ((thickness, rate), ...). Blank text gives ().
+    """
+    points = {}
+    for item in filter(None, (item.strip() for item in text.replace(";", ",").split(","))):
+        try:
+            thickness, rate = (float(value) for value in item.split(":"))
+        except ValueError:
+            raise ValueError(f"Invalid cutting speed '{item}' (use thickness:rate)")
+        if thickness <= 0 or rate <= 0: raise ValueError(f"Invalid cutting speed '{item}'")
+        points[thickness] = rate
+    return tuple(sorted(points.items()))
+
+def format_speed_points(points):
+    return ", ".join(f"{thickness:g}:{rate:g}" for thickness, rate in points)
+
+_estimator = None
+_estimator_key = None
+
+def get_estimator():
+    """Estimator for the current speeds and settings; rebuilt only after either changes."""
+    global _estimator, _estimator_key
+    speeds, settings = database.get_wire_edm_speeds(), database.get_settings()
+    key = (speeds, fallback_area_rate(settings))
+    if _estimator is None or _estimator_key[0] is not speeds or _estimator_key[1] != key[1]:
+        table = {material: tuple(zip(*points)) for material, points in speeds.items()}
+        _estimator = WireEdmEstimator(table, key[1], lambda: database.get_all_materials().keys())
+        _estimator_key = key
+    return _estimator